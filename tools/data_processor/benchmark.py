@@ -0,0 +1,549 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite for the data pipeline and the app's search queries.
+
+This script:
+1. Generates seeded synthetic kaikki-style dumps (generate_sample_data.py)
+2. Runs process_file, deduplicate_words (or its external-memory variant)
+   and populate_database, each in a fresh process, recording throughput,
+   peak RSS and output size (or, with --fused, the single fused load)
+3. Times the SQL SearchDao issues against the built dictionary.db (p50/p99)
+4. Saves the results as JSON, and optionally compares them with an earlier run
+
+Nothing is downloaded; the real data directory and output are not touched.
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import queue
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from build_database import FUSED_QUEUE_SIZE
+from fused_build import print_queue_stats
+from generate_sample_data import DEFAULT_ENGLISH_ENTRIES, DEFAULT_HINDI_ENTRIES, DEFAULT_SEED
+from process_wiktionary import DEDUP_RUN_SIZE, peak_rss_mb
+from search_indexes import measure_latency
+
+RESULTS_DIR = Path(__file__).parent / 'benchmark' / 'results'
+
+DEFAULT_QUERIES = 500
+
+# How often run_isolated checks that a stage process is still alive
+STAGE_POLL_SECONDS = 1.0
+
+# SearchDao queries, as drift and the custom SQL issue them. Each takes the
+# parameters built by search_query_params.
+SEARCH_DAO_QUERIES = {
+    'searchExact': (
+        "SELECT * FROM words WHERE word = ? AND language_code = ?"
+    ),
+    'searchByPrefix': (
+        "SELECT * FROM words WHERE word LIKE ? AND language_code = ? "
+        "ORDER BY word ASC LIMIT ?"
+    ),
+    'searchFullText': """
+        SELECT w.id, w.word, w.language_code, w.pos
+        FROM words_fts fts
+        JOIN words w ON w.id = fts.rowid
+        WHERE words_fts MATCH ?
+        AND w.language_code = ?
+        ORDER BY rank
+        LIMIT ?
+    """,
+    'searchInTranslations': """
+        SELECT DISTINCT w.id, w.word, w.language_code, w.pos, t.translation
+        FROM words w
+        JOIN translations t ON t.source_word_id = w.id
+        WHERE w.language_code = ?
+        AND t.target_language_code = ?
+        AND t.translation LIKE ?
+        ORDER BY w.word
+        LIMIT ?
+    """,
+    'getWordById': (
+        "SELECT * FROM words WHERE id = ?;"
+        "SELECT * FROM definitions WHERE word_id = ? ORDER BY order_index ASC;"
+        "SELECT * FROM translations WHERE source_word_id = ?;"
+        "SELECT * FROM examples WHERE word_id = ?"
+    ),
+}
+
+
+def _run_stage(queue, func: Callable, args: tuple):
+    start = time.perf_counter()
+    result = func(*args)
+    result['seconds'] = time.perf_counter() - start - result.pop('setup_seconds', 0.0)
+    result['peak_rss_mb'] = peak_rss_mb() or 0.0
+    queue.put(result)
+
+
+def run_isolated(func: Callable, *args) -> Dict[str, Any]:
+    """Run a stage in a fresh spawned process, so its peak RSS is its own.
+
+    Raises RuntimeError if the process exits without a result, e.g. after an
+    exception or when it is killed for running out of memory.
+    """
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    process = context.Process(target=_run_stage, args=(results, func, args))
+    process.start()
+    try:
+        while True:
+            # Checked before waiting, so a result put just before exit is not lost
+            exited = not process.is_alive()
+            try:
+                result = results.get(timeout=STAGE_POLL_SECONDS)
+                break
+            except queue.Empty:
+                if exited:
+                    raise RuntimeError(
+                        f"{func.__name__} exited with code {process.exitcode} without a result"
+                    )
+    finally:
+        process.join()
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Pipeline stages. Each runs in its own process and returns the item count,
+# output size, and time spent on setup that the stage timing should exclude.
+# ---------------------------------------------------------------------------
+
+def stage_generate(data_dir: Path, english: int, hindi: int, seed: int) -> Dict[str, Any]:
+    from generate_sample_data import generate_dump
+
+    size = sum(
+        generate_dump(data_dir / f'{name}_wiktionary.jsonl', name, count, seed)
+        for name, count in (('english', english), ('hindi', hindi))
+    )
+    return {'items': english + hindi, 'output_bytes': size}
+
+
+def stage_process_file(data_dir: Path, output_path: Path, workers: int,
+                       decoder_name: str) -> Dict[str, Any]:
+    from process_wiktionary import (
+        ENGLISH_PREFILTER,
+        HINDI_PREFILTER,
+        process_english_entry,
+        process_file,
+        process_hindi_entry,
+        resolve_decoder,
+        save_results_ndjson,
+    )
+
+    sources = (
+        ('english', process_english_entry, ENGLISH_PREFILTER),
+        ('hindi', process_hindi_entry, HINDI_PREFILTER),
+    )
+
+    start = time.perf_counter()
+    decoder = resolve_decoder(decoder_name)
+    entries = 0
+    for name, _, _ in sources:
+        with open(data_dir / f'{name}_wiktionary.jsonl', 'rb') as f:
+            entries += sum(1 for _ in f)
+    setup = time.perf_counter() - start
+
+    words = []
+    for name, processor, prefilter in sources:
+        words.extend(process_file(data_dir / f'{name}_wiktionary.jsonl', processor,
+                                  f"{name} entries", workers=workers, prefilter=prefilter,
+                                  decoder=decoder))
+
+    start = time.perf_counter()
+    save_results_ndjson(words, output_path)
+    setup += time.perf_counter() - start
+    return {
+        'items': entries,
+        'words': len(words),
+        'output_bytes': output_path.stat().st_size,
+        'setup_seconds': setup,
+    }
+
+
+def stage_deduplicate(input_path: Path, output_path: Path, run_size: int = 0) -> Dict[str, Any]:
+    from build_database import iter_processed_data
+    from process_wiktionary import (
+        ProcessedWord,
+        deduplicate_words,
+        deduplicate_words_external,
+        save_results_ndjson,
+    )
+
+    if run_size:
+        # Streams from the input file, so reading and writing are part of the stage
+        records = iter_processed_data(input_path)
+        counted = {'items': 0}
+
+        def words():
+            for record in records:
+                counted['items'] += 1
+                yield ProcessedWord(**record)
+
+        with tempfile.TemporaryDirectory(prefix='dedup-') as run_dir:
+            unique = save_results_ndjson(
+                deduplicate_words_external(words(), Path(run_dir), run_size), output_path
+            )
+        return {
+            'items': counted['items'],
+            'words': unique,
+            'output_bytes': output_path.stat().st_size,
+        }
+
+    start = time.perf_counter()
+    words = [ProcessedWord(**record) for record in iter_processed_data(input_path)]
+    setup = time.perf_counter() - start
+
+    unique = deduplicate_words(words)
+
+    start = time.perf_counter()
+    save_results_ndjson(unique, output_path)
+    setup += time.perf_counter() - start
+    return {
+        'items': len(words),
+        'words': len(unique),
+        'output_bytes': output_path.stat().st_size,
+        'setup_seconds': setup,
+    }
+
+
+def stage_populate(input_path: Path, db_path: Path, bulk: bool) -> Dict[str, Any]:
+    from build_database import (
+        add_metadata,
+        create_database,
+        finalize_database,
+        iter_processed_data,
+        optimize_database,
+        populate_database,
+        populate_database_bulk,
+    )
+
+    conn = create_database(db_path)
+    populate = populate_database_bulk if bulk else populate_database
+    word_count = populate(conn, iter_processed_data(input_path))
+
+    # Indexes and FTS are part of producing a usable database, so they are
+    # timed with the load; ANALYZE / VACUUM are not
+    finalize_database(conn)
+    add_metadata(conn, word_count)
+    start = time.perf_counter()
+    optimize_database(conn)
+    setup = time.perf_counter() - start
+    conn.close()
+    return {
+        'items': word_count,
+        'output_bytes': db_path.stat().st_size,
+        'setup_seconds': setup,
+    }
+
+
+def stage_fused(data_dir: Path, db_path: Path, workers: int, decoder_name: str,
+                queue_size: int) -> Dict[str, Any]:
+    from build_database import add_metadata, create_database, finalize_database, optimize_database
+    from fused_build import fused_sources, populate_database_fused
+    from process_wiktionary import resolve_decoder
+
+    start = time.perf_counter()
+    sources = fused_sources(data_dir)
+    entries = 0
+    for _, input_path, _, _ in sources:
+        with open(input_path, 'rb') as f:
+            entries += sum(1 for _ in f)
+    setup = time.perf_counter() - start
+
+    conn = create_database(db_path)
+    word_count, queue_stats = populate_database_fused(
+        conn, sources, workers, queue_size, resolve_decoder(decoder_name)
+    )
+    finalize_database(conn)
+    add_metadata(conn, word_count)
+    start = time.perf_counter()
+    optimize_database(conn)
+    setup += time.perf_counter() - start
+    conn.close()
+    return {
+        'items': entries,
+        'words': word_count,
+        'output_bytes': db_path.stat().st_size,
+        'queue': queue_stats,
+        'setup_seconds': setup,
+    }
+
+
+# ---------------------------------------------------------------------------
+# SearchDao query latency
+# ---------------------------------------------------------------------------
+
+def sample_query_inputs(conn: sqlite3.Connection, count: int, seed: int) -> Dict[str, List]:
+    """Seeded query inputs drawn from the built database."""
+    rng = random.Random(seed)
+    words = [row[0] for row in conn.execute(
+        "SELECT word FROM words WHERE language_code = 'en' ORDER BY id"
+    )]
+    translations = [row[0] for row in conn.execute(
+        "SELECT translation FROM translations WHERE target_language_code = 'hi' ORDER BY id"
+    )]
+    max_id = conn.execute("SELECT MAX(id) FROM words").fetchone()[0] or 0
+
+    def pick(values):
+        return [rng.choice(values) for _ in range(count)] if values else []
+
+    return {
+        'searchExact': pick(words),
+        'searchByPrefix': [w[:rng.randint(1, 3)] for w in pick(words)],
+        'searchFullText': [w[:rng.randint(2, 4)] for w in pick(words)],
+        'searchInTranslations': [t[:rng.randint(1, 3)] for t in pick(translations)],
+        'getWordById': [rng.randint(1, max_id) for _ in range(count)] if max_id else [],
+    }
+
+
+def search_query_params(name: str, query: Any, limit: int = 30) -> tuple:
+    """Bind parameters the way SearchDao / WordDao build them."""
+    if name == 'searchExact':
+        return (query.lower(), 'en')
+    if name == 'searchByPrefix':
+        return (f'{query}%', 'en', limit)
+    if name == 'searchFullText':
+        return ('"' + query.replace('"', '""') + '"*', 'en', limit)
+    if name == 'searchInTranslations':
+        return ('en', 'hi', f'%{query}%', limit)
+    return (query,)
+
+
+def benchmark_queries(db_path: Path, count: int, seed: int) -> Dict[str, Dict[str, float]]:
+    """p50/p99 latency of each SearchDao query over seeded inputs."""
+    conn = sqlite3.connect(db_path)
+    inputs = sample_query_inputs(conn, count, seed)
+    results = {}
+
+    for name, sql in SEARCH_DAO_QUERIES.items():
+        statements = [s for s in sql.split(';') if s.strip()]
+
+        def run(query):
+            params = search_query_params(name, query)
+            for statement in statements:
+                conn.execute(statement, params).fetchall()
+
+        if inputs[name]:
+            # One untimed pass so every query sees a warm page cache
+            for query in inputs[name][:50]:
+                run(query)
+            results[name] = measure_latency(run, inputs[name])
+
+    conn.close()
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+
+def print_stage(name: str, result: Dict[str, Any]):
+    rate = result['items'] / result['seconds'] if result['seconds'] else 0.0
+    print(
+        f"  {name:<24} {result['items']:>9,} items  {result['seconds']:8.2f}s  "
+        f"{rate:>10,.0f}/s  peak RSS {result['peak_rss_mb']:7.1f} MB  "
+        f"output {result['output_bytes'] / (1024 * 1024):7.1f} MB"
+    )
+
+
+def compare_results(current: Dict[str, Any], previous: Dict[str, Any]):
+    """Print the change of each metric relative to an earlier results file."""
+    print("Change vs previous run (negative is better for time and memory):")
+    for name, stage in current['stages'].items():
+        before = previous.get('stages', {}).get(name)
+        if not before:
+            continue
+        for metric in ('seconds', 'peak_rss_mb', 'output_bytes'):
+            if before.get(metric):
+                change = stage[metric] / before[metric] - 1
+                print(f"  {name}.{metric}: {change:+.1%}")
+    for name, latency in current['queries'].items():
+        before = previous.get('queries', {}).get(name)
+        if before and before.get('p50_ms'):
+            print(f"  {name}.p50_ms: {latency['p50_ms'] / before['p50_ms'] - 1:+.1%}   "
+                  f"p99_ms: {latency['p99_ms'] / before['p99_ms'] - 1:+.1%}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline and search queries offline")
+    parser.add_argument(
+        '--english', type=int, default=DEFAULT_ENGLISH_ENTRIES,
+        help=f"Synthetic English entries (default: {DEFAULT_ENGLISH_ENTRIES})"
+    )
+    parser.add_argument(
+        '--hindi', type=int, default=DEFAULT_HINDI_ENTRIES,
+        help=f"Synthetic Hindi entries (default: {DEFAULT_HINDI_ENTRIES})"
+    )
+    parser.add_argument(
+        '--seed', type=int, default=DEFAULT_SEED,
+        help=f"Seed for the data and the query sample (default: {DEFAULT_SEED})"
+    )
+    parser.add_argument(
+        '--workers', type=int, default=1,
+        help="Worker processes for process_file (default: 1)"
+    )
+    parser.add_argument(
+        '--decoder', choices=['auto', 'msgspec', 'json'], default='json',
+        help="JSON decoder backend for process_file (default: json)"
+    )
+    parser.add_argument(
+        '--external-dedup', action='store_true',
+        help="Time deduplicate_words_external (spill runs) instead of deduplicate_words"
+    )
+    parser.add_argument(
+        '--dedup-run-size', type=int, default=DEDUP_RUN_SIZE,
+        help=f"Distinct entries per spill run with --external-dedup (default: {DEDUP_RUN_SIZE})"
+    )
+    parser.add_argument(
+        '--bulk', action='store_true',
+        help="Time populate_database_bulk instead of populate_database"
+    )
+    parser.add_argument(
+        '--fused', action='store_true',
+        help="Time the fused process-and-load (build_database.py --fused) instead of the separate stages"
+    )
+    parser.add_argument(
+        '--queue-size', type=int, default=FUSED_QUEUE_SIZE,
+        help=f"Parsed batches buffered between parsers and writer with --fused (default: {FUSED_QUEUE_SIZE})"
+    )
+    parser.add_argument(
+        '--queries', type=int, default=DEFAULT_QUERIES,
+        help=f"Timed executions per SearchDao query (default: {DEFAULT_QUERIES})"
+    )
+    parser.add_argument(
+        '--output', type=Path,
+        help="Results file (default: benchmark/results/benchmark_<timestamp>.json)"
+    )
+    parser.add_argument(
+        '--compare', type=Path,
+        help="Earlier results file to compare against"
+    )
+    parser.add_argument(
+        '--keep', type=Path,
+        help="Keep the generated data, processed files and database in this directory"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print("=" * 60)
+    print("Pipeline Benchmark")
+    print("=" * 60)
+    print()
+
+    work_dir = args.keep or Path(tempfile.mkdtemp(prefix='dictionary-benchmark-'))
+    work_dir.mkdir(parents=True, exist_ok=True)
+    data_dir = work_dir / 'data'
+    processed_path = work_dir / 'processed.jsonl'
+    all_words_path = work_dir / 'all_words.jsonl'
+    db_path = work_dir / 'dictionary.db'
+
+    stages = {}
+    try:
+        print(f"[1/5] Generating {args.english:,} English and {args.hindi:,} Hindi entries...")
+        stages['generate'] = run_isolated(
+            stage_generate, data_dir, args.english, args.hindi, args.seed
+        )
+
+        if args.fused:
+            print("\n[2/5] populate_database_fused (process, dedup and load in one pass)...")
+            stages['populate_database_fused'] = run_isolated(
+                stage_fused, data_dir, db_path, args.workers, args.decoder, args.queue_size
+            )
+            print("\n[3/5] Skipped: deduplication is part of the fused load")
+            print("\n[4/5] Skipped: the database was written by the fused load")
+        else:
+            print("\n[2/5] process_file...")
+            stages['process_file'] = run_isolated(
+                stage_process_file, data_dir, processed_path, args.workers, args.decoder
+            )
+
+            dedup_name = 'deduplicate_words_external' if args.external_dedup else 'deduplicate_words'
+            print(f"\n[3/5] {dedup_name}...")
+            stages[dedup_name] = run_isolated(
+                stage_deduplicate, processed_path, all_words_path,
+                args.dedup_run_size if args.external_dedup else 0
+            )
+
+            populate_name = 'populate_database_bulk' if args.bulk else 'populate_database'
+            print(f"\n[4/5] {populate_name}...")
+            stages[populate_name] = run_isolated(stage_populate, all_words_path, db_path, args.bulk)
+
+        print("\n[5/5] SearchDao queries...")
+        queries = benchmark_queries(db_path, args.queries, args.seed)
+    except RuntimeError as e:
+        print(f"\n[ERROR] {e}")
+        raise SystemExit(1)
+    finally:
+        if not args.keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    for result in stages.values():
+        result['items_per_second'] = result['items'] / result['seconds'] if result['seconds'] else 0.0
+
+    results = {
+        'timestamp': datetime.now().isoformat(),
+        'config': {
+            'english': args.english,
+            'hindi': args.hindi,
+            'seed': args.seed,
+            'workers': args.workers,
+            'decoder': args.decoder,
+            'external_dedup': args.external_dedup,
+            'dedup_run_size': args.dedup_run_size if args.external_dedup else None,
+            'bulk': args.bulk,
+            'fused': args.fused,
+            'queue_size': args.queue_size if args.fused else None,
+            'queries': args.queries,
+        },
+        'environment': {
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'cpu_count': multiprocessing.cpu_count(),
+        },
+        'stages': stages,
+        'queries': queries,
+    }
+
+    output_path = args.output or RESULTS_DIR / f"benchmark_{datetime.now():%Y%m%d_%H%M%S}.json"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+
+    print()
+    print("=" * 60)
+    print("Benchmark complete!")
+    print()
+    print("Stages:")
+    for name, result in stages.items():
+        print_stage(name, result)
+    if 'populate_database_fused' in stages:
+        print_queue_stats(stages['populate_database_fused']['queue'])
+    print()
+    print("SearchDao queries:")
+    for name, latency in queries.items():
+        print(f"  {name:<22} p50 {latency['p50_ms']:8.3f} ms   p99 {latency['p99_ms']:8.3f} ms")
+    print()
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare_results(results, json.load(f))
+        print()
+    print(f"Results saved to: {output_path}")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
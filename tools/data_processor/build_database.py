@@ -3,24 +3,58 @@
 Build SQLite database from processed Wiktionary data.
 
 This script:
-1. Reads the processed JSON files
+1. Reads the processed NDJSON (or legacy JSON) files
 2. Creates an optimized SQLite database with FTS5 support
 3. Populates all tables with dictionary data
 4. Creates indexes for fast searching
 """
 
+import argparse
+import gzip
+import hashlib
 import json
 import sqlite3
+import time
+import uuid
+from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Sequence
 from tqdm import tqdm
 
+from language_packs import DEFAULT_PACK, PACKS
+
 OUTPUT_DIR = Path(__file__).parent / 'output'
 DATABASE_PATH = OUTPUT_DIR / 'dictionary.db'
+COMPACT_DATABASE_PATH = OUTPUT_DIR / 'dictionary_compact.db'
+LAYOUT_DATABASE_PATH = OUTPUT_DIR / 'dictionary_layout.db'
+DELTA_DIR = OUTPUT_DIR / 'deltas'
+DELTA_INDEX_PATH = DELTA_DIR / 'index.json'
+DELTA_FORMAT_VERSION = 2
+
+# Rows buffered per table before a bulk-load flush
+BULK_BATCH_SIZE = 50000
+
+# Parsed batches buffered between the parsers and the SQLite writer in a fused build
+FUSED_QUEUE_SIZE = 32
+
+# Insert statements for each table written by the bulk loader, in flush order
+BULK_INSERTS = {
+    'words': "INSERT INTO words (id, word, language_code, pos, pronunciation_ipa, etymology) "
+             "VALUES (?, ?, ?, ?, ?, ?)",
+    'definitions': "INSERT INTO definitions (word_id, definition, order_index) VALUES (?, ?, ?)",
+    'translations': "INSERT INTO translations (source_word_id, target_language_code, translation) "
+                    "VALUES (?, ?, ?)",
+    'examples': "INSERT INTO examples (word_id, example_text) VALUES (?, ?)",
+}
 
 
 def create_database(db_path: Path) -> sqlite3.Connection:
-    """Create the SQLite database with all tables."""
+    """Create the SQLite database with all tables.
+
+    Only the tables are created here. Indexes, the FTS index contents and the
+    FTS sync triggers are added by finalize_database once the data is loaded,
+    so inserts do not have to maintain them row by row.
+    """
 
     # Remove existing database
     if db_path.exists():
@@ -116,42 +150,82 @@ def create_database(db_path: Path) -> sqlite3.Connection:
         )
     """)
 
-    # Create triggers to keep FTS in sync
-    cursor.execute("""
-        CREATE TRIGGER IF NOT EXISTS words_ai AFTER INSERT ON words BEGIN
+    conn.commit()
+    return conn
+
+
+def create_indexes(conn: sqlite3.Connection):
+    """Create the secondary indexes."""
+    cursor = conn.cursor()
+
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_words_language ON words(language_code)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_words_word ON words(word)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_words_word_lang ON words(word, language_code)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_definitions_word ON definitions(word_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_translations_word ON translations(source_word_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_translations_target ON translations(target_language_code)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_examples_word ON examples(word_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_favorites_word ON favorites(word_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_history_word ON search_history(word_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_history_date ON search_history(searched_at)")
+
+    conn.commit()
+
+
+def rebuild_fts(conn: sqlite3.Connection):
+    """Fill words_fts from the words table in a single pass."""
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO words_fts(words_fts) VALUES ('rebuild')")
+    conn.commit()
+
+
+def create_fts_triggers(conn: sqlite3.Connection, table: str = 'words'):
+    """Create the triggers that keep words_fts in sync with later changes to `table`."""
+    cursor = conn.cursor()
+
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_ai AFTER INSERT ON {table} BEGIN
             INSERT INTO words_fts(rowid, word) VALUES (new.id, new.word);
         END
     """)
 
-    cursor.execute("""
-        CREATE TRIGGER IF NOT EXISTS words_ad AFTER DELETE ON words BEGIN
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_ad AFTER DELETE ON {table} BEGIN
             INSERT INTO words_fts(words_fts, rowid, word)
             VALUES ('delete', old.id, old.word);
         END
     """)
 
-    cursor.execute("""
-        CREATE TRIGGER IF NOT EXISTS words_au AFTER UPDATE ON words BEGIN
+    # Only the indexed columns: whole-table updates of derived columns such as
+    # search_key and score must not rewrite every row of words_fts. Replaced
+    # rather than kept, as older databases have an unrestricted trigger.
+    cursor.execute(f"DROP TRIGGER IF EXISTS {table}_au")
+    cursor.execute(f"""
+        CREATE TRIGGER {table}_au AFTER UPDATE OF id, word ON {table} BEGIN
             INSERT INTO words_fts(words_fts, rowid, word)
             VALUES ('delete', old.id, old.word);
             INSERT INTO words_fts(rowid, word) VALUES (new.id, new.word);
         END
     """)
 
-    # Create indexes
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_words_language ON words(language_code)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_words_word ON words(word)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_words_word_lang ON words(word, language_code)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_definitions_word ON definitions(word_id)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_translations_word ON translations(source_word_id)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_translations_target ON translations(target_language_code)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_examples_word ON examples(word_id)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_favorites_word ON favorites(word_id)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_history_word ON search_history(word_id)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_history_date ON search_history(searched_at)")
-
     conn.commit()
-    return conn
+
+
+def finalize_database(conn: sqlite3.Connection) -> Dict[str, float]:
+    """Build indexes, FTS contents and triggers after the data is loaded.
+
+    Returns the time in seconds spent in each phase.
+    """
+    timings = {}
+    for phase, func in (
+        ('indexes', create_indexes),
+        ('fts_rebuild', rebuild_fts),
+        ('fts_triggers', create_fts_triggers),
+    ):
+        start = time.perf_counter()
+        func(conn)
+        timings[phase] = time.perf_counter() - start
+    return timings
 
 
 def load_processed_data(file_path: Path) -> List[Dict[str, Any]]:
@@ -163,11 +237,70 @@ def load_processed_data(file_path: Path) -> List[Dict[str, Any]]:
         return json.load(f)
 
 
-def populate_database(conn: sqlite3.Connection, words: List[Dict[str, Any]]):
-    """Populate the database with word entries."""
+def iter_processed_data(file_path: Path) -> Iterator[Dict[str, Any]]:
+    """Stream processed word records from an NDJSON file, one at a time."""
+    if not file_path.exists():
+        return
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def find_processed_data(output_dir: Path) -> Optional[Path]:
+    """Find the combined processed data file.
+
+    A run with the other --output-format leaves the old file behind, so the
+    newest one is used; streaming NDJSON wins a tie.
+    """
+    existing = [path for path in (output_dir / 'all_words.jsonl', output_dir / 'all_words.json')
+                if path.exists()]
+    if not existing:
+        return None
+    return max(existing, key=lambda path: path.stat().st_mtime_ns)
+
+
+def open_processed_data(file_path: Path) -> Iterable[Dict[str, Any]]:
+    """Open processed data lazily if it is NDJSON, or fully if it is a JSON array."""
+    if file_path.suffix == '.jsonl':
+        return iter_processed_data(file_path)
+    return load_processed_data(file_path)
+
+
+def insert_word_children(cursor: sqlite3.Cursor, word_id: int, word_data: Dict[str, Any]):
+    """Insert the definitions, translations and examples of one word."""
+    for idx, definition in enumerate(word_data.get('definitions', [])):
+        cursor.execute("""
+            INSERT INTO definitions (word_id, definition, order_index)
+            VALUES (?, ?, ?)
+        """, (word_id, definition, idx))
+
+    for lang_code, translations in word_data.get('translations', {}).items():
+        for translation in translations:
+            cursor.execute("""
+                INSERT INTO translations (source_word_id, target_language_code, translation)
+                VALUES (?, ?, ?)
+            """, (word_id, lang_code, translation))
+
+    for example in word_data.get('examples', []):
+        cursor.execute("""
+            INSERT INTO examples (word_id, example_text)
+            VALUES (?, ?)
+        """, (word_id, example))
+
+
+def populate_database(conn: sqlite3.Connection, words: Iterable[Dict[str, Any]]) -> int:
+    """Populate the database with word entries.
+
+    `words` may be any iterable, including a lazy NDJSON stream. Returns the
+    number of records consumed.
+    """
     cursor = conn.cursor()
+    count = 0
 
-    for word_data in tqdm(words, desc="Inserting words"):
+    for word_data in tqdm(words, desc="Inserting words", unit='word'):
+        count += 1
         try:
             # Insert word
             cursor.execute("""
@@ -195,47 +328,145 @@ def populate_database(conn: sqlite3.Connection, words: List[Dict[str, Any]]):
             else:
                 word_id = cursor.lastrowid
 
-            # Insert definitions
-            for idx, definition in enumerate(word_data.get('definitions', [])):
-                cursor.execute("""
-                    INSERT INTO definitions (word_id, definition, order_index)
-                    VALUES (?, ?, ?)
-                """, (word_id, definition, idx))
-
-            # Insert translations
-            for lang_code, translations in word_data.get('translations', {}).items():
-                for translation in translations:
-                    cursor.execute("""
-                        INSERT INTO translations (source_word_id, target_language_code, translation)
-                        VALUES (?, ?, ?)
-                    """, (word_id, lang_code, translation))
-
-            # Insert examples
-            for example in word_data.get('examples', []):
-                cursor.execute("""
-                    INSERT INTO examples (word_id, example_text)
-                    VALUES (?, ?)
-                """, (word_id, example))
+            # Insert definitions, translations and examples
+            insert_word_children(cursor, word_id, word_data)
 
         except sqlite3.Error as e:
             print(f"Error inserting word '{word_data.get('word', 'unknown')}': {e}")
             continue
 
     conn.commit()
+    return count
+
+
+def apply_bulk_load_pragmas(conn: sqlite3.Connection):
+    """Trade crash safety for speed while building.
+
+    The database file is thrown away if the build fails, so there is no need
+    for a rollback journal, fsyncs or per-row foreign key checks.
+    """
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA journal_mode = OFF")
+    cursor.execute("PRAGMA synchronous = OFF")
+    cursor.execute("PRAGMA temp_store = MEMORY")
+    cursor.execute("PRAGMA cache_size = -262144")  # 256 MB
+    cursor.execute("PRAGMA foreign_keys = OFF")
 
 
-def add_metadata(conn: sqlite3.Connection, word_count: int):
-    """Add metadata to the database."""
+def restore_pragmas(conn: sqlite3.Connection):
+    """Restore the default durability settings after a bulk load."""
     cursor = conn.cursor()
+    cursor.execute("PRAGMA journal_mode = DELETE")
+    cursor.execute("PRAGMA synchronous = FULL")
+    cursor.execute("PRAGMA foreign_keys = ON")
 
-    from datetime import datetime
+
+def populate_database_bulk(conn: sqlite3.Connection, words: Iterable[Dict[str, Any]],
+                           batch_size: int = BULK_BATCH_SIZE) -> int:
+    """Populate the database using batched executemany calls.
+
+    Word ids are assigned here instead of read back from SQLite, so rows for
+    every table can be buffered and written with one executemany per table
+    and batch. Ids and row order match populate_database, which makes the
+    resulting content identical. Returns the number of records consumed.
+    """
+    cursor = conn.cursor()
+    apply_bulk_load_pragmas(conn)
+
+    word_ids = {}
+    next_word_id = 1
+    count = 0
+    buffers = {table: [] for table in BULK_INSERTS}
+    row_counts = {table: 0 for table in BULK_INSERTS}
+    elapsed = {table: 0.0 for table in BULK_INSERTS}
+
+    def flush():
+        for table, rows in buffers.items():
+            if not rows:
+                continue
+            start = time.perf_counter()
+            cursor.executemany(BULK_INSERTS[table], rows)
+            elapsed[table] += time.perf_counter() - start
+            row_counts[table] += len(rows)
+            rows.clear()
+        conn.commit()
+
+    for word_data in tqdm(words, desc="Inserting words", unit='word'):
+        count += 1
+
+        word = word_data['word']
+        language = word_data['language']
+        pos = word_data['pos']
+        if word is None or language is None:
+            print(f"Error inserting word '{word_data.get('word', 'unknown')}': "
+                  f"NOT NULL constraint failed")
+            continue
+
+        # Mirror INSERT OR IGNORE on UNIQUE(word, language_code, pos); NULL pos never collides
+        key = (word, language, pos)
+        word_id = word_ids.get(key) if pos is not None else None
+        if word_id is None:
+            word_id = next_word_id
+            next_word_id += 1
+            if pos is not None:
+                word_ids[key] = word_id
+            buffers['words'].append((
+                word_id,
+                word,
+                language,
+                pos,
+                word_data.get('pronunciation_ipa'),
+                word_data.get('etymology'),
+            ))
+
+        child_rows = []
+        for idx, definition in enumerate(word_data.get('definitions', [])):
+            child_rows.append(('definitions', definition, (word_id, definition, idx)))
+        for lang_code, translations in word_data.get('translations', {}).items():
+            for translation in translations:
+                child_rows.append(('translations', translation, (word_id, lang_code, translation)))
+        for example in word_data.get('examples', []):
+            child_rows.append(('examples', example, (word_id, example)))
+
+        # Like the row-by-row path, stop at the first row that would violate NOT NULL
+        for table, text, row in child_rows:
+            if text is None or None in row[:2]:
+                print(f"Error inserting word '{word}': NOT NULL constraint failed")
+                break
+            buffers[table].append(row)
+
+        if any(len(rows) >= batch_size for rows in buffers.values()):
+            flush()
+
+    flush()
+    restore_pragmas(conn)
+
+    print("  Bulk load throughput:")
+    for table in BULK_INSERTS:
+        rate = row_counts[table] / elapsed[table] if elapsed[table] else 0.0
+        print(f"    - {table}: {row_counts[table]:,} rows, {rate:,.0f} rows/s")
+
+    return count
+
+
+def add_metadata(conn: sqlite3.Connection, word_count: int, profile: str = 'standard',
+                 languages: Sequence[str] = PACKS[DEFAULT_PACK].languages):
+    """Add metadata to the database.
+
+    A full build starts a new delta chain at data_version 1, with a new
+    base_id so deltas from an earlier chain cannot be applied to it.
+    """
+    cursor = conn.cursor()
 
     metadata = {
         'version': '1.0.0',
         'created_at': datetime.now().isoformat(),
         'source': 'kaikki.org (Wiktionary)',
         'word_count': str(word_count),
-        'languages': 'en,hi',
+        'languages': ','.join(languages),
+        'data_version': '1',
+        'base_id': uuid.uuid4().hex,
+        'profile': profile,
     }
 
     for key, value in metadata.items():
@@ -247,6 +478,318 @@ def add_metadata(conn: sqlite3.Connection, word_count: int):
     conn.commit()
 
 
+def word_content_hash(word_data: Dict[str, Any]) -> str:
+    """Hash everything stored for a word apart from its (word, language, pos) key.
+
+    Empty translation lists are dropped and languages are sorted, so a record
+    read back from the database hashes the same as the one it was built from.
+    """
+    translations = sorted(
+        (lang_code, list(values))
+        for lang_code, values in word_data.get('translations', {}).items()
+        if values
+    )
+    content = [
+        word_data.get('pronunciation_ipa'),
+        word_data.get('etymology'),
+        list(word_data.get('definitions', [])),
+        translations,
+        list(word_data.get('examples', [])),
+    ]
+    encoded = json.dumps(content, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha1(encoded.encode('utf-8')).hexdigest()
+
+
+def get_metadata_value(conn: sqlite3.Connection, key: str) -> Optional[str]:
+    """Read a single metadata value."""
+    row = conn.execute("SELECT value FROM metadata WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def load_word_hashes(conn: sqlite3.Connection) -> Dict[tuple, tuple]:
+    """Rebuild every word record from an existing database and hash it.
+
+    Returns {(word, language_code, pos): (word_id, content_hash)}.
+    """
+    records = {}
+    for word_id, word, language, pos, ipa, etymology in conn.execute(
+        "SELECT id, word, language_code, pos, pronunciation_ipa, etymology FROM words"
+    ):
+        records[word_id] = {
+            'key': (word, language, pos),
+            'pronunciation_ipa': ipa,
+            'etymology': etymology,
+            'definitions': [],
+            'translations': {},
+            'examples': [],
+        }
+
+    for word_id, definition in conn.execute(
+        "SELECT word_id, definition FROM definitions ORDER BY word_id, order_index, id"
+    ):
+        records[word_id]['definitions'].append(definition)
+
+    for word_id, lang_code, translation in conn.execute(
+        "SELECT source_word_id, target_language_code, translation FROM translations ORDER BY id"
+    ):
+        records[word_id]['translations'].setdefault(lang_code, []).append(translation)
+
+    for word_id, example in conn.execute("SELECT word_id, example_text FROM examples ORDER BY id"):
+        records[word_id]['examples'].append(example)
+
+    return {
+        record['key']: (word_id, word_content_hash(record))
+        for word_id, record in records.items()
+    }
+
+
+def write_delta(conn: sqlite3.Connection, words: Iterable[Dict[str, Any]],
+                delta_path: Path) -> Dict[str, int]:
+    """Diff new word records against the database and write a delta file.
+
+    The delta is gzipped NDJSON: a header line, then one op per line. Upserts
+    carry explicit word ids (new words continue the words id sequence) and are
+    written as the input streams in; deletes follow at the end. Applying the
+    ops in file order reproduces the same ids on any copy of the base version.
+    """
+    from_version = int(get_metadata_value(conn, 'data_version') or 1)
+    base_id = get_metadata_value(conn, 'base_id')
+    previous = load_word_hashes(conn)
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'words'").fetchone()
+    next_word_id = (row[0] if row else 0) + 1
+
+    counts = {'inserted': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0, 'duplicates': 0}
+    seen = set()
+
+    delta_path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(delta_path, 'wt', encoding='utf-8') as f:
+        def write_op(op: Dict[str, Any]):
+            f.write(json.dumps(op, ensure_ascii=False, separators=(',', ':')))
+            f.write('\n')
+
+        write_op({
+            'format': 'dictionary-delta',
+            'format_version': DELTA_FORMAT_VERSION,
+            'base_id': base_id,
+            'from_version': from_version,
+            'to_version': from_version + 1,
+        })
+
+        for word_data in tqdm(words, desc="Diffing words", unit='word'):
+            key = (word_data['word'], word_data['language'], word_data['pos'])
+            if key in seen:
+                # Same as INSERT OR IGNORE in a full build: the first record wins
+                counts['duplicates'] += 1
+                continue
+            seen.add(key)
+
+            content_hash = word_content_hash(word_data)
+            if key in previous:
+                word_id, previous_hash = previous[key]
+                if previous_hash == content_hash:
+                    counts['unchanged'] += 1
+                    continue
+                counts['updated'] += 1
+            else:
+                word_id = next_word_id
+                next_word_id += 1
+                counts['inserted'] += 1
+
+            write_op({
+                'op': 'upsert',
+                'id': word_id,
+                'word': word_data['word'],
+                'language': word_data['language'],
+                'pos': word_data['pos'],
+                'pronunciation_ipa': word_data.get('pronunciation_ipa'),
+                'etymology': word_data.get('etymology'),
+                'definitions': word_data.get('definitions', []),
+                'translations': word_data.get('translations', {}),
+                'examples': word_data.get('examples', []),
+            })
+
+        for key, (word_id, _) in previous.items():
+            if key not in seen:
+                write_op({'op': 'delete', 'id': word_id})
+                counts['deleted'] += 1
+
+    return counts
+
+
+def delete_word_children(cursor: sqlite3.Cursor, word_id: int):
+    """Delete the definitions, translations and examples of one word."""
+    cursor.execute("DELETE FROM definitions WHERE word_id = ?", (word_id,))
+    cursor.execute("DELETE FROM translations WHERE source_word_id = ?", (word_id,))
+    cursor.execute("DELETE FROM examples WHERE word_id = ?", (word_id,))
+
+
+def apply_delta(conn: sqlite3.Connection, delta_path: Path) -> int:
+    """Apply a delta file to a database at the delta's base version.
+
+    This is the same procedure a client runs to patch version N to N+1.
+    Returns the new data version.
+    """
+    cursor = conn.cursor()
+
+    with gzip.open(delta_path, 'rt', encoding='utf-8') as f:
+        header = json.loads(f.readline())
+        if header.get('format') != 'dictionary-delta' or \
+                header.get('format_version') != DELTA_FORMAT_VERSION:
+            raise ValueError(f"Unsupported delta file: {delta_path}")
+
+        base_id = get_metadata_value(conn, 'base_id')
+        if header.get('base_id') != base_id:
+            raise ValueError(
+                f"Delta belongs to chain {header.get('base_id')}, "
+                f"database is on chain {base_id}"
+            )
+
+        current_version = int(get_metadata_value(conn, 'data_version') or 1)
+        if current_version != header['from_version']:
+            raise ValueError(
+                f"Delta applies to version {header['from_version']}, "
+                f"database is at version {current_version}"
+            )
+
+        updated_ids = []
+        for line in f:
+            op = json.loads(line)
+            word_id = op['id']
+
+            if op['op'] == 'delete':
+                delete_word_children(cursor, word_id)
+                cursor.execute("DELETE FROM words WHERE id = ?", (word_id,))
+                continue
+
+            cursor.execute("SELECT 1 FROM words WHERE id = ?", (word_id,))
+            if cursor.fetchone():
+                cursor.execute("""
+                    UPDATE words SET pronunciation_ipa = ?, etymology = ?
+                    WHERE id = ?
+                """, (op['pronunciation_ipa'], op['etymology'], word_id))
+                delete_word_children(cursor, word_id)
+                updated_ids.append(word_id)
+            else:
+                cursor.execute("""
+                    INSERT INTO words (id, word, language_code, pos, pronunciation_ipa, etymology)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (word_id, op['word'], op['language'], op['pos'],
+                      op['pronunciation_ipa'], op['etymology']))
+            insert_word_children(cursor, word_id, op)
+
+    # Derived rows that SQL triggers cannot compute; updated words had their
+    # child rows replaced, so theirs are rebuilt too
+    from search_indexes import (
+        fill_missing_reverse_index,
+        fill_missing_romanized_keys,
+        fill_missing_scores,
+        fill_missing_search_keys,
+        fill_missing_word_deletes,
+        fill_missing_word_payloads,
+    )
+    fill_missing_search_keys(conn)
+    fill_missing_romanized_keys(conn)
+    fill_missing_word_deletes(conn)
+    fill_missing_word_payloads(conn, updated_ids)
+    fill_missing_reverse_index(conn, updated_ids)
+    fill_missing_scores(conn, updated_ids)
+
+    cursor.execute("SELECT COUNT(*) FROM words")
+    word_count = cursor.fetchone()[0]
+
+    for key, value in {
+        'data_version': str(header['to_version']),
+        'previous_version': str(header['from_version']),
+        'updated_at': datetime.now().isoformat(),
+        'word_count': str(word_count),
+    }.items():
+        cursor.execute("""
+            INSERT OR REPLACE INTO metadata (key, value)
+            VALUES (?, ?)
+        """, (key, value))
+
+    conn.commit()
+    return header['to_version']
+
+
+def reset_delta_chain():
+    """Remove the delta files and index of the previous chain.
+
+    A full build renumbers words and starts again at data_version 1, so
+    deltas built against the old database must not stay downloadable.
+    """
+    if not DELTA_DIR.exists():
+        return
+    for path in DELTA_DIR.glob('dictionary-delta-*.jsonl.gz'):
+        path.unlink()
+    if DELTA_INDEX_PATH.exists():
+        DELTA_INDEX_PATH.unlink()
+
+
+def record_delta(delta_path: Path, base_id: Optional[str], from_version: int, to_version: int):
+    """Add a delta file to the version chain index that clients download."""
+    index = None
+    if DELTA_INDEX_PATH.exists():
+        with open(DELTA_INDEX_PATH, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    if index is None or index.get('base_id') != base_id:
+        # Entries of another chain do not apply to this database
+        index = {'base_id': base_id, 'latest_version': 1, 'deltas': []}
+
+    with open(delta_path, 'rb') as f:
+        sha256 = hashlib.sha256(f.read()).hexdigest()
+
+    index['deltas'] = [d for d in index['deltas'] if d['from_version'] != from_version]
+    index['deltas'].append({
+        'from_version': from_version,
+        'to_version': to_version,
+        'file': delta_path.name,
+        'size': delta_path.stat().st_size,
+        'sha256': sha256,
+    })
+    index['deltas'].sort(key=lambda d: d['from_version'])
+    index['latest_version'] = to_version
+
+    with open(DELTA_INDEX_PATH, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2)
+
+
+def update_database(db_path: Path, words: Iterable[Dict[str, Any]]):
+    """Incrementally update an existing database to the next data version."""
+    conn = sqlite3.connect(db_path)
+
+    base_id = get_metadata_value(conn, 'base_id')
+    from_version = int(get_metadata_value(conn, 'data_version') or 1)
+    to_version = from_version + 1
+    delta_path = DELTA_DIR / f'dictionary-delta-{from_version}-{to_version}.jsonl.gz'
+
+    print(f"\n[DIFF] Diffing against version {from_version}...")
+    counts = write_delta(conn, words, delta_path)
+    print(f"  Inserted: {counts['inserted']:,}  Updated: {counts['updated']:,}  "
+          f"Deleted: {counts['deleted']:,}  Unchanged: {counts['unchanged']:,}")
+    if counts['duplicates']:
+        print(f"  Skipped {counts['duplicates']:,} duplicate records")
+
+    print(f"\n[APPLY] Applying delta {from_version} -> {to_version}...")
+    apply_delta(conn, delta_path)
+    optimize_database(conn)
+    conn.close()
+
+    record_delta(delta_path, base_id, from_version, to_version)
+
+    delta_size = delta_path.stat().st_size / 1024
+    db_size = db_path.stat().st_size / (1024 * 1024)
+    print()
+    print("=" * 60)
+    print("Incremental update complete!")
+    print()
+    print(f"  - Data version: {to_version}")
+    print(f"  - Delta file: {delta_path} ({delta_size:.1f} KB)")
+    print(f"  - Database size: {db_size:.1f} MB")
+    print(f"  - Version chain: {DELTA_INDEX_PATH}")
+    print("=" * 60)
+
+
 def optimize_database(conn: sqlite3.Connection):
     """Optimize the database for size and performance."""
     cursor = conn.cursor()
@@ -258,6 +801,31 @@ def optimize_database(conn: sqlite3.Connection):
     conn.commit()
 
 
+def get_size_breakdown(db_path: Path) -> Dict[str, int]:
+    """Get the on-disk size of each table and index, in bytes, from dbstat."""
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT name, SUM(pgsize) FROM dbstat GROUP BY name ORDER BY SUM(pgsize) DESC"
+        ).fetchall()
+    except sqlite3.OperationalError:
+        # SQLite built without SQLITE_ENABLE_DBSTAT_VTAB
+        rows = []
+    finally:
+        conn.close()
+    return dict(rows)
+
+
+def print_size_breakdown(title: str, breakdown: Dict[str, int]):
+    """Print a per-table size breakdown."""
+    if not breakdown:
+        return
+    total = sum(breakdown.values())
+    print(f"{title} ({total / (1024 * 1024):.1f} MB):")
+    for name, size in breakdown.items():
+        print(f"  - {name}: {size / 1024:,.1f} KB ({size / total:.1%})")
+
+
 def get_stats(conn: sqlite3.Connection) -> Dict[str, int]:
     """Get database statistics."""
     cursor = conn.cursor()
@@ -285,7 +853,84 @@ def get_stats(conn: sqlite3.Connection) -> Dict[str, int]:
     return stats
 
 
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Build the dictionary SQLite database")
+    parser.add_argument(
+        '--bulk', action='store_true',
+        help="Load rows with batched executemany and build-time PRAGMAs"
+    )
+    parser.add_argument(
+        '--profile', choices=['standard', 'compact'], default='standard',
+        help="Schema profile; compact is size-optimized for mobile download "
+             "and is written to dictionary_compact.db (default: standard)"
+    )
+    parser.add_argument(
+        '--trigram-fts', action='store_true',
+        help="Add trigram FTS5 indexes over translations and definitions for substring search"
+    )
+    parser.add_argument(
+        '--search-key', action='store_true',
+        help="Add a normalized words.search_key column with a covering index"
+    )
+    parser.add_argument(
+        '--romanized-keys', action='store_true',
+        help="Add an indexed romanized_keys table mapping Latin spellings to Hindi words"
+    )
+    parser.add_argument(
+        '--fuzzy-index', action='store_true',
+        help="Add a symmetric-delete index (word_deletes) for did-you-mean lookups"
+    )
+    parser.add_argument(
+        '--word-payloads', action='store_true',
+        help="Add a word_payloads table with one serialized detail payload per word"
+    )
+    parser.add_argument(
+        '--reverse-index', action='store_true',
+        help="Add a reverse_index table mapping translations and headwords to words"
+    )
+    parser.add_argument(
+        '--popularity', action='store_true',
+        help="Add a static words.score column with an index for ranked top-k results"
+    )
+    parser.add_argument(
+        '--frequency-file', type=Path, action='append', default=[],
+        help="Word frequency list (\"word count\" or one word per line by rank) "
+             "added to the popularity score; may be repeated"
+    )
+    parser.add_argument(
+        '--fused', action='store_true',
+        help="Parse the Wiktionary dumps and load the database in one pass, "
+             "without writing processed JSON"
+    )
+    parser.add_argument(
+        '--workers', type=int, default=1,
+        help="Parser processes feeding the writer with --fused (default: 1)"
+    )
+    parser.add_argument(
+        '--queue-size', type=int, default=FUSED_QUEUE_SIZE,
+        help="Parsed batches buffered between the parsers and the writer with --fused "
+             f"(default: {FUSED_QUEUE_SIZE})"
+    )
+    parser.add_argument(
+        '--layout', action='store_true',
+        help="Write a read-locality layout of the standard profile to dictionary_layout.db: "
+             "words sorted by language and normalized word, word-clustered child tables"
+    )
+    parser.add_argument(
+        '--page-size', type=int, choices=[1024, 2048, 4096, 8192, 16384, 32768, 65536],
+        help="Page size of the --layout database (default: measure 4096, 8192 and 16384 "
+             "on cold lookups and keep the cheapest)"
+    )
+    parser.add_argument(
+        '--incremental', action='store_true',
+        help="Update the existing database in place and emit a delta file for clients"
+    )
+    return parser.parse_args(argv)
+
+
 def main():
+    args = parse_args()
+
     print("=" * 60)
     print("Dictionary Database Builder")
     print("=" * 60)
@@ -293,45 +938,165 @@ def main():
 
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-    # Load processed data
-    print("[1/4] Loading processed data...")
+    if args.incremental and args.profile != 'standard':
+        print("[ERROR] Incremental updates are only supported for the standard profile")
+        return
 
-    all_words_file = OUTPUT_DIR / 'all_words.json'
-    if not all_words_file.exists():
-        print(f"[ERROR] File not found: {all_words_file}")
-        print("Please run process_wiktionary.py first")
+    if args.fused and (args.incremental or args.profile != 'standard'):
+        print("[ERROR] --fused is only supported for full builds of the standard profile")
         return
 
-    words = load_processed_data(all_words_file)
-    print(f"  Loaded {len(words)} words")
+    if args.layout and (args.incremental or args.profile != 'standard'):
+        print("[ERROR] --layout is only supported for full builds of the standard profile")
+        return
 
-    if not words:
-        print("[ERROR] No words to process!")
+    if args.fused:
+        # Parsing happens while the database is populated
+        from fused_build import fused_sources
+
+        print("[1/5] Locating Wiktionary dumps...")
+        sources = [source for source in fused_sources() if source[1].exists()]
+        if not sources:
+            print("[ERROR] No Wiktionary dumps found")
+            print("Please run download_data.py first")
+            return
+        for _, input_path, _, _ in sources:
+            print(f"  Streaming entries from {input_path}")
+        words = None
+    else:
+        # Load processed data
+        print("[1/5] Loading processed data...")
+
+        all_words_file = find_processed_data(OUTPUT_DIR)
+        if all_words_file is None:
+            print(f"[ERROR] File not found: {OUTPUT_DIR / 'all_words.jsonl'}")
+            print("Please run process_wiktionary.py first")
+            return
+
+        words = open_processed_data(all_words_file)
+        print(f"  Reading words from {all_words_file}")
+
+    from search_indexes import SEARCH_STAGES
+    search_stages = [name for name in SEARCH_STAGES if getattr(args, name)]
+    if search_stages and args.profile != 'standard':
+        print("[ERROR] Search index stages are only supported for the standard profile")
         return
 
+    if args.incremental:
+        if not DATABASE_PATH.exists():
+            print(f"[ERROR] No existing database at {DATABASE_PATH} to update")
+            print("Run a full build first")
+            return
+        update_database(DATABASE_PATH, words)
+        return
+
+    if args.profile == 'compact':
+        from compact_database import (
+            create_compact_database,
+            finalize_compact_database,
+            get_compact_stats,
+            populate_compact_database,
+        )
+        db_path = COMPACT_DATABASE_PATH
+        create, finalize, stats_for = (
+            create_compact_database, finalize_compact_database, get_compact_stats
+        )
+        populate = populate_compact_database
+    else:
+        db_path = DATABASE_PATH
+        create, finalize, stats_for = create_database, finalize_database, get_stats
+        populate = populate_database_bulk if args.bulk else populate_database
+
+    if args.layout:
+        # Rows are loaded into a staging database, then copied in layout order
+        from layout_database import (
+            create_layout_database,
+            create_staging_database,
+            finalize_layout_database,
+            report_cold_lookups,
+            write_layout_database,
+        )
+        db_path = LAYOUT_DATABASE_PATH
+        create = create_staging_database
+        finalize = finalize_layout_database
+
+    timings = {}
+
     # Create database
-    print("\n[2/4] Creating database schema...")
-    conn = create_database(DATABASE_PATH)
-    print(f"  Database created at {DATABASE_PATH}")
+    print("\n[2/5] Creating database schema...")
+    start = time.perf_counter()
+    conn = create(db_path)
+    timings['schema'] = time.perf_counter() - start
+    print(f"  Database created at {db_path}")
 
     # Populate database
-    print("\n[3/4] Populating database...")
-    populate_database(conn, words)
+    print("\n[3/5] Populating database...")
+    start = time.perf_counter()
+    if args.fused:
+        from fused_build import populate_database_fused, print_queue_stats
+        from process_wiktionary import resolve_decoder
+
+        word_count, queue_stats = populate_database_fused(
+            conn, sources, args.workers, args.queue_size, resolve_decoder('auto')
+        )
+        print_queue_stats(queue_stats)
+    else:
+        word_count = populate(conn, words)
+    timings['load'] = time.perf_counter() - start
+
+    if not word_count:
+        conn.close()
+        print("[ERROR] No words to process!")
+        return
+
+    if args.layout:
+        print("  Copying rows in layout order...")
+        start = time.perf_counter()
+        conn = create_layout_database(conn, db_path)
+        timings['layout'] = time.perf_counter() - start
+
+    # Indexes, FTS and triggers are built once the data is in place
+    print("\n[4/5] Building indexes and full-text search...")
+    timings.update(finalize(conn))
+
+    stage_options = {'popularity': {'frequency_files': args.frequency_file}}
+    for name in search_stages:
+        build_stage, _ = SEARCH_STAGES[name]
+        print(f"  Building {name}...")
+        start = time.perf_counter()
+        build_stage(conn, **stage_options.get(name, {}))
+        timings[name] = time.perf_counter() - start
 
     # Add metadata
-    add_metadata(conn, len(words))
+    add_metadata(conn, word_count, args.profile)
+    if db_path == DATABASE_PATH:
+        # The rebuilt database starts a new chain; old deltas do not apply to it
+        reset_delta_chain()
+        print(f"  Cleared the previous delta chain in {DELTA_DIR}")
 
     # Optimize
-    print("\n[4/4] Optimizing database...")
-    optimize_database(conn)
+    print("\n[5/5] Optimizing database...")
+    start = time.perf_counter()
+    if args.layout:
+        conn.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES ('layout', 'word_clustered')")
+        page_size = write_layout_database(conn, db_path, args.page_size)
+        print(f"  Wrote {db_path} with VACUUM INTO at page_size {page_size}")
+        conn = sqlite3.connect(db_path)
+    else:
+        optimize_database(conn)
+    timings['optimize'] = time.perf_counter() - start
+
+    for name in search_stages:
+        _, report_stage = SEARCH_STAGES[name]
+        report_stage(conn)
 
     # Get stats
-    stats = get_stats(conn)
+    stats = stats_for(conn)
 
     conn.close()
 
     # Print summary
-    db_size = DATABASE_PATH.stat().st_size / (1024 * 1024)
+    db_size = db_path.stat().st_size / (1024 * 1024)
 
     print()
     print("=" * 60)
@@ -346,10 +1111,24 @@ def main():
     print(f"  - Examples: {stats['examples']:,}")
     print(f"  - Database size: {db_size:.1f} MB")
     print()
-    print(f"Database saved to: {DATABASE_PATH}")
+    print("Build timings:")
+    for phase, seconds in timings.items():
+        print(f"  - {phase}: {seconds:.2f}s")
+    print(f"  - total: {sum(timings.values()):.2f}s")
+    print()
+    if args.profile == 'compact' and DATABASE_PATH.exists():
+        print_size_breakdown("Size breakdown, standard profile", get_size_breakdown(DATABASE_PATH))
+        print()
+    profile_name = 'layout' if args.layout else args.profile
+    print_size_breakdown(f"Size breakdown, {profile_name} profile", get_size_breakdown(db_path))
+    print()
+    if args.layout:
+        report_cold_lookups(DATABASE_PATH, db_path)
+        print()
+    print(f"Database saved to: {db_path}")
     print()
     print("Next step: Copy the database to your Flutter project:")
-    print(f"  cp {DATABASE_PATH} ../assets/database/")
+    print(f"  cp {db_path} ../assets/database/")
     print("=" * 60)
 
 
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Build one database pack per language pair, in parallel, from shared parses.
+
+Every source dump the selected packs need is read and parsed once, by
+process_lines workers in a process pool, keeping the translations all of the
+packs need. Each parsed batch is fanned out to the writer process of every
+pack that uses the source, with translations cut down to the pack's
+languages. A writer deduplicates and inserts rows as they arrive
+(fused_build.write_batches), then builds the indexes and FTS. Writers are fed
+through bounded queues, so a slow pack throttles parsing rather than letting
+a dump pile up in memory.
+"""
+
+import argparse
+import multiprocessing
+import queue
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from tqdm import tqdm
+
+from build_database import (
+    FUSED_QUEUE_SIZE,
+    OUTPUT_DIR,
+    add_metadata,
+    apply_bulk_load_pragmas,
+    create_database,
+    finalize_database,
+    optimize_database,
+    restore_pragmas,
+)
+from fused_build import InstrumentedQueue, parse_batches, print_queue_stats, write_batches
+from language_packs import PACKS, LanguagePack, resolve_packs, sources_for, translation_languages
+from process_wiktionary import (
+    DATA_DIR,
+    find_input_file,
+    lang_code_prefilter,
+    print_parse_stats,
+    resolve_decoder,
+    source_processor,
+)
+
+PACK_DIR = OUTPUT_DIR / 'packs'
+
+# Queue statistics recorded by the parsing side rather than by the writer
+PRODUCER_QUEUE_STATS = ('batches', 'blocked_puts', 'producer_blocked_seconds')
+
+
+def project_rows(rows: List[tuple], languages: tuple) -> List[tuple]:
+    """Keep only the translations into a pack's languages (rows are astuple(ProcessedWord))."""
+    return [
+        row[:4] + ({code: values for code, values in row[4].items() if code in languages},) + row[5:]
+        for row in rows
+    ]
+
+
+def build_pack(pack: LanguagePack, db_path: Path, pack_queue, queue_size: int, results):
+    """Writer process of one pack: load the rows from its queue, then finalize the database."""
+    start = time.perf_counter()
+    try:
+        conn = create_database(db_path)
+        apply_bulk_load_pragmas(conn)
+        batches = InstrumentedQueue(queue_size, backing=pack_queue)
+        try:
+            word_count, entries, replaced = write_batches(conn, batches, progress=False)
+        finally:
+            restore_pragmas(conn)
+
+        finalize_database(conn)
+        add_metadata(conn, word_count, languages=pack.languages)
+        optimize_database(conn)
+        by_language = dict(conn.execute(
+            "SELECT language_code, COUNT(*) FROM words GROUP BY language_code"
+        ))
+        conn.close()
+
+        results.put({
+            'pack': pack.name,
+            'words': word_count,
+            'entries': entries,
+            'replaced': replaced,
+            'by_language': by_language,
+            'queue': batches.stats(),
+            'seconds': time.perf_counter() - start,
+            'output_bytes': db_path.stat().st_size,
+        })
+    except Exception as e:
+        results.put({'pack': pack.name, 'error': repr(e)})
+
+
+def collect_results(results, processes: List, expected: int) -> Dict[str, Dict[str, Any]]:
+    """Gather one result per writer, without hanging on a writer that died."""
+    collected = {}
+    while len(collected) < expected:
+        try:
+            result = results.get(timeout=1)
+        except queue.Empty:
+            if not any(process.is_alive() for process in processes):
+                break
+            continue
+        collected[result['pack']] = result
+    return collected
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Build a dictionary database per language pack, parsing each dump once"
+    )
+    parser.add_argument(
+        '--packs', default=','.join(PACKS),
+        help=f"Comma-separated packs to build (default: all of {', '.join(PACKS)})"
+    )
+    parser.add_argument(
+        '--workers', type=int, default=1,
+        help="Parser processes shared by all packs (default: 1)"
+    )
+    parser.add_argument(
+        '--queue-size', type=int, default=FUSED_QUEUE_SIZE,
+        help=f"Parsed batches buffered per pack writer (default: {FUSED_QUEUE_SIZE})"
+    )
+    parser.add_argument(
+        '--decoder', choices=['auto', 'msgspec', 'json'], default='auto',
+        help="JSON decoder backend; auto uses msgspec when installed (default: auto)"
+    )
+    parser.add_argument(
+        '--output-dir', type=Path, default=PACK_DIR,
+        help=f"Directory for the pack databases (default: {PACK_DIR})"
+    )
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+
+    print("=" * 60)
+    print("Language Pack Builder")
+    print("=" * 60)
+    print()
+
+    try:
+        requested = resolve_packs(args.packs)
+    except KeyError as e:
+        print(f"[ERROR] Unknown language pack: {e.args[0]} (known: {', '.join(PACKS)})")
+        raise SystemExit(1)
+
+    print("[1/3] Planning...")
+    packs = []
+    for pack in requested:
+        missing = [source.name for source in sources_for([pack])
+                   if not find_input_file(DATA_DIR, source.name).exists()]
+        if missing:
+            print(f"  [SKIP] {pack.name}: no dump for {', '.join(missing)} "
+                  f"(run download_data.py --packs {pack.name})")
+        else:
+            packs.append(pack)
+    if not packs:
+        print("[ERROR] No language pack has its dumps downloaded")
+        raise SystemExit(1)
+
+    sources = sources_for(packs)
+    consumers = {
+        source.name: [pack for pack in packs if source.lang_code in pack.languages]
+        for source in sources
+    }
+    # Rows go to a pack unchanged when it needs every translation the parse keeps
+    needs_projection = {
+        (source.name, pack.name):
+            translation_languages(source, [pack]) != translation_languages(source, packs)
+        for source in sources for pack in consumers[source.name]
+    }
+    for source in sources:
+        names = ', '.join(pack.name for pack in consumers[source.name])
+        print(f"  {find_input_file(DATA_DIR, source.name)}: parsed once for {names}")
+
+    parse_sources = [
+        (source.name, find_input_file(DATA_DIR, source.name), source_processor(source, packs),
+         lang_code_prefilter(source.lang_code))
+        for source in sources
+    ]
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    writers = {}
+    for pack in packs:
+        pack_queue = context.Queue(args.queue_size)
+        process = context.Process(
+            target=build_pack,
+            args=(pack, args.output_dir / pack.database_name, pack_queue, args.queue_size, results),
+        )
+        process.start()
+        writers[pack.name] = (InstrumentedQueue(args.queue_size, backing=pack_queue, consumer=process),
+                              pack_queue, process)
+
+    print(f"\n[2/3] Parsing {len(sources)} dump(s) into {len(packs)} pack(s)...")
+    start = time.perf_counter()
+    parse_stats = {}
+    stopped = set()
+
+    def send(pack_name: str, item):
+        channel, pack_queue, _ = writers[pack_name]
+        if pack_name not in stopped and not channel.put(item):
+            # The writer is gone; do not wait on exit to flush batches it will never read
+            pack_queue.cancel_join_thread()
+            stopped.add(pack_name)
+
+    try:
+        with tqdm(desc="Parsing", unit='entry') as pbar:
+            for name, rows in parse_batches(parse_sources, max(args.workers, 1),
+                                            resolve_decoder(args.decoder), parse_stats):
+                for pack in consumers[name]:
+                    if needs_projection[(name, pack.name)]:
+                        send(pack.name, project_rows(rows, pack.languages))
+                    else:
+                        send(pack.name, rows)
+                pbar.update(len(rows))
+        for pack_name in writers:
+            send(pack_name, None)
+    except Exception as e:
+        # Fail every writer, rather than leave it with a truncated pack
+        for pack_name in writers:
+            send(pack_name, e)
+        print(f"[ERROR] Parsing failed: {e!r}")
+
+    packs_done = collect_results(results, [process for _, _, process in writers.values()], len(writers))
+    for _, _, process in writers.values():
+        process.join()
+    elapsed = time.perf_counter() - start
+
+    for name, stats in parse_stats.items():
+        print(f"  {name}:")
+        print_parse_stats(stats)
+
+    print("\n[3/3] Packs:")
+    failed = []
+    for pack in packs:
+        channel, _, _ = writers[pack.name]
+        result = packs_done.get(pack.name)
+        if result is None or 'error' in result:
+            failed.append(pack.name)
+            reason = result['error'] if result else "writer process exited unexpectedly"
+            print(f"  [ERROR] {pack.name}: {reason}")
+            continue
+
+        by_language = ', '.join(f"{code} {count:,}" for code, count in sorted(result['by_language'].items()))
+        print(f"  [OK] {pack.name}: {result['words']:,} words ({by_language}), "
+              f"{result['output_bytes'] / (1024 * 1024):.1f} MB in {result['seconds']:.1f}s "
+              f"-> {args.output_dir / pack.database_name}")
+        print(f"    {result['entries']:,} entries received, "
+              f"{result['replaced']:,} replaced by a better duplicate")
+        queue_stats = dict(result['queue'])
+        queue_stats.update({key: channel.stats()[key] for key in PRODUCER_QUEUE_STATS})
+        print_queue_stats(queue_stats)
+
+    print()
+    print("=" * 60)
+    if failed:
+        print(f"[ERROR] Failed packs: {', '.join(failed)}")
+        print("=" * 60)
+        raise SystemExit(1)
+    print(f"Built {len(packs)} pack(s) in {elapsed:.1f}s")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Size-optimized ("compact") profile for the dictionary database.
+
+Used by `build_database.py --profile compact`. Compared with the standard
+schema this profile:
+1. Interns part-of-speech and language codes into small lookup tables
+2. Stores each distinct definition / example text once, in `texts`
+3. Keys child tables by (word_id, order) in WITHOUT ROWID tables, which
+   makes the separate word_id indexes unnecessary
+4. Drops the per-row `created_at` timestamp from `words`
+
+The rows live in compact_* tables. Views named words, definitions,
+translations and examples expose them with the standard columns, so the
+app's queries run unchanged.
+"""
+
+import hashlib
+import sqlite3
+import time
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, Iterable
+
+from tqdm import tqdm
+
+from build_database import (
+    BULK_BATCH_SIZE,
+    apply_bulk_load_pragmas,
+    create_fts_triggers,
+    rebuild_fts,
+    restore_pragmas,
+)
+
+COMPACT_INSERTS = {
+    'languages': "INSERT INTO languages (id, code) VALUES (?, ?)",
+    'parts_of_speech': "INSERT INTO parts_of_speech (id, name) VALUES (?, ?)",
+    'texts': "INSERT INTO texts (id, text) VALUES (?, ?)",
+    'words': "INSERT INTO compact_words (id, word, language_id, pos_id, pronunciation_ipa, etymology) "
+             "VALUES (?, ?, ?, ?, ?, ?)",
+    'definitions': "INSERT INTO compact_definitions (word_id, order_index, text_id) VALUES (?, ?, ?)",
+    'translations': "INSERT INTO compact_translations (word_id, language_id, order_index, translation) "
+                    "VALUES (?, ?, ?, ?)",
+    'examples': "INSERT INTO compact_examples (word_id, order_index, text_id) VALUES (?, ?, ?)",
+}
+
+# Child rows have no id column; the views derive one from the primary key.
+# Order indexes stay below CHILD_ID_STRIDE and language ids below 256.
+CHILD_ID_STRIDE = 65536
+
+# The standard schema's tables, as views over the compact tables
+COMPAT_VIEWS = {
+    'words': """
+        CREATE VIEW words AS
+        SELECT w.id, w.word, l.code AS language_code, p.name AS pos, w.pronunciation_ipa,
+               w.etymology,
+               NULL AS created_at
+        FROM compact_words w
+        JOIN languages l ON l.id = w.language_id
+        LEFT JOIN parts_of_speech p ON p.id = w.pos_id
+    """,
+    'definitions': f"""
+        CREATE VIEW definitions AS
+        SELECT d.word_id * {CHILD_ID_STRIDE} + d.order_index AS id, d.word_id,
+               t.text AS definition, d.order_index
+        FROM compact_definitions d
+        JOIN texts t ON t.id = d.text_id
+    """,
+    'translations': f"""
+        CREATE VIEW translations AS
+        SELECT (t.word_id * 256 + t.language_id) * {CHILD_ID_STRIDE} + t.order_index AS id,
+               t.word_id AS source_word_id, l.code AS target_language_code, t.translation
+        FROM compact_translations t
+        JOIN languages l ON l.id = t.language_id
+    """,
+    'examples': f"""
+        CREATE VIEW examples AS
+        SELECT e.word_id * {CHILD_ID_STRIDE} + e.order_index AS id, e.word_id,
+               t.text AS example_text
+        FROM compact_examples e
+        JOIN texts t ON t.id = e.text_id
+    """,
+}
+
+
+def create_compact_database(db_path: Path) -> sqlite3.Connection:
+    """Create the compact schema. Indexes and FTS contents come after the load."""
+    if db_path.exists():
+        db_path.unlink()
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    cursor.execute("PRAGMA foreign_keys = ON;")
+
+    cursor.execute("""
+        CREATE TABLE languages (
+            id INTEGER PRIMARY KEY,
+            code TEXT NOT NULL UNIQUE
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE parts_of_speech (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        )
+    """)
+
+    # Shared definition and example text, stored once per distinct string
+    cursor.execute("""
+        CREATE TABLE texts (
+            id INTEGER PRIMARY KEY,
+            text TEXT NOT NULL
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE compact_words (
+            id INTEGER PRIMARY KEY,
+            word TEXT NOT NULL,
+            language_id INTEGER NOT NULL REFERENCES languages(id),
+            pos_id INTEGER REFERENCES parts_of_speech(id),
+            pronunciation_ipa TEXT,
+            etymology TEXT,
+            UNIQUE(word, language_id, pos_id)
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE compact_definitions (
+            word_id INTEGER NOT NULL REFERENCES compact_words(id) ON DELETE CASCADE,
+            order_index INTEGER NOT NULL,
+            text_id INTEGER NOT NULL REFERENCES texts(id),
+            PRIMARY KEY (word_id, order_index)
+        ) WITHOUT ROWID
+    """)
+
+    cursor.execute("""
+        CREATE TABLE compact_translations (
+            word_id INTEGER NOT NULL REFERENCES compact_words(id) ON DELETE CASCADE,
+            language_id INTEGER NOT NULL REFERENCES languages(id),
+            order_index INTEGER NOT NULL,
+            translation TEXT NOT NULL,
+            PRIMARY KEY (word_id, language_id, order_index)
+        ) WITHOUT ROWID
+    """)
+
+    cursor.execute("""
+        CREATE TABLE compact_examples (
+            word_id INTEGER NOT NULL REFERENCES compact_words(id) ON DELETE CASCADE,
+            order_index INTEGER NOT NULL,
+            text_id INTEGER NOT NULL REFERENCES texts(id),
+            PRIMARY KEY (word_id, order_index)
+        ) WITHOUT ROWID
+    """)
+
+    # User tables are written by the app, so they keep the standard layout
+    cursor.execute("""
+        CREATE TABLE favorites (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            word_id INTEGER NOT NULL UNIQUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (word_id) REFERENCES compact_words(id) ON DELETE CASCADE
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE search_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            word_id INTEGER NOT NULL,
+            searched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (word_id) REFERENCES compact_words(id) ON DELETE CASCADE
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE metadata (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        ) WITHOUT ROWID
+    """)
+
+    cursor.execute("""
+        CREATE VIRTUAL TABLE words_fts USING fts5(
+            word,
+            content='compact_words',
+            content_rowid='id',
+            tokenize='unicode61'
+        )
+    """)
+
+    for view in COMPAT_VIEWS.values():
+        cursor.execute(view)
+
+    conn.commit()
+    return conn
+
+
+def populate_compact_database(conn: sqlite3.Connection, words: Iterable[Dict[str, Any]],
+                              batch_size: int = BULK_BATCH_SIZE) -> int:
+    """Load word records into the compact schema. Returns the number consumed."""
+    cursor = conn.cursor()
+    apply_bulk_load_pragmas(conn)
+
+    buffers = {table: [] for table in COMPACT_INSERTS}
+    language_ids = {}
+    pos_ids = {}
+    # Keyed by a 16-byte digest rather than the text, to keep memory bounded
+    text_ids = {}
+    word_ids = {}
+    next_word_id = 1
+    count = 0
+
+    def intern(table: str, ids: Dict, value: str) -> int:
+        if value not in ids:
+            ids[value] = len(ids) + 1
+            buffers[table].append((ids[value], value))
+        return ids[value]
+
+    def text_id(text: str) -> int:
+        digest = hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+        if digest not in text_ids:
+            text_ids[digest] = len(text_ids) + 1
+            buffers['texts'].append((text_ids[digest], text))
+        return text_ids[digest]
+
+    def flush():
+        for table, rows in buffers.items():
+            if rows:
+                cursor.executemany(COMPACT_INSERTS[table], rows)
+                rows.clear()
+        conn.commit()
+
+    for word_data in tqdm(words, desc="Inserting words", unit='word'):
+        count += 1
+
+        language_id = intern('languages', language_ids, word_data['language'])
+        pos = word_data['pos']
+        pos_id = intern('parts_of_speech', pos_ids, pos) if pos is not None else None
+
+        # Duplicate keys keep the first record, as INSERT OR IGNORE does;
+        # NULL pos never collides in UNIQUE, so those words are all kept
+        key = (word_data['word'], language_id, pos_id)
+        if key in word_ids:
+            continue
+        word_id = next_word_id
+        next_word_id += 1
+        if pos_id is not None:
+            word_ids[key] = word_id
+
+        buffers['words'].append((
+            word_id,
+            word_data['word'],
+            language_id,
+            pos_id,
+            word_data.get('pronunciation_ipa'),
+            word_data.get('etymology'),
+        ))
+
+        for idx, definition in enumerate(word_data.get('definitions', [])):
+            buffers['definitions'].append((word_id, idx, text_id(definition)))
+
+        for lang_code, translations in word_data.get('translations', {}).items():
+            target_id = intern('languages', language_ids, lang_code)
+            for idx, translation in enumerate(translations):
+                buffers['translations'].append((word_id, target_id, idx, translation))
+
+        for idx, example in enumerate(word_data.get('examples', [])):
+            buffers['examples'].append((word_id, idx, text_id(example)))
+
+        if any(len(rows) >= batch_size for rows in buffers.values()):
+            flush()
+
+    flush()
+    restore_pragmas(conn)
+    return count
+
+
+def create_compact_indexes(conn: sqlite3.Connection):
+    """Create the indexes the compact profile needs.
+
+    Child tables are clustered on word_id by their primary keys, and the
+    UNIQUE(word, language_id, pos_id) index already serves headword lookups,
+    so only the user tables need secondary indexes.
+    """
+    cursor = conn.cursor()
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_favorites_word ON favorites(word_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_history_word ON search_history(word_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_history_date ON search_history(searched_at)")
+    conn.commit()
+
+
+def get_compact_stats(conn: sqlite3.Connection) -> Dict[str, int]:
+    """Get database statistics, matching build_database.get_stats."""
+    cursor = conn.cursor()
+
+    stats = {}
+
+    for key, code in (('english_words', 'en'), ('hindi_words', 'hi')):
+        cursor.execute("""
+            SELECT COUNT(*) FROM compact_words
+            JOIN languages ON languages.id = compact_words.language_id
+            WHERE languages.code = ?
+        """, (code,))
+        stats[key] = cursor.fetchone()[0]
+
+    for key, table in (
+        ('total_words', 'compact_words'),
+        ('definitions', 'compact_definitions'),
+        ('translations', 'compact_translations'),
+        ('examples', 'compact_examples'),
+        ('distinct_texts', 'texts'),
+    ):
+        cursor.execute(f"SELECT COUNT(*) FROM {table}")
+        stats[key] = cursor.fetchone()[0]
+
+    return stats
+
+
+def finalize_compact_database(conn: sqlite3.Connection) -> Dict[str, float]:
+    """Build indexes, FTS contents and triggers; returns per-phase timings."""
+    timings = {}
+    for phase, func in (
+        ('indexes', create_compact_indexes),
+        ('fts_rebuild', rebuild_fts),
+        ('fts_triggers', partial(create_fts_triggers, table='compact_words')),
+    ):
+        start = time.perf_counter()
+        func(conn)
+        timings[phase] = time.perf_counter() - start
+    return timings
@@ -4,48 +4,256 @@ Download Wiktionary data from kaikki.org
 
 This script downloads pre-extracted Wiktionary data in JSONL format.
 The data is already processed by wiktextract, making it easy to filter.
+
+Downloads are resumable (HTTP Range on a .part file), conditional (ETag /
+Last-Modified, so unchanged dumps are not fetched again) and run concurrently.
 """
 
+import argparse
+import json
 import os
-import requests
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
 from pathlib import Path
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
 from tqdm import tqdm
 
-# URLs for Wiktionary extracts from kaikki.org
-DATA_URLS = {
-    # English Wiktionary - contains Hindi words with English definitions
-    'english': 'https://kaikki.org/dictionary/English/kaikki.org-dictionary-English.jsonl',
-    # Hindi Wiktionary - contains Hindi definitions
-    'hindi': 'https://kaikki.org/dictionary/Hindi/kaikki.org-dictionary-Hindi.jsonl',
-}
+from language_packs import DEFAULT_PACK, PACKS, resolve_packs, sources_for
+
+# URLs for the Wiktionary extracts of the default pack, from kaikki.org
+DATA_URLS = {source.name: source.url for source in sources_for([PACKS[DEFAULT_PACK]])}
 
 OUTPUT_DIR = Path(__file__).parent / 'data'
 
+# Suffix appended to the source URL and the saved file name for each format.
+# Compressed dumps are kept as-is; process_wiktionary.py reads them directly.
+COMPRESSION_SUFFIXES = {
+    'none': '',
+    'gz': '.gz',
+    'zst': '.zst',
+}
+
+CHUNK_SIZE = 1024 * 1024
+MAX_RETRIES = 5
+RETRY_DELAY = 2.0
+REQUEST_TIMEOUT = 60
+
+
+def create_session(pool_size: int = len(DATA_URLS)) -> requests.Session:
+    """Create an HTTP session with a connection pool sized for concurrent downloads."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def meta_path_for(output_path: Path) -> Path:
+    """Path of the sidecar file holding the validators for a download."""
+    return output_path.with_name(output_path.name + '.meta.json')
+
 
-def download_file(url: str, output_path: Path) -> bool:
-    """Download a file with progress bar."""
+def partial_path_for(output_path: Path) -> Path:
+    """Path of the in-progress download for a file."""
+    return output_path.with_name(output_path.name + '.part')
+
+
+def load_meta(output_path: Path) -> Dict:
+    """Load the saved validators for a download, if any."""
+    meta_path = meta_path_for(output_path)
+    if not meta_path.exists():
+        return {}
     try:
-        response = requests.get(url, stream=True)
-        response.raise_for_status()
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_meta(output_path: Path, meta: Dict):
+    """Save the validators for a download."""
+    with open(meta_path_for(output_path), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+
+def response_validators(response: requests.Response) -> Dict[str, Optional[str]]:
+    """Extract the cache validators from a response."""
+    return {
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+    }
+
+
+def content_range_start(response: requests.Response) -> Optional[int]:
+    """First byte position of a 206 response, from `Content-Range: bytes a-b/n`."""
+    match = re.match(r'bytes\s+(\d+)-\d+/(\d+|\*)', response.headers.get('Content-Range', ''))
+    return int(match.group(1)) if match else None
+
+
+def discard_partial(output_path: Path, meta: Dict):
+    """Drop an unusable partial download so the next attempt starts from byte 0."""
+    partial_path_for(output_path).unlink(missing_ok=True)
+    meta.pop('partial', None)
+    save_meta(output_path, meta)
+
+
+def build_request_headers(output_path: Path, meta: Dict) -> Dict[str, str]:
+    """Build conditional and range headers from what is already on disk."""
+    headers = {}
+    partial_path = partial_path_for(output_path)
+    partial = meta.get('partial') or {}
+    partial_validator = partial.get('etag') or partial.get('last_modified')
+
+    if partial_path.exists() and partial_validator:
+        # Resume; If-Range makes the server send the full file if it changed
+        headers['Range'] = f'bytes={partial_path.stat().st_size}-'
+        headers['If-Range'] = partial_validator
+    elif output_path.exists():
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        elif not meta.get('etag'):
+            # Downloaded before validators were recorded: fall back to the file time
+            headers['If-Modified-Since'] = formatdate(output_path.stat().st_mtime, usegmt=True)
 
-        total_size = int(response.headers.get('content-length', 0))
+    return headers
 
-        output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(output_path, 'wb') as f:
-            with tqdm(total=total_size, unit='B', unit_scale=True, desc=output_path.name) as pbar:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        pbar.update(len(chunk))
+def download_file(url: str, output_path: Path, session: Optional[requests.Session] = None,
+                  position: int = 0) -> str:
+    """Download a file with progress bar.
 
-        return True
-    except Exception as e:
-        print(f"Error downloading {url}: {e}")
-        return False
+    Returns 'downloaded', 'resumed', 'not-modified' or 'failed'.
+    """
+    session = session or create_session()
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    partial_path = partial_path_for(output_path)
+    resumed = False
+
+    for attempt in range(1, MAX_RETRIES + 1):
+        meta = load_meta(output_path)
+        headers = build_request_headers(output_path, meta)
+
+        try:
+            with session.get(url, headers=headers, stream=True, timeout=REQUEST_TIMEOUT) as response:
+                if response.status_code == 304:
+                    return 'not-modified'
+
+                if response.status_code == 416:
+                    # Partial file is unusable for this resource; start over
+                    discard_partial(output_path, meta)
+                    continue
+
+                response.raise_for_status()
+
+                if response.status_code == 206:
+                    initial = partial_path.stat().st_size if partial_path.exists() else 0
+                    if content_range_start(response) != initial:
+                        # Appending a range that does not start where the file ends
+                        # would corrupt the dump
+                        discard_partial(output_path, meta)
+                        continue
+                    mode = 'ab'
+                    resumed = True
+                else:
+                    mode = 'wb'
+                    initial = 0
+                    meta['partial'] = response_validators(response)
+                    save_meta(output_path, meta)
+
+                total_size = initial + int(response.headers.get('content-length', 0))
+
+                with open(partial_path, mode) as f:
+                    with tqdm(total=total_size, initial=initial, unit='B', unit_scale=True,
+                              desc=output_path.name, position=position, leave=True) as pbar:
+                        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                            if chunk:
+                                f.write(chunk)
+                                pbar.update(len(chunk))
+
+                if total_size and partial_path.stat().st_size < total_size:
+                    raise requests.exceptions.ChunkedEncodingError("Connection closed early")
+
+                os.replace(partial_path, output_path)
+                meta = response_validators(response)
+                meta['url'] = url
+                save_meta(output_path, meta)
+                return 'resumed' if resumed else 'downloaded'
+
+        except (requests.exceptions.ConnectionError,
+                requests.exceptions.ChunkedEncodingError,
+                requests.exceptions.Timeout) as e:
+            if attempt == MAX_RETRIES:
+                print(f"Error downloading {url}: {e}")
+                return 'failed'
+            # Keep the partial file; the next attempt resumes from it
+            time.sleep(RETRY_DELAY * attempt)
+        except Exception as e:
+            print(f"Error downloading {url}: {e}")
+            return 'failed'
+
+    return 'failed'
+
+
+def output_path_for(output_dir: Path, name: str, compression: str = 'none') -> Path:
+    """Local path a source is saved to."""
+    return output_dir / f'{name}_wiktionary.jsonl{COMPRESSION_SUFFIXES[compression]}'
+
+
+def download_all(urls: Dict[str, str], output_dir: Path, workers: int = 0,
+                 compression: str = 'none') -> Dict[str, str]:
+    """Download every source concurrently; returns the status for each name."""
+    workers = workers or len(urls)
+    suffix = COMPRESSION_SUFFIXES[compression]
+    session = create_session(pool_size=workers)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            name: executor.submit(
+                download_file, url + suffix, output_path_for(output_dir, name, compression),
+                session, position
+            )
+            for position, (name, url) in enumerate(urls.items())
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Download Wiktionary data from kaikki.org")
+    parser.add_argument(
+        '--packs', default=DEFAULT_PACK,
+        help=f"Comma-separated language packs to fetch the dumps of; "
+             f"one of {', '.join(PACKS)} (default: {DEFAULT_PACK})"
+    )
+    parser.add_argument(
+        '--source', action='append', default=[], metavar='NAME=URL',
+        help="Override or add a source URL, e.g. english=http://localhost:8000/en.jsonl"
+    )
+    parser.add_argument(
+        '--output-dir', type=Path, default=OUTPUT_DIR,
+        help=f"Directory to save downloads to (default: {OUTPUT_DIR})"
+    )
+    parser.add_argument(
+        '--workers', type=int, default=0,
+        help="Number of concurrent downloads (default: one per source)"
+    )
+    parser.add_argument(
+        '--compression', choices=list(COMPRESSION_SUFFIXES), default='none',
+        help="Fetch and keep the compressed variant of each dump (default: none)"
+    )
+    return parser.parse_args(argv)
 
 
 def main():
+    args = parse_args()
+
     print("=" * 60)
     print("Wiktionary Data Downloader")
     print("=" * 60)
@@ -54,23 +262,33 @@ def main():
     print("(Pre-extracted Wiktionary dumps)")
     print()
 
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    try:
+        packs = resolve_packs(args.packs)
+    except KeyError as e:
+        print(f"[ERROR] Unknown language pack: {e.args[0]} (known: {', '.join(PACKS)})")
+        return
 
-    for name, url in DATA_URLS.items():
-        output_file = OUTPUT_DIR / f'{name}_wiktionary.jsonl'
+    urls = {source.name: source.url for source in sources_for(packs)}
+    for source in args.source:
+        name, _, url = source.partition('=')
+        urls[name] = url
 
-        if output_file.exists():
-            print(f"[SKIP] {name}: File already exists at {output_file}")
-            continue
+    for name, url in urls.items():
+        print(f"[DOWNLOAD] {name}: {url}{COMPRESSION_SUFFIXES[args.compression]}")
 
-        print(f"[DOWNLOAD] {name}: {url}")
-        success = download_file(url, output_file)
+    results = download_all(urls, args.output_dir, args.workers, args.compression)
 
-        if success:
-            size_mb = output_file.stat().st_size / (1024 * 1024)
-            print(f"[OK] Downloaded {size_mb:.1f} MB to {output_file}")
-        else:
+    print()
+    for name, status in results.items():
+        output_file = output_path_for(args.output_dir, name, args.compression)
+        if status == 'not-modified':
+            print(f"[SKIP] {name}: Up to date at {output_file}")
+        elif status == 'failed':
             print(f"[FAIL] Failed to download {name}")
+        else:
+            size_mb = output_file.stat().st_size / (1024 * 1024)
+            verb = 'Resumed' if status == 'resumed' else 'Downloaded'
+            print(f"[OK] {verb} {size_mb:.1f} MB to {output_file}")
 
     print()
     print("=" * 60)
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Export a compact, memory-mappable word index for instant autocomplete.
+
+This script:
+1. Reads headwords from the built dictionary.db
+2. Writes one front-coded sorted index per language (word_index_<lang>.bin)
+3. Benchmarks top-k prefix completion against the SQLite LIKE prefix query
+
+File layout (all integers little-endian):
+
+    header   magic "WIDX", then u32 version, entry_count, block_size,
+             block_count, hot_count, hot_chars, top_k
+    u32[block_count]   offset of each block, from the start of the file
+    u32[hot_count]     offset of each hot-prefix record
+    blocks   block_size entries each. An entry is:
+               varint shared      bytes shared with the previous key
+                                  (0 for the first entry of a block)
+               varint suffix_len, suffix bytes
+               varint word_id, varint score
+               varint display_len, display bytes (0 = same as the key)
+    hot      for every prefix of up to hot_chars characters:
+               varint prefix_len, prefix bytes, varint n,
+               then n entries as above with shared = 0
+
+Keys are search keys (search_indexes.normalize_search_key) in UTF-8 and
+sorted bytewise, so a prefix match is a contiguous run. Short prefixes, which
+match too many entries to rank on the fly, are answered from the precomputed
+hot-prefix table.
+"""
+
+import argparse
+import heapq
+import mmap
+import sqlite3
+import struct
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from search_indexes import (
+    BENCHMARK_QUERIES,
+    measure_latency,
+    normalize_search_key,
+    print_latency,
+)
+
+OUTPUT_DIR = Path(__file__).parent / 'output'
+DATABASE_PATH = OUTPUT_DIR / 'dictionary.db'
+
+MAGIC = b'WIDX'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4s7I')
+
+BLOCK_SIZE = 16
+HOT_PREFIX_CHARS = 2
+TOP_K = 10
+
+# (key bytes, word_id, score, display bytes or b'' if equal to the key)
+Entry = Tuple[bytes, int, int, bytes]
+
+
+def encode_varint(value: int, out: bytearray):
+    """Append an unsigned LEB128 varint."""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_varint(buf, pos: int) -> Tuple[int, int]:
+    """Read an unsigned LEB128 varint; returns (value, new position)."""
+    result = 0
+    shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def encode_entry(entry: Entry, previous_key: bytes, out: bytearray):
+    """Append one front-coded entry."""
+    key, word_id, score, display = entry
+    shared = 0
+    limit = min(len(key), len(previous_key))
+    while shared < limit and key[shared] == previous_key[shared]:
+        shared += 1
+
+    encode_varint(shared, out)
+    encode_varint(len(key) - shared, out)
+    out += key[shared:]
+    encode_varint(word_id, out)
+    encode_varint(score, out)
+    encode_varint(len(display), out)
+    out += display
+
+
+def load_entries(conn: sqlite3.Connection, language_code: str) -> List[Entry]:
+    """Read the headwords of one language with a ranking score.
+
+    Uses words.score when the database was built with --popularity, and
+    otherwise counts definitions, translations and examples, which is the
+    same signal deduplicate_words uses to pick the better duplicate.
+    """
+    richness = """
+        (SELECT COUNT(*) FROM definitions d WHERE d.word_id = w.id)
+      + (SELECT COUNT(*) FROM translations t WHERE t.source_word_id = w.id)
+      + (SELECT COUNT(*) FROM examples e WHERE e.word_id = w.id)
+    """
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(words)")]
+    score = f"COALESCE(w.score, {richness})" if 'score' in columns else richness
+    rows = conn.execute(f"""
+        SELECT w.id, w.word, {score}
+        FROM words w
+        WHERE w.language_code = ?
+    """, (language_code,))
+
+    entries = []
+    for word_id, word, score in rows:
+        key = normalize_search_key(word).encode('utf-8')
+        display = word.encode('utf-8')
+        entries.append((key, word_id, score, b'' if display == key else display))
+
+    entries.sort(key=lambda e: (e[0], -e[2], e[1]))
+    return entries
+
+
+def top_entries(entries: List[Entry], k: int) -> List[Entry]:
+    """Highest-scoring entries, ties broken by key then id."""
+    return heapq.nsmallest(k, entries, key=lambda e: (-e[2], e[0], e[1]))
+
+
+def build_hot_prefixes(entries: List[Entry], max_chars: int, k: int) -> Dict[bytes, List[Entry]]:
+    """Precompute the top-k completions for every prefix of up to max_chars characters."""
+    candidates: Dict[bytes, List[Entry]] = {}
+    for entry in entries:
+        key_text = entry[0].decode('utf-8')
+        for length in range(1, min(max_chars, len(key_text)) + 1):
+            candidates.setdefault(key_text[:length].encode('utf-8'), []).append(entry)
+    return {prefix: top_entries(group, k) for prefix, group in sorted(candidates.items())}
+
+
+def write_index(entries: List[Entry], output_path: Path, block_size: int = BLOCK_SIZE,
+                hot_chars: int = HOT_PREFIX_CHARS, top_k: int = TOP_K):
+    """Write entries (already sorted by key) as a front-coded index file."""
+    hot = build_hot_prefixes(entries, hot_chars, top_k)
+
+    blocks = bytearray()
+    block_offsets = []
+    previous_key = b''
+    for i, entry in enumerate(entries):
+        if i % block_size == 0:
+            block_offsets.append(len(blocks))
+            previous_key = b''
+        encode_entry(entry, previous_key, blocks)
+        previous_key = entry[0]
+
+    hot_data = bytearray()
+    hot_offsets = []
+    for prefix, top in hot.items():
+        hot_offsets.append(len(hot_data))
+        encode_varint(len(prefix), hot_data)
+        hot_data += prefix
+        encode_varint(len(top), hot_data)
+        for entry in top:
+            encode_entry(entry, b'', hot_data)
+
+    blocks_start = HEADER.size + 4 * (len(block_offsets) + len(hot_offsets))
+    hot_start = blocks_start + len(blocks)
+
+    with open(output_path, 'wb') as f:
+        f.write(HEADER.pack(
+            MAGIC, FORMAT_VERSION, len(entries), block_size,
+            len(block_offsets), len(hot_offsets), hot_chars, top_k,
+        ))
+        f.write(struct.pack(f'<{len(block_offsets)}I', *(blocks_start + o for o in block_offsets)))
+        f.write(struct.pack(f'<{len(hot_offsets)}I', *(hot_start + o for o in hot_offsets)))
+        f.write(blocks)
+        f.write(hot_data)
+
+
+class WordIndex:
+    """Read-only, memory-mapped reader for an exported word index."""
+
+    def __init__(self, path: Path):
+        self._file = open(path, 'rb')
+        self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, self.entry_count, self.block_size, self.block_count,
+         self.hot_count, self.hot_chars, self.top_k) = HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"Not a word index file: {path}")
+
+        self._block_table = HEADER.size
+        self._hot_table = self._block_table + 4 * self.block_count
+
+    def close(self):
+        self._buf.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _offset(self, table: int, i: int) -> int:
+        return struct.unpack_from('<I', self._buf, table + 4 * i)[0]
+
+    def _read_entry(self, pos: int, previous_key: bytes) -> Tuple[Entry, int]:
+        buf = self._buf
+        shared, pos = decode_varint(buf, pos)
+        suffix_len, pos = decode_varint(buf, pos)
+        key = previous_key[:shared] + buf[pos:pos + suffix_len]
+        pos += suffix_len
+        word_id, pos = decode_varint(buf, pos)
+        score, pos = decode_varint(buf, pos)
+        display_len, pos = decode_varint(buf, pos)
+        display = buf[pos:pos + display_len]
+        return (key, word_id, score, display), pos + display_len
+
+    def _block_first_key(self, block: int) -> bytes:
+        entry, _ = self._read_entry(self._offset(self._block_table, block), b'')
+        return entry[0]
+
+    def _hot_lookup(self, prefix: bytes) -> Optional[List[Entry]]:
+        lo, hi = 0, self.hot_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            pos = self._offset(self._hot_table, mid)
+            length, pos = decode_varint(self._buf, pos)
+            candidate = self._buf[pos:pos + length]
+            if candidate < prefix:
+                lo = mid + 1
+            elif candidate > prefix:
+                hi = mid
+            else:
+                count, pos = decode_varint(self._buf, pos + length)
+                entries = []
+                for _ in range(count):
+                    entry, pos = self._read_entry(pos, b'')
+                    entries.append(entry)
+                return entries
+        return None
+
+    def _iter_from(self, prefix: bytes):
+        """Yield entries in key order, starting at the block that may hold `prefix`."""
+        # Last block whose first key is < prefix; keys equal to the prefix may
+        # continue from the end of the block before one that starts with it
+        lo, hi = 0, self.block_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._block_first_key(mid) < prefix:
+                lo = mid + 1
+            else:
+                hi = mid
+        block = max(lo - 1, 0)
+
+        remaining = self.entry_count - block * self.block_size
+        pos = self._offset(self._block_table, block) if self.block_count else 0
+        previous_key = b''
+        for i in range(remaining):
+            if i and i % self.block_size == 0:
+                previous_key = b''
+            entry, pos = self._read_entry(pos, previous_key)
+            previous_key = entry[0]
+            yield entry
+
+    def complete(self, prefix: str, k: int = TOP_K) -> List[Tuple[str, int, int]]:
+        """Top-k completions for a prefix as (word, word_id, score)."""
+        key = normalize_search_key(prefix).encode('utf-8')
+        if not key:
+            return []
+
+        entries = None
+        if k <= self.top_k and len(key.decode('utf-8')) <= self.hot_chars:
+            hot = self._hot_lookup(key)
+            entries = hot[:k] if hot is not None else []
+        if entries is None:
+            matches = []
+            for entry in self._iter_from(key):
+                if entry[0].startswith(key):
+                    matches.append(entry)
+                elif entry[0] > key:
+                    break
+            entries = top_entries(matches, k)
+
+        return [
+            ((display or key_bytes).decode('utf-8'), word_id, score)
+            for key_bytes, word_id, score, display in entries
+        ]
+
+
+def benchmark_word_index(conn: sqlite3.Connection, index_path: Path, language_code: str,
+                         limit: int = TOP_K):
+    """Compare index completion latency with the LIKE prefix query SearchDao issues."""
+    words = [
+        row[0] for row in conn.execute(
+            "SELECT word FROM words WHERE language_code = ? ORDER BY random() LIMIT ?",
+            (language_code, BENCHMARK_QUERIES),
+        )
+    ]
+    if not words:
+        return
+
+    # Mix short, high-fanout prefixes with longer, selective ones
+    prefixes = [word[:1 + i % 4] for i, word in enumerate(words)]
+
+    like = measure_latency(
+        lambda q: conn.execute(
+            "SELECT id, word, language_code, pos FROM words "
+            "WHERE word LIKE ? AND language_code = ? ORDER BY word LIMIT ?",
+            (f'{q}%', language_code, limit),
+        ).fetchall(),
+        prefixes,
+    )
+    with WordIndex(index_path) as index:
+        indexed = measure_latency(lambda q: index.complete(q, limit), prefixes)
+
+    print(f"  Top-{limit} prefix completion latency ({language_code}):")
+    print_latency("SQLite LIKE 'q%'", like)
+    print_latency("word index", indexed)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Export a compact autocomplete word index")
+    parser.add_argument(
+        '--database', type=Path, default=DATABASE_PATH,
+        help=f"Database to export from (default: {DATABASE_PATH})"
+    )
+    parser.add_argument(
+        '--languages', default='en,hi',
+        help="Comma-separated language codes to export (default: en,hi)"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print("=" * 60)
+    print("Word Index Exporter")
+    print("=" * 60)
+    print()
+
+    if not args.database.exists():
+        print(f"[ERROR] Database not found: {args.database}")
+        print("Please run build_database.py first")
+        return
+
+    conn = sqlite3.connect(args.database)
+
+    for language_code in args.languages.split(','):
+        output_path = args.database.parent / f'word_index_{language_code}.bin'
+        entries = load_entries(conn, language_code)
+        if not entries:
+            print(f"[SKIP] No '{language_code}' words")
+            continue
+
+        write_index(entries, output_path)
+        size_kb = output_path.stat().st_size / 1024
+        print(f"[OK] {language_code}: {len(entries):,} entries -> {output_path} ({size_kb:,.1f} KB)")
+        benchmark_word_index(conn, output_path, language_code)
+        print()
+
+    conn.close()
+
+    print("=" * 60)
+    print("Export complete!")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
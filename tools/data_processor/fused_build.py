@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Fused process-and-build: parse the kaikki dumps and load SQLite in one pass.
+
+process_wiktionary workers parse batches of lines in a process pool. A
+dispatcher thread collects their results in file order and puts them on a
+bounded queue, and the calling thread is the single SQLite writer. Parsing
+and writing overlap, and no processed JSON is written in between.
+
+Entries are deduplicated as they arrive, with the rule deduplicate_words
+uses. For each dedup key the writer keeps the score, word id and child row
+ids of the entry it inserted. When a later duplicate scores higher, its
+words row is updated in place and the earlier children are deleted by row
+id. Word ids and row contents therefore match a process_wiktionary.py +
+build_database.py build. Child row ids (definitions, translations,
+examples) do not: a replacement's children get new ids at the end of each
+table, so they differ from the sequential build wherever an entry was
+replaced.
+"""
+
+import json
+import queue
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+from tqdm import tqdm
+
+from build_database import (
+    BULK_BATCH_SIZE,
+    BULK_INSERTS,
+    FUSED_QUEUE_SIZE,
+    apply_bulk_load_pragmas,
+    restore_pragmas,
+)
+from language_packs import DEFAULT_PACK, PACKS, LanguagePack, sources_for
+from process_wiktionary import (
+    DATA_DIR,
+    SHARDS_PER_WORKER,
+    STREAM_BATCH_LINES,
+    ProcessedWord,
+    dedup_key,
+    dedup_score,
+    find_input_file,
+    lang_code_prefilter,
+    merge_parse_stats,
+    new_parse_stats,
+    open_input,
+    print_parse_stats,
+    process_lines,
+    source_processor,
+)
+
+CHILD_TABLES = ('definitions', 'translations', 'examples')
+
+# Child rows are written with explicit ids, so a replaced entry's rows can be deleted by id
+FUSED_INSERTS = {
+    'words': BULK_INSERTS['words'],
+    'definitions': "INSERT INTO definitions (id, word_id, definition, order_index) "
+                   "VALUES (?, ?, ?, ?)",
+    'translations': "INSERT INTO translations (id, source_word_id, target_language_code, "
+                    "translation) VALUES (?, ?, ?, ?)",
+    'examples': "INSERT INTO examples (id, word_id, example_text) VALUES (?, ?, ?)",
+}
+
+# Language and POS are part of the dedup key, so a better duplicate only changes these
+UPDATE_WORD_SQL = "UPDATE words SET word = ?, pronunciation_ipa = ?, etymology = ? WHERE id = ?"
+
+
+class InstrumentedQueue:
+    """Bounded queue that records its occupancy and how long each side waited."""
+
+    def __init__(self, maxsize: int, backing=None, consumer=None):
+        self.maxsize = maxsize
+        self.cancelled = threading.Event()
+        # A multiprocessing queue can stand in for the thread queue; puts then
+        # give up if the `consumer` process has died
+        self._queue = backing if backing is not None else queue.Queue(maxsize)
+        self.consumer = consumer
+        self.puts = 0
+        self.blocked_puts = 0
+        self.put_wait = 0.0
+        self.gets = 0
+        self.empty_gets = 0
+        self.full_gets = 0
+        self.get_wait = 0.0
+        self.occupancy_total = 0
+
+    def put(self, item) -> bool:
+        """Put an item, waiting while the queue is full. False if the consumer gave up."""
+        self.puts += 1
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            pass
+
+        self.blocked_puts += 1
+        start = time.perf_counter()
+        while not self.is_cancelled():
+            try:
+                self._queue.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        self.put_wait += time.perf_counter() - start
+        return not self.is_cancelled()
+
+    def is_cancelled(self) -> bool:
+        return self.cancelled.is_set() or (self.consumer is not None and not self.consumer.is_alive())
+
+    def qsize(self) -> int:
+        try:
+            return self._queue.qsize()
+        except NotImplementedError:  # multiprocessing queues on macOS
+            return 0
+
+    def get(self):
+        """Take the next item, recording the occupancy seen by the consumer."""
+        occupancy = self.qsize()
+        self.gets += 1
+        self.occupancy_total += occupancy
+        if occupancy >= self.maxsize:
+            self.full_gets += 1
+        try:
+            return self._queue.get_nowait()
+        except queue.Empty:
+            pass
+
+        self.empty_gets += 1
+        start = time.perf_counter()
+        item = self._queue.get()
+        self.get_wait += time.perf_counter() - start
+        return item
+
+    def stats(self) -> Dict[str, Any]:
+        gets = max(self.gets, 1)
+        return {
+            'queue_size': self.maxsize,
+            'batches': self.puts,
+            'mean_occupancy': self.occupancy_total / gets,
+            'full_fraction': self.full_gets / gets,
+            'blocked_puts': self.blocked_puts,
+            'producer_blocked_seconds': self.put_wait,
+            'empty_gets': self.empty_gets,
+            'writer_idle_seconds': self.get_wait,
+        }
+
+
+def fused_sources(data_dir: Path = DATA_DIR, prefilter: bool = True,
+                  pack: LanguagePack = PACKS[DEFAULT_PACK]) -> List[Tuple]:
+    """(description, input path, processor, prefilter) for each dump of a pack, in build order."""
+    return [
+        (f"{source.language} entries", find_input_file(data_dir, source.name),
+         source_processor(source, [pack]),
+         lang_code_prefilter(source.lang_code) if prefilter else None)
+        for source in sources_for([pack])
+    ]
+
+
+def read_batches(sources: List[Tuple], parse_stats: Dict[str, Dict[str, int]]) -> Iterator[Tuple]:
+    """Yield (description, lines, processor, prefilter) batches from every source in order."""
+    for description, input_path, processor, prefilter in sources:
+        if not input_path.exists():
+            continue
+        parse_stats.setdefault(description, new_parse_stats())
+        with open_input(input_path) as (stream, _):
+            batch = []
+            for line in stream:
+                batch.append(line)
+                if len(batch) >= STREAM_BATCH_LINES:
+                    yield description, batch, processor, prefilter
+                    batch = []
+            if batch:
+                yield description, batch, processor, prefilter
+
+
+def parse_batches(sources: List[Tuple], workers: int, decoder,
+                  parse_stats: Dict[str, Dict[str, int]]) -> Iterator[Tuple[str, List[tuple]]]:
+    """Parse every source in a process pool, yielding (description, rows) in file order.
+
+    Batches of the next file are submitted while the previous one is still
+    being parsed, so the pool never drains between files.
+    """
+    pending = deque()
+
+    def collect() -> Tuple[str, List[tuple]]:
+        description, future = pending.popleft()
+        rows, batch_stats = future.result()
+        merge_parse_stats(parse_stats[description], batch_stats)
+        return description, rows
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for description, lines, processor, prefilter in read_batches(sources, parse_stats):
+            future = executor.submit(process_lines, lines, processor, prefilter, decoder)
+            pending.append((description, future))
+            if len(pending) >= workers * SHARDS_PER_WORKER:
+                yield collect()
+        while pending:
+            yield collect()
+
+
+def produce_batches(sources: List[Tuple], workers: int, decoder,
+                    batches: InstrumentedQueue, parse_stats: Dict[str, Dict[str, int]]):
+    """Queue the parsed rows of every source in file order.
+
+    Puts None when done, or the exception if parsing failed.
+    """
+    try:
+        for _, rows in parse_batches(sources, workers, decoder, parse_stats):
+            if not batches.put(rows):
+                return
+        batches.put(None)
+    except Exception as e:
+        batches.put(e)
+
+
+def write_batches(conn: sqlite3.Connection, batches: InstrumentedQueue,
+                  batch_size: int = BULK_BATCH_SIZE, progress: bool = True) -> Tuple[int, int, int]:
+    """Deduplicate and insert rows from the queue until it yields None.
+
+    Returns the number of unique words, entries read and entries replaced by
+    a better duplicate.
+    """
+    cursor = conn.cursor()
+
+    # Dedup key -> (score, word id, first and last row id in each child table)
+    seen = {}
+    next_ids = {table: 1 for table in FUSED_INSERTS}
+    buffers = {table: [] for table in FUSED_INSERTS}
+    stale = {table: [] for table in CHILD_TABLES}
+    updates = []
+    entries = 0
+    replaced = 0
+
+    def add_children(word_id: int, word: ProcessedWord) -> tuple:
+        ranges = []
+        for table, values in (
+            ('definitions', [(definition, idx) for idx, definition in enumerate(word.definitions)]),
+            ('translations', [(lang_code, translation)
+                              for lang_code, translations in word.translations.items()
+                              for translation in translations]),
+            ('examples', [(example,) for example in word.examples]),
+        ):
+            first = next_ids[table]
+            for value in values:
+                buffers[table].append((next_ids[table], word_id) + value)
+                next_ids[table] += 1
+            ranges.extend((first, next_ids[table] - 1))
+        return tuple(ranges)
+
+    def flush():
+        for table, rows in buffers.items():
+            if rows:
+                cursor.executemany(FUSED_INSERTS[table], rows)
+                rows.clear()
+        # Children of replaced entries go after the inserts, as they may be in this batch
+        for table, ranges in stale.items():
+            if ranges:
+                cursor.executemany(f"DELETE FROM {table} WHERE id BETWEEN ? AND ?", ranges)
+                ranges.clear()
+        if updates:
+            cursor.executemany(UPDATE_WORD_SQL, updates)
+            updates.clear()
+        conn.commit()
+
+    with tqdm(desc="Parsing and inserting", unit='entry', disable=not progress) as pbar:
+        while True:
+            rows = batches.get()
+            if rows is None:
+                break
+            if isinstance(rows, Exception):
+                raise rows
+
+            for row in rows:
+                word = ProcessedWord(*row)
+                key = dedup_key(word)
+                score = dedup_score(word)
+                previous = seen.get(key)
+                # The first entry wins ties, as in deduplicate_words
+                if previous is not None and score <= previous[0]:
+                    continue
+
+                if previous is None:
+                    word_id = next_ids['words']
+                    next_ids['words'] += 1
+                    buffers['words'].append((
+                        word_id, word.word, word.language, word.pos,
+                        word.pronunciation_ipa, word.etymology,
+                    ))
+                else:
+                    word_id = previous[1]
+                    updates.append((word.word, word.pronunciation_ipa, word.etymology, word_id))
+                    for table, first, last in zip(CHILD_TABLES, previous[2::2], previous[3::2]):
+                        if first <= last:
+                            stale[table].append((first, last))
+                    replaced += 1
+                seen[key] = (score, word_id) + add_children(word_id, word)
+
+            entries += len(rows)
+            pbar.update(len(rows))
+            if any(len(buffered) >= batch_size for buffered in buffers.values()):
+                flush()
+    flush()
+
+    return len(seen), entries, replaced
+
+
+def populate_database_fused(conn: sqlite3.Connection, sources: List[Tuple], workers: int = 1,
+                            queue_size: int = FUSED_QUEUE_SIZE, decoder=json.loads,
+                            batch_size: int = BULK_BATCH_SIZE) -> Tuple[int, Dict[str, Any]]:
+    """Parse the dumps and insert the deduplicated words as they stream in.
+
+    Returns the number of unique words and the queue statistics.
+    """
+    apply_bulk_load_pragmas(conn)
+
+    batches = InstrumentedQueue(queue_size)
+    parse_stats = {}
+    producer = threading.Thread(
+        target=produce_batches, args=(sources, max(workers, 1), decoder, batches, parse_stats),
+        daemon=True,
+    )
+
+    producer.start()
+    try:
+        word_count, entries, replaced = write_batches(conn, batches, batch_size)
+    finally:
+        batches.cancelled.set()
+        producer.join()
+        restore_pragmas(conn)
+
+    for description, stats in parse_stats.items():
+        print(f"  {description}:")
+        print_parse_stats(stats)
+    print(f"  {entries:,} entries parsed, {word_count:,} unique words, "
+          f"{replaced:,} replaced by a better duplicate")
+
+    return word_count, batches.stats()
+
+
+def print_queue_stats(stats: Dict[str, Any]):
+    """Report queue occupancy and which side of the queue had to wait."""
+    print(f"  Queue ({stats['queue_size']} batches of up to {STREAM_BATCH_LINES:,} lines):")
+    print(f"    - Batches: {stats['batches']:,}")
+    print(f"    - Mean occupancy: {stats['mean_occupancy']:.1f} batches, "
+          f"full at {stats['full_fraction']:.0%} of reads")
+    print(f"    - Parser blocked on a full queue: {stats['blocked_puts']:,} times, "
+          f"{stats['producer_blocked_seconds']:.2f}s")
+    print(f"    - Writer waited on an empty queue: {stats['empty_gets']:,} times, "
+          f"{stats['writer_idle_seconds']:.2f}s")
+    if stats['producer_blocked_seconds'] > stats['writer_idle_seconds']:
+        print("    - Bottleneck: the SQLite writer (backpressure on the parsers)")
+    else:
+        print("    - Bottleneck: parsing (add --workers)")
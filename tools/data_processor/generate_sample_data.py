@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Generate synthetic kaikki.org-style Wiktionary dumps for offline benchmarks.
+
+The output has the shape of the real English and Hindi extracts: one JSON
+entry per line with word, pos, senses (glosses, examples, tags), translations,
+sounds, forms and etymology. Headwords repeat across entries (one entry per
+POS / etymology, as on Wiktionary), so deduplication has real work to do. A
+share of the lines are entries of other languages, as dumps can hold, so the
+lang_code prefilter and the processor both have lines to reject. The same
+seed and scale always produce byte-identical files.
+"""
+
+import argparse
+import json
+import random
+from pathlib import Path
+from typing import Dict, List
+
+OUTPUT_DIR = Path(__file__).parent / 'benchmark' / 'data'
+
+DEFAULT_SEED = 42
+DEFAULT_ENGLISH_ENTRIES = 20000
+DEFAULT_HINDI_ENTRIES = 5000
+
+# Distinct headwords per entry; the rest are further senses / POS of a word
+VOCABULARY_RATIO = 0.7
+
+# Share of lines that are entries of another language than the dump's
+DEFAULT_FOREIGN_SHARE = 0.15
+
+# Share of those that carry a translation keyed by the dump's lang_code, so
+# the prefilter matches them and the processor rejects them after decoding
+FOREIGN_NESTED_MATCH_SHARE = 0.2
+
+# Other languages found in each dump, as (name, code)
+FOREIGN_LANGUAGES = {
+    'english': [('Middle English', 'enm'), ('Scots', 'sco'), ('French', 'fr'),
+                ('German', 'de'), ('Latin', 'la')],
+    'hindi': [('Urdu', 'ur'), ('Sanskrit', 'sa'), ('Nepali', 'ne'), ('Marathi', 'mr')],
+}
+
+DUMP_LANGUAGES = {'english': ('English', 'en'), 'hindi': ('Hindi', 'hi')}
+
+POS_WEIGHTS = {
+    'noun': 50, 'verb': 18, 'adj': 15, 'adv': 5, 'name': 4,
+    'phrase': 3, 'prep': 1, 'pron': 1, 'intj': 1, 'conj': 1,
+}
+
+ENGLISH_ONSETS = ['', 'b', 'c', 'd', 'f', 'g', 'h', 'j', 'k', 'l', 'm', 'n', 'p', 'r', 's',
+                  't', 'v', 'w', 'bl', 'br', 'ch', 'cl', 'cr', 'dr', 'fl', 'gr', 'pl', 'pr',
+                  'sh', 'sl', 'sp', 'st', 'str', 'th', 'tr', 'wh']
+ENGLISH_NUCLEI = ['a', 'e', 'i', 'o', 'u', 'ai', 'ea', 'ee', 'oo', 'ou', 'y']
+ENGLISH_CODAS = ['', '', 'b', 'ck', 'd', 'ft', 'g', 'l', 'll', 'm', 'n', 'nd', 'ng', 'nt',
+                 'p', 'r', 'rd', 'rt', 's', 'sh', 'st', 't', 'th', 'x']
+ENGLISH_SUFFIXES = ['', '', '', '', 'er', 'ing', 'ed', 'ly', 'ness', 'tion', 'able', 'ment']
+
+HINDI_CONSONANTS = list('कखगघचछजझटठडढतथदधनपफबभमयरलवशसह')
+HINDI_VOWEL_SIGNS = ['', '', '', 'ा', 'ा', 'ि', 'ी', 'ु', 'ू', 'े', 'ै', 'ो', 'ौ']
+HINDI_FINALS = ['', '', '', 'ं', 'ना', 'ी', 'ता', 'कर']
+
+# Translation targets of English entries, as (name, code, share of entries)
+TRANSLATION_LANGUAGES = [
+    ('Hindi', 'hi', 0.35), ('French', 'fr', 0.6), ('German', 'de', 0.55),
+    ('Spanish', 'es', 0.5), ('Russian', 'ru', 0.4), ('Japanese', 'ja', 0.3),
+    ('Urdu', 'ur', 0.2), ('Bengali', 'bn', 0.15), ('Tamil', 'ta', 0.1),
+]
+
+GLOSS_WORDS = ['a', 'an', 'the', 'of', 'to', 'or', 'and', 'which', 'that', 'used', 'for',
+               'person', 'thing', 'place', 'act', 'state', 'quality', 'kind', 'small',
+               'large', 'form', 'part', 'water', 'body', 'light', 'move', 'make', 'having',
+               'relating', 'process', 'something', 'certain', 'especially', 'group']
+
+SENSE_TAGS = ['countable', 'uncountable', 'transitive', 'intransitive', 'informal',
+              'archaic', 'figuratively', 'colloquial', 'rare', 'obsolete']
+
+ETYMOLOGY_SOURCES = ['Middle English', 'Old English', 'Old French', 'Latin', 'Ancient Greek',
+                     'Sanskrit', 'Persian', 'Arabic', 'Prakrit', 'Proto-Indo-European']
+
+
+def english_word(rng: random.Random) -> str:
+    syllables = rng.choices([1, 2, 3, 4], weights=[30, 40, 22, 8])[0]
+    word = ''.join(
+        rng.choice(ENGLISH_ONSETS) + rng.choice(ENGLISH_NUCLEI) + rng.choice(ENGLISH_CODAS)
+        for _ in range(syllables)
+    )
+    word += rng.choice(ENGLISH_SUFFIXES)
+    if rng.random() < 0.03:
+        word = word.capitalize()
+    if rng.random() < 0.03:
+        word += ' ' + english_word(rng)
+    return word
+
+
+def hindi_word(rng: random.Random) -> str:
+    syllables = rng.choices([1, 2, 3, 4], weights=[20, 45, 25, 10])[0]
+    word = ''.join(
+        rng.choice(HINDI_CONSONANTS) + rng.choice(HINDI_VOWEL_SIGNS)
+        for _ in range(syllables)
+    )
+    return word + rng.choice(HINDI_FINALS)
+
+
+def sentence(rng: random.Random, words: List[str], low: int, high: int) -> str:
+    return ' '.join(rng.choice(words) for _ in range(rng.randint(low, high)))
+
+
+def make_senses(rng: random.Random, word: str, vocabulary: List[str]) -> List[Dict]:
+    # A few entries have no glosses (form-of stubs); the processor drops them
+    if rng.random() < 0.08:
+        return [{'tags': ['form-of'], 'form_of': [{'word': rng.choice(vocabulary)}]}]
+
+    senses = []
+    for _ in range(min(1 + int(rng.expovariate(0.7)), 12)):
+        sense = {
+            'glosses': [sentence(rng, GLOSS_WORDS, 3, 14).capitalize() + '.'],
+            'categories': [f'{rng.choice(GLOSS_WORDS)} terms'],
+        }
+        if rng.random() < 0.3:
+            sense['tags'] = rng.sample(SENSE_TAGS, rng.randint(1, 2))
+        if rng.random() < 0.35:
+            sense['examples'] = [
+                {'text': f"{sentence(rng, GLOSS_WORDS, 2, 6)} {word} {sentence(rng, GLOSS_WORDS, 2, 8)}."}
+                for _ in range(rng.randint(1, 3))
+            ]
+        senses.append(sense)
+    return senses
+
+
+def make_english_entry(rng: random.Random, word: str, vocabulary: List[str],
+                       hindi_vocabulary: List[str]) -> Dict:
+    entry = {
+        'word': word,
+        'lang': 'English',
+        'lang_code': 'en',
+        'pos': rng.choices(list(POS_WEIGHTS), weights=list(POS_WEIGHTS.values()))[0],
+        'senses': make_senses(rng, word, vocabulary),
+    }
+
+    translations = []
+    for name, code, share in TRANSLATION_LANGUAGES:
+        if rng.random() >= share:
+            continue
+        pool = hindi_vocabulary if code == 'hi' else vocabulary
+        for _ in range(rng.randint(1, 3)):
+            translations.append({
+                'lang': name, 'code': code, 'word': rng.choice(pool),
+                'sense': sentence(rng, GLOSS_WORDS, 2, 5),
+            })
+    if translations:
+        entry['translations'] = translations
+
+    if rng.random() < 0.6:
+        entry['sounds'] = [
+            {'ipa': f"/{word.lower()[:6]}/", 'tags': ['UK']},
+            {'audio': f'en-us-{word}.ogg', 'ogg_url': f'https://example.invalid/{word}.ogg'},
+        ]
+    if rng.random() < 0.45:
+        entry['etymology_text'] = (
+            f"From {rng.choice(ETYMOLOGY_SOURCES)} {rng.choice(vocabulary)}, "
+            f"from {rng.choice(ETYMOLOGY_SOURCES)} {sentence(rng, GLOSS_WORDS, 2, 10)}."
+        )
+    entry['forms'] = [
+        {'form': word + suffix, 'tags': [tag]}
+        for suffix, tag in (('s', 'plural'), ('ed', 'past'), ('ing', 'participle'))
+        if rng.random() < 0.5
+    ]
+    entry['head_templates'] = [{'name': f'en-{entry["pos"]}', 'expansion': word}]
+    return entry
+
+
+def make_hindi_entry(rng: random.Random, word: str, vocabulary: List[str],
+                     english_vocabulary: List[str]) -> Dict:
+    entry = {
+        'word': word,
+        'lang': 'Hindi',
+        'lang_code': 'hi',
+        'pos': rng.choices(list(POS_WEIGHTS), weights=list(POS_WEIGHTS.values()))[0],
+        'senses': make_senses(rng, word, vocabulary),
+        'forms': [{'form': word + 'ों', 'tags': ['oblique', 'plural']}],
+    }
+    if rng.random() < 0.25:
+        entry['translations'] = [
+            {'lang': 'English', 'code': 'en', 'word': rng.choice(english_vocabulary)}
+            for _ in range(rng.randint(1, 2))
+        ]
+    if rng.random() < 0.5:
+        entry['sounds'] = [{'ipa': f"/{rng.choice(english_vocabulary)[:5]}/"}]
+    if rng.random() < 0.6:
+        entry['etymology_text'] = (
+            f"Inherited from {rng.choice(ETYMOLOGY_SOURCES)} {rng.choice(vocabulary)}."
+        )
+    return entry
+
+
+def make_foreign_entry(rng: random.Random, language: str, word: str,
+                       vocabulary: List[str]) -> Dict:
+    """An entry of another language than the dump's, which the processor must skip."""
+    name, code = rng.choice(FOREIGN_LANGUAGES[language])
+    entry = {
+        'word': word,
+        'lang': name,
+        'lang_code': code,
+        'pos': rng.choices(list(POS_WEIGHTS), weights=list(POS_WEIGHTS.values()))[0],
+        'senses': make_senses(rng, word, vocabulary),
+    }
+    if rng.random() < FOREIGN_NESTED_MATCH_SHARE:
+        dump_name, dump_code = DUMP_LANGUAGES[language]
+        entry['translations'] = [
+            {'lang': dump_name, 'lang_code': dump_code, 'word': rng.choice(vocabulary)}
+        ]
+    return entry
+
+
+def generate_dump(output_path: Path, language: str, count: int, seed: int = DEFAULT_SEED,
+                  foreign_share: float = DEFAULT_FOREIGN_SHARE) -> int:
+    """Write `count` synthetic lines for 'english' or 'hindi'. Returns bytes written.
+
+    About `foreign_share` of the lines are entries of other languages.
+    """
+    rng = random.Random(f'{seed}-{language}')
+    vocabulary_rng = random.Random(seed)
+
+    # Both dumps draw on the same two vocabularies so translations line up
+    english_vocabulary = sorted({
+        english_word(vocabulary_rng)
+        for _ in range(max(int(DEFAULT_ENGLISH_ENTRIES * VOCABULARY_RATIO), 1000))
+    })
+    hindi_vocabulary = sorted({
+        hindi_word(vocabulary_rng)
+        for _ in range(max(int(DEFAULT_HINDI_ENTRIES * VOCABULARY_RATIO), 1000))
+    })
+    rng.shuffle(english_vocabulary)
+    rng.shuffle(hindi_vocabulary)
+
+    if language == 'english':
+        headwords, make_entry = english_vocabulary, make_english_entry
+        pools = (english_vocabulary, hindi_vocabulary)
+    else:
+        headwords, make_entry = hindi_vocabulary, make_hindi_entry
+        pools = (hindi_vocabulary, english_vocabulary)
+
+    # Headwords beyond the shared vocabulary are made up on the fly
+    distinct = max(int(count * VOCABULARY_RATIO), 1)
+    word_for = english_word if language == 'english' else hindi_word
+    while len(headwords) < distinct:
+        headwords.append(word_for(rng))
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    written = 0
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for _ in range(count):
+            if rng.random() < foreign_share:
+                entry = make_foreign_entry(rng, language, word_for(rng), pools[0])
+            else:
+                entry = make_entry(rng, headwords[rng.randrange(distinct)], *pools)
+            line = json.dumps(entry, ensure_ascii=False) + '\n'
+            f.write(line)
+            written += len(line.encode('utf-8'))
+    return written
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate synthetic kaikki-style dumps")
+    parser.add_argument(
+        '--english', type=int, default=DEFAULT_ENGLISH_ENTRIES,
+        help=f"Lines in the English dump (default: {DEFAULT_ENGLISH_ENTRIES})"
+    )
+    parser.add_argument(
+        '--hindi', type=int, default=DEFAULT_HINDI_ENTRIES,
+        help=f"Lines in the Hindi dump (default: {DEFAULT_HINDI_ENTRIES})"
+    )
+    parser.add_argument(
+        '--seed', type=int, default=DEFAULT_SEED,
+        help=f"Random seed (default: {DEFAULT_SEED})"
+    )
+    parser.add_argument(
+        '--foreign-share', type=float, default=DEFAULT_FOREIGN_SHARE,
+        help=f"Share of lines that are entries of other languages (default: {DEFAULT_FOREIGN_SHARE})"
+    )
+    parser.add_argument(
+        '--output-dir', type=Path, default=OUTPUT_DIR,
+        help=f"Directory to write the dumps to (default: {OUTPUT_DIR})"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print("=" * 60)
+    print("Synthetic Wiktionary Data Generator")
+    print("=" * 60)
+    print()
+
+    for name, count in (('english', args.english), ('hindi', args.hindi)):
+        output_path = args.output_dir / f'{name}_wiktionary.jsonl'
+        size = generate_dump(output_path, name, count, args.seed, args.foreign_share)
+        print(f"[OK] {count:,} {name} lines ({size / (1024 * 1024):.1f} MB) -> {output_path}")
+
+    print()
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
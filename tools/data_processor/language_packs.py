@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Registry of the Wiktionary source dumps and the language packs built from them.
+
+A source is one kaikki.org dump holding the headwords of one language. A pack
+is a set of languages shipped as one database: each language's headwords come
+from its own dump, with translations into the pack's other languages. A dump
+used by several packs is parsed once per run by build_packs.py.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+
+@dataclass(frozen=True)
+class SourceDump:
+    """A kaikki.org dump of the headwords of one language."""
+    name: str  # Saved as data/<name>_wiktionary.jsonl
+    lang_code: str
+    language: str  # Language name as kaikki.org writes it in translations
+    url: str
+
+
+@dataclass(frozen=True)
+class LanguagePack:
+    """Languages shipped together in one database."""
+    name: str
+    languages: Tuple[str, ...]  # Headword languages, in source registry order
+
+    @property
+    def database_name(self) -> str:
+        return f'dictionary-{self.name}.db'
+
+
+def kaikki_url(language: str) -> str:
+    return f'https://kaikki.org/dictionary/{language}/kaikki.org-dictionary-{language}.jsonl'
+
+
+# Sources by language code. Packs read their sources in this order, which
+# fixes the word ids of each pack.
+SOURCES: Dict[str, SourceDump] = {
+    'en': SourceDump('english', 'en', 'English', kaikki_url('English')),
+    'hi': SourceDump('hindi', 'hi', 'Hindi', kaikki_url('Hindi')),
+    'ur': SourceDump('urdu', 'ur', 'Urdu', kaikki_url('Urdu')),
+    'bn': SourceDump('bengali', 'bn', 'Bengali', kaikki_url('Bengali')),
+}
+
+PACKS: Dict[str, LanguagePack] = {
+    'en-hi': LanguagePack('en-hi', ('en', 'hi')),
+    'en-ur': LanguagePack('en-ur', ('en', 'ur')),
+    'en-bn': LanguagePack('en-bn', ('en', 'bn')),
+}
+
+# The pack process_wiktionary.py and build_database.py build, and the app ships
+DEFAULT_PACK = 'en-hi'
+
+
+def resolve_packs(names: str) -> List[LanguagePack]:
+    """Packs from a comma-separated list of names; raises KeyError on unknown names."""
+    packs = []
+    for name in names.split(','):
+        name = name.strip()
+        if not name:
+            continue
+        if name not in PACKS:
+            raise KeyError(name)
+        packs.append(PACKS[name])
+    return packs
+
+
+def sources_for(packs: List[LanguagePack]) -> List[SourceDump]:
+    """The sources the packs need, each once, in registry order."""
+    needed = {code for pack in packs for code in pack.languages}
+    return [source for code, source in SOURCES.items() if code in needed]
+
+
+def translation_languages(source: SourceDump, packs: List[LanguagePack]) -> Tuple[Tuple[str, str], ...]:
+    """(code, name) of every language a source's entries are translated into.
+
+    That is the union of the other languages of every pack using the source,
+    so one parse serves all of them.
+    """
+    targets = {
+        code
+        for pack in packs if source.lang_code in pack.languages
+        for code in pack.languages if code != source.lang_code
+    }
+    return tuple((code, SOURCES[code].language) for code in SOURCES if code in targets)
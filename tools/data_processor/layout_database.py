@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Read-locality ("layout") variant of the standard dictionary database.
+
+Used by `build_database.py --layout`. The tables and columns are the ones the
+app reads, but rows are placed for cold lookups:
+1. Words are renumbered in (language_code, normalized word) order, so
+   neighbouring headwords share pages
+2. definitions, translations and examples are WITHOUT ROWID tables keyed by
+   (word_id, order), so one word's children sit together on one or two leaf
+   pages and need no separate word_id index
+3. The database is written out with VACUUM INTO, which packs every b-tree
+   in key order, at a page size chosen by measuring cold lookups (or given)
+
+Cold lookups are measured as the bytes SQLite reads on a fresh connection,
+from the rchar counter of /proc/self/io (so the measurement is Linux-only).
+rchar counts every read() call, including those served from the OS page
+cache: the figures are pages SQLite requests with its own cache empty, not
+device I/O. The milliseconds, and so the page size picked from them, come
+from the READ_* cost model rather than from timing.
+"""
+
+import random
+import sqlite3
+import statistics
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from build_database import (
+    apply_bulk_load_pragmas,
+    create_database,
+    create_fts_triggers,
+    rebuild_fts,
+    restore_pragmas,
+)
+from search_indexes import BENCHMARK_QUERIES, BENCHMARK_SEED, register_search_key_function
+
+# Page sizes tried when none is given; 4 KB is the SQLite default
+PAGE_SIZE_CANDIDATES = (4096, 8192, 16384)
+
+# Cost model used to pick a page size: a fixed cost per read request plus
+# transfer time, roughly a phone's UFS/eMMC flash with a cold OS cache
+READ_REQUEST_MS = 0.1
+READ_MS_PER_MB = 1.0
+
+# Child tables clustered by word. `id` stays a column (with a unique index)
+# because FTS content tables and the app address rows by it. Key columns come
+# first: SQLite 3.40's integrity_check misreports NOT NULL columns of WITHOUT
+# ROWID tables otherwise. The app reads columns by name, not position.
+LAYOUT_CHILD_TABLES = {
+    'definitions': """
+        CREATE TABLE definitions (
+            word_id INTEGER NOT NULL,
+            order_index INTEGER NOT NULL DEFAULT 0,
+            id INTEGER NOT NULL,
+            definition TEXT NOT NULL,
+            PRIMARY KEY (word_id, order_index, id),
+            FOREIGN KEY (word_id) REFERENCES words(id) ON DELETE CASCADE
+        ) WITHOUT ROWID
+    """,
+    'translations': """
+        CREATE TABLE translations (
+            source_word_id INTEGER NOT NULL,
+            id INTEGER NOT NULL,
+            target_language_code TEXT NOT NULL,
+            translation TEXT NOT NULL,
+            PRIMARY KEY (source_word_id, id),
+            FOREIGN KEY (source_word_id) REFERENCES words(id) ON DELETE CASCADE
+        ) WITHOUT ROWID
+    """,
+    'examples': """
+        CREATE TABLE examples (
+            word_id INTEGER NOT NULL,
+            id INTEGER NOT NULL,
+            example_text TEXT NOT NULL,
+            PRIMARY KEY (word_id, id),
+            FOREIGN KEY (word_id) REFERENCES words(id) ON DELETE CASCADE
+        ) WITHOUT ROWID
+    """,
+}
+
+# Rows are renumbered so that id order is also the physical order
+LAYOUT_COPY_SQL = {
+    'words': """
+        INSERT INTO words (id, word, language_code, pos, pronunciation_ipa, etymology, created_at)
+        SELECT o.new_id, w.word, w.language_code, w.pos, w.pronunciation_ipa, w.etymology,
+               w.created_at
+        FROM staging.words w
+        JOIN temp.word_order o ON o.old_id = w.id
+        ORDER BY o.new_id
+    """,
+    'definitions': """
+        INSERT INTO definitions (id, word_id, definition, order_index)
+        SELECT ROW_NUMBER() OVER (ORDER BY o.new_id, d.order_index, d.id),
+               o.new_id, d.definition, d.order_index
+        FROM staging.definitions d
+        JOIN temp.word_order o ON o.old_id = d.word_id
+        ORDER BY 1
+    """,
+    'translations': """
+        INSERT INTO translations (id, source_word_id, target_language_code, translation)
+        SELECT ROW_NUMBER() OVER (ORDER BY o.new_id, t.id),
+               o.new_id, t.target_language_code, t.translation
+        FROM staging.translations t
+        JOIN temp.word_order o ON o.old_id = t.source_word_id
+        ORDER BY 1
+    """,
+    'examples': """
+        INSERT INTO examples (id, word_id, example_text)
+        SELECT ROW_NUMBER() OVER (ORDER BY o.new_id, e.id), o.new_id, e.example_text
+        FROM staging.examples e
+        JOIN temp.word_order o ON o.old_id = e.word_id
+        ORDER BY 1
+    """,
+}
+
+# The standard indexes, minus the child word_id ones the primary keys replace
+LAYOUT_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_words_language ON words(language_code)",
+    "CREATE INDEX IF NOT EXISTS idx_words_word ON words(word)",
+    "CREATE INDEX IF NOT EXISTS idx_words_word_lang ON words(word, language_code)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_definitions_id ON definitions(id)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_translations_id ON translations(id)",
+    "CREATE INDEX IF NOT EXISTS idx_translations_target ON translations(target_language_code)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_examples_id ON examples(id)",
+    "CREATE INDEX IF NOT EXISTS idx_favorites_word ON favorites(word_id)",
+    "CREATE INDEX IF NOT EXISTS idx_history_word ON search_history(word_id)",
+    "CREATE INDEX IF NOT EXISTS idx_history_date ON search_history(searched_at)",
+]
+
+# searchExact followed by WordDao.getWordById, as the app runs them
+EXACT_LOOKUP_SQL = "SELECT * FROM words WHERE word = ? AND language_code = ?"
+WORD_DETAIL_SQL = [
+    "SELECT * FROM words WHERE id = ?",
+    "SELECT * FROM definitions WHERE word_id = ? ORDER BY order_index ASC",
+    "SELECT * FROM translations WHERE source_word_id = ?",
+    "SELECT * FROM examples WHERE word_id = ?",
+]
+
+
+def staging_path_for(db_path: Path) -> Path:
+    """Where the rows are loaded before they are laid out."""
+    return db_path.with_name(db_path.stem + '.staging.db')
+
+
+def work_path_for(db_path: Path) -> Path:
+    """Where the laid-out database is finalized before VACUUM INTO."""
+    return db_path.with_name(db_path.stem + '.work.db')
+
+
+def create_staging_database(db_path: Path) -> sqlite3.Connection:
+    """Create the standard-schema database the rows are loaded into first."""
+    return create_database(staging_path_for(db_path))
+
+
+def create_layout_database(staging_conn: sqlite3.Connection, db_path: Path) -> sqlite3.Connection:
+    """Copy a loaded standard database into the clustered layout.
+
+    Closes and deletes the staging database; returns a connection to the
+    work database, which still needs finalize_layout_database.
+    """
+    staging_path = Path(staging_conn.execute("PRAGMA database_list").fetchone()[2])
+    staging_conn.commit()
+    staging_conn.close()
+
+    work_path = work_path_for(db_path)
+    conn = create_database(work_path)
+    cursor = conn.cursor()
+    for table, schema in LAYOUT_CHILD_TABLES.items():
+        cursor.execute(f"DROP TABLE {table}")
+        cursor.execute(schema)
+
+    # The bulk-load cache also stays large for the stages that run after the copy
+    apply_bulk_load_pragmas(conn)
+    register_search_key_function(conn)
+    cursor.execute("ATTACH DATABASE ? AS staging", (str(staging_path),))
+
+    # Normalized word first, then the raw word, POS and old id for a total order
+    cursor.execute("""
+        CREATE TEMP TABLE word_order AS
+        SELECT id AS old_id,
+               ROW_NUMBER() OVER (
+                   ORDER BY language_code, search_key(word), word, pos, id
+               ) AS new_id
+        FROM staging.words
+    """)
+    cursor.execute("CREATE UNIQUE INDEX temp.idx_word_order ON word_order(old_id)")
+    for sql in LAYOUT_COPY_SQL.values():
+        cursor.execute(sql)
+    cursor.execute("DROP TABLE temp.word_order")
+    conn.commit()
+
+    cursor.execute("DETACH DATABASE staging")
+    staging_path.unlink()
+    restore_pragmas(conn)
+    return conn
+
+
+def finalize_layout_database(conn: sqlite3.Connection) -> Dict[str, float]:
+    """Build indexes, FTS contents and triggers for the layout database."""
+    timings = {}
+
+    start = time.perf_counter()
+    for sql in LAYOUT_INDEXES:
+        conn.execute(sql)
+    conn.commit()
+    timings['indexes'] = time.perf_counter() - start
+
+    for phase, func in (('fts_rebuild', rebuild_fts), ('fts_triggers', create_fts_triggers)):
+        start = time.perf_counter()
+        func(conn)
+        timings[phase] = time.perf_counter() - start
+    return timings
+
+
+def read_bytes() -> Optional[int]:
+    """Bytes this process has read through read() calls so far (Linux only)."""
+    try:
+        with open('/proc/self/io', 'r') as f:
+            for line in f:
+                if line.startswith('rchar:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def sample_lookup_words(db_path: Path, count: int = BENCHMARK_QUERIES) -> List[Tuple[str, str]]:
+    """Seeded sample of (word, language_code) headwords to look up."""
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    words = conn.execute(
+        "SELECT word, language_code FROM words ORDER BY word, language_code"
+    ).fetchall()
+    conn.close()
+    rng = random.Random(BENCHMARK_SEED)
+    return rng.sample(words, min(count, len(words)))
+
+
+def cold_lookup(db_path: Path, word: str, language_code: str, overhead: int) -> int:
+    """Bytes read by SQLite for one exact lookup plus word details, on a cold connection.
+
+    The schema is loaded before measuring, so only the pages of the lookup count.
+    """
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+
+    before = read_bytes()
+    for row in conn.execute(EXACT_LOOKUP_SQL, (word, language_code)).fetchall():
+        for sql in WORD_DETAIL_SQL:
+            conn.execute(sql, (row[0],)).fetchall()
+    after = read_bytes()
+
+    conn.close()
+    return max(after - before - overhead, 0)
+
+
+def measure_cold_lookups(db_path: Path, lookups: Sequence[Tuple[str, str]]) -> Optional[Dict[str, float]]:
+    """Pages and bytes requested per cold lookup, with the modelled read time."""
+    if read_bytes() is None:
+        return None
+
+    # Reading /proc/self/io is itself a read; measure it so it can be subtracted
+    first = read_bytes()
+    overhead = read_bytes() - first
+
+    with closing(sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)) as conn:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    samples = sorted(cold_lookup(db_path, word, language_code, overhead)
+                     for word, language_code in lookups)
+    pages = [size / page_size for size in samples]
+    mean_pages = statistics.fmean(pages) if pages else 0.0
+    mean_bytes = statistics.fmean(samples) if samples else 0.0
+    return {
+        'page_size': page_size,
+        'mean_pages': mean_pages,
+        'p99_pages': pages[min(len(pages) - 1, int(len(pages) * 0.99))] if pages else 0.0,
+        'mean_kb': mean_bytes / 1024,
+        'estimated_ms': mean_pages * READ_REQUEST_MS + mean_bytes / (1024 * 1024) * READ_MS_PER_MB,
+    }
+
+
+def print_cold_lookups(label: str, result: Dict[str, float]):
+    print(
+        f"    {label:<24} {result['page_size']:>6} B pages   "
+        f"{result['mean_pages']:5.1f} pages (p99 {result['p99_pages']:4.1f})   "
+        f"{result['mean_kb']:6.1f} KB   ~{result['estimated_ms']:.2f} ms modelled"
+    )
+
+
+def write_layout_database(conn: sqlite3.Connection, db_path: Path,
+                          page_size: Optional[int] = None) -> int:
+    """ANALYZE, pick a page size, and VACUUM INTO the final file.
+
+    Without `page_size`, each of PAGE_SIZE_CANDIDATES is written out and
+    measured, and the one with the lowest modelled cold read time wins: the
+    page counts are measured, the cost per page and per MB is assumed.
+    Returns the page size used. `conn` is closed and the work file removed.
+    """
+    work_path = Path(conn.execute("PRAGMA database_list").fetchone()[2])
+    conn.execute("ANALYZE")
+    conn.commit()
+
+    if page_size is None:
+        print("  Measuring cold lookups per page size (read time from the cost model)...")
+        lookups = sample_lookup_words(work_path)
+        best = None
+        for candidate in PAGE_SIZE_CANDIDATES:
+            trial_path = db_path.with_name(f'{db_path.stem}.{candidate}.db')
+            vacuum_into(conn, trial_path, candidate)
+            result = measure_cold_lookups(trial_path, lookups)
+            trial_path.unlink()
+            if result is None:
+                print("  [SKIP] /proc/self/io is not available; using the default page size")
+                best = None
+                break
+            print_cold_lookups(f"page_size {candidate}", result)
+            if best is None or result['estimated_ms'] < best[1]:
+                best = (candidate, result['estimated_ms'])
+        page_size = best[0] if best else PAGE_SIZE_CANDIDATES[0]
+
+    conn.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES ('page_size', ?)",
+                 (str(page_size),))
+    conn.commit()
+    vacuum_into(conn, db_path, page_size)
+    conn.close()
+    work_path.unlink()
+    return page_size
+
+
+def vacuum_into(conn: sqlite3.Connection, path: Path, page_size: int):
+    """Write a defragmented copy of the database with the given page size."""
+    if path.exists():
+        path.unlink()
+    conn.execute(f"PRAGMA page_size = {int(page_size)}")
+    conn.execute("VACUUM INTO ?", (str(path),))
+
+
+def report_cold_lookups(before_path: Optional[Path], after_path: Path):
+    """Compare pages read per cold lookup between a standard and a layout database."""
+    lookups = sample_lookup_words(after_path)
+    after = measure_cold_lookups(after_path, lookups)
+    if after is None:
+        print("  [SKIP] Cold lookup measurement needs /proc/self/io (Linux)")
+        return
+
+    print(f"  Cold exact lookup + word details ({len(lookups)} headwords, fresh connection each):")
+    print("    Bytes SQLite requests with its cache empty; OS page cache hits count too, "
+          "and ms come from the cost model")
+    if before_path is not None and before_path.exists():
+        print_cold_lookups("standard", measure_cold_lookups(before_path, lookups))
+    else:
+        print("    [SKIP] No standard database to compare with; run build_database.py first")
+    print_cold_lookups("layout", after)
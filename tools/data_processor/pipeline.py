@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Run the download -> process -> build pipeline, skipping up-to-date stages.
+
+Each stage is keyed by the content hashes of its input files, a fingerprint
+of its code (the scripts it runs) and its configuration (the arguments passed
+to it). The key and the output hashes are recorded in
+output/pipeline_manifest.json; a stage whose key is unchanged and whose
+outputs are still intact is skipped. A stage that reproduces byte-identical
+outputs therefore does not invalidate the stages after it.
+
+The download stage is the exception: it always runs, and relies on
+conditional requests to leave unchanged dumps alone.
+
+File hashes are cached by (size, mtime), so unchanged multi-GB dumps are not
+re-read on every run.
+"""
+
+import argparse
+import hashlib
+import json
+import shlex
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import build_database
+import build_packs
+import download_data
+import process_wiktionary
+from language_packs import DEFAULT_PACK, PACKS, resolve_packs, sources_for
+
+SCRIPT_DIR = Path(__file__).parent
+MANIFEST_PATH = build_database.OUTPUT_DIR / 'pipeline_manifest.json'
+MANIFEST_VERSION = 1
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Stage name -> (script it runs, modules whose code determines its output)
+STAGES = {
+    'download': ('download_data.py', ['download_data.py', 'language_packs.py']),
+    'process': ('process_wiktionary.py', ['process_wiktionary.py', 'language_packs.py']),
+    'build': ('build_database.py', ['build_database.py', 'compact_database.py', 'layout_database.py',
+                                    'search_indexes.py', 'romanize.py', 'fused_build.py',
+                                    'process_wiktionary.py', 'language_packs.py']),
+    'packs': ('build_packs.py', ['build_packs.py', 'build_database.py', 'fused_build.py',
+                                 'process_wiktionary.py', 'language_packs.py']),
+}
+
+# Stages run when --stages is not given; packs is opt-in
+DEFAULT_STAGES = ('download', 'process', 'build')
+
+# Stages that are never cached. The download stage's real input is the
+# upstream dump, which only the server can vouch for; with the saved
+# ETag/Last-Modified validators an unchanged dump costs a 304 per file.
+ALWAYS_RUN = {'download': "checks upstream for new dumps on every run"}
+
+
+def file_hash(path: Path, cache: Dict[str, Dict[str, Any]]) -> str:
+    """blake2b of a file's contents, reusing the cached value if size and mtime match."""
+    stat = path.stat()
+    cached = cache.get(str(path))
+    if cached and cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+        return cached['hash']
+
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    cache[str(path)] = {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'hash': digest.hexdigest(),
+    }
+    return cache[str(path)]['hash']
+
+
+def hash_files(paths: List[Path], cache: Dict[str, Dict[str, Any]]) -> Dict[str, Optional[str]]:
+    """Hash each path; missing files map to None."""
+    return {str(path): file_hash(path, cache) if path.exists() else None for path in paths}
+
+
+def code_fingerprint(modules: List[str]) -> str:
+    """Hash of the source of the modules a stage runs."""
+    digest = hashlib.blake2b(digest_size=16)
+    for module in modules:
+        digest.update(module.encode('utf-8'))
+        digest.update((SCRIPT_DIR / module).read_bytes())
+    return digest.hexdigest()
+
+
+def stage_key(inputs: Dict[str, Optional[str]], code: str, config: List[str]) -> str:
+    """Cache key of a stage run."""
+    payload = json.dumps({'inputs': inputs, 'code': code, 'config': config}, sort_keys=True)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def load_manifest(path: Path = MANIFEST_PATH) -> Dict[str, Any]:
+    """Load the pipeline manifest, or an empty one."""
+    if path.exists():
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('version') == MANIFEST_VERSION:
+                return manifest
+        except (OSError, ValueError):
+            pass
+    return {'version': MANIFEST_VERSION, 'files': {}, 'stages': {}}
+
+
+def save_manifest(manifest: Dict[str, Any], path: Path = MANIFEST_PATH):
+    """Write the manifest atomically."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(path.name + '.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    temp_path.replace(path)
+
+
+def dump_paths() -> List[Path]:
+    """The dumps process_wiktionary.py and a fused build read: those of the default pack."""
+    return [process_wiktionary.find_input_file(process_wiktionary.DATA_DIR, source.name)
+            for source in sources_for([PACKS[DEFAULT_PACK]])]
+
+
+def stage_files(name: str, stage_args: List[str]) -> Dict[str, List[Path]]:
+    """Input and output files of a stage, given the arguments it will run with."""
+    if name == 'download':
+        args = download_data.parse_args(stage_args)
+        names = [source.name for source in sources_for(resolve_packs(args.packs))]
+        names += [source.partition('=')[0] for source in args.source if source.partition('=')[0] not in names]
+        return {
+            'inputs': [],
+            'outputs': [download_data.output_path_for(args.output_dir, source, args.compression)
+                        for source in names],
+        }
+
+    if name == 'process':
+        args = process_wiktionary.parse_args(stage_args)
+        return {
+            'inputs': dump_paths(),
+            'outputs': [
+                process_wiktionary.OUTPUT_DIR / process_wiktionary.output_file_name(stem, args.output_format)
+                for stem in ('english_processed', 'hindi_processed', 'all_words')
+            ],
+        }
+
+    if name == 'packs':
+        args = build_packs.parse_args(stage_args)
+        packs = resolve_packs(args.packs)
+        return {
+            'inputs': [process_wiktionary.find_input_file(process_wiktionary.DATA_DIR, source.name)
+                       for source in sources_for(packs)],
+            'outputs': [args.output_dir / pack.database_name for pack in packs],
+        }
+
+    args = build_database.parse_args(stage_args)
+    if args.fused:
+        # A fused build parses the dumps itself
+        inputs = dump_paths()
+    else:
+        inputs = [build_database.find_processed_data(build_database.OUTPUT_DIR) or
+                  build_database.OUTPUT_DIR / 'all_words.jsonl']
+    if args.layout:
+        database = build_database.LAYOUT_DATABASE_PATH
+    elif args.profile == 'compact':
+        database = build_database.COMPACT_DATABASE_PATH
+    else:
+        database = build_database.DATABASE_PATH
+    # An incremental build patches the existing database, so it is an input too
+    if args.incremental:
+        inputs.append(database)
+    return {
+        'inputs': inputs + list(args.frequency_file),
+        'outputs': [database],
+    }
+
+
+def stage_status(name: str, stage_args: List[str], manifest: Dict[str, Any]) -> Dict[str, Any]:
+    """Work out whether a stage is up to date, and why not if it is stale."""
+    script, modules = STAGES[name]
+    files = stage_files(name, stage_args)
+    cache = manifest['files']
+
+    inputs = hash_files(files['inputs'], cache)
+    code = code_fingerprint(modules)
+    key = stage_key(inputs, code, stage_args)
+    record = manifest['stages'].get(name)
+
+    reasons = []
+    if name in ALWAYS_RUN:
+        reasons.append(ALWAYS_RUN[name])
+    if record is None:
+        reasons.append("never run")
+    else:
+        if record['code'] != code:
+            reasons.append("code changed")
+        if record['config'] != stage_args:
+            reasons.append("config changed")
+        for path, digest in inputs.items():
+            if digest is None:
+                reasons.append(f"input missing: {path}")
+            elif record['inputs'].get(path) != digest:
+                reasons.append(f"input changed: {path}")
+        outputs = hash_files([Path(p) for p in record['outputs']], cache)
+        for path, digest in outputs.items():
+            if digest is None:
+                reasons.append(f"output missing: {path}")
+            elif record['outputs'][path] != digest:
+                reasons.append(f"output modified: {path}")
+        if set(record['outputs']) != {str(p) for p in files['outputs']}:
+            reasons.append("output set changed")
+
+    return {
+        'script': script,
+        'key': key,
+        'code': code,
+        'inputs': inputs,
+        'outputs': files['outputs'],
+        'reasons': reasons,
+        'cached': not reasons and record is not None and record['key'] == key,
+    }
+
+
+def run_stage(name: str, status: Dict[str, Any], stage_args: List[str],
+              manifest: Dict[str, Any]) -> bool:
+    """Run a stage script and record its outputs in the manifest."""
+    command = [sys.executable, str(SCRIPT_DIR / status['script'])] + stage_args
+    start = time.perf_counter()
+    result = subprocess.run(command, cwd=SCRIPT_DIR)
+    seconds = time.perf_counter() - start
+    if result.returncode != 0:
+        print(f"[ERROR] {name} failed with exit code {result.returncode}")
+        return False
+
+    outputs = hash_files(status['outputs'], manifest['files'])
+    missing = [path for path, digest in outputs.items() if digest is None]
+    if missing:
+        print(f"[ERROR] {name} did not produce: {', '.join(missing)}")
+        return False
+
+    manifest['stages'][name] = {
+        'key': status['key'],
+        'code': status['code'],
+        'config': stage_args,
+        'inputs': status['inputs'],
+        'outputs': outputs,
+        'completed_at': datetime.now().isoformat(),
+        'seconds': round(seconds, 2),
+    }
+    save_manifest(manifest)
+    return True
+
+
+def print_status(name: str, status: Dict[str, Any], forced: bool):
+    """Print one line of the cache-status report."""
+    if forced:
+        print(f"[FORCE] {name}")
+    elif status['cached']:
+        print(f"[CACHED] {name}")
+    else:
+        print(f"[STALE] {name}: {'; '.join(status['reasons']) or 'key changed'}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Run download -> process -> build, skipping stages whose inputs are unchanged"
+    )
+    parser.add_argument(
+        '--stages', default=','.join(DEFAULT_STAGES),
+        help=f"Comma-separated stages to consider, in order, from {', '.join(STAGES)} "
+             f"(default: {','.join(DEFAULT_STAGES)})"
+    )
+    parser.add_argument(
+        '--force', action='append', default=[], choices=list(STAGES),
+        help="Rerun a stage even if it is cached; may be repeated"
+    )
+    parser.add_argument(
+        '--status', action='store_true',
+        help="Report which stages are cached or stale, and why, without running anything"
+    )
+    for name, (script, _) in STAGES.items():
+        parser.add_argument(
+            f'--{name}-args', default='',
+            help=f"Arguments passed to {script}, e.g. --{name}-args=\"--workers 8\""
+        )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print("=" * 60)
+    print("Dictionary Data Pipeline")
+    print("=" * 60)
+    print()
+
+    stages = [name.strip() for name in args.stages.split(',') if name.strip()]
+    unknown = [name for name in stages if name not in STAGES]
+    if unknown:
+        print(f"[ERROR] Unknown stage(s): {', '.join(unknown)}")
+        return 1
+
+    manifest = load_manifest()
+    ran = []
+
+    for name in stages:
+        stage_args = shlex.split(getattr(args, f'{name}_args'))
+        status = stage_status(name, stage_args, manifest)
+        forced = name in args.force
+        print_status(name, status, forced)
+
+        if args.status:
+            # Later stages are judged against the outputs on disk now; a
+            # stale upstream stage may still change them
+            continue
+        if status['cached'] and not forced:
+            continue
+
+        print()
+        if not run_stage(name, status, stage_args, manifest):
+            return 1
+        ran.append(name)
+        print()
+
+    # Persist hashes computed for the status checks, so the next run can reuse them
+    save_manifest(manifest)
+
+    print()
+    print("=" * 60)
+    if args.status:
+        print(f"Manifest: {MANIFEST_PATH}")
+    elif ran:
+        print(f"Pipeline complete! Ran: {', '.join(ran)}")
+    else:
+        print("Pipeline complete! Everything was up to date.")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
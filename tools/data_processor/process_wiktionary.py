@@ -9,20 +9,83 @@ This script:
 4. Outputs processed JSON files ready for database building
 """
 
+import argparse
+import gzip
+import heapq
+import io
 import json
 import os
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, List, Dict, Any
-from dataclasses import dataclass, asdict
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Tuple, TypedDict
+from dataclasses import dataclass, asdict, astuple
+from functools import partial
+from itertools import chain
 from tqdm import tqdm
 
+from language_packs import (
+    DEFAULT_PACK,
+    PACKS,
+    LanguagePack,
+    SourceDump,
+    sources_for,
+    translation_languages,
+)
+
+try:
+    import msgspec
+except ImportError:  # Optional: faster partial decoding
+    msgspec = None
+
+try:
+    import zstandard
+except ImportError:  # Optional: reading .zst dumps
+    zstandard = None
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; peak RSS is not reported there
+    resource = None
+
 DATA_DIR = Path(__file__).parent / 'data'
 OUTPUT_DIR = Path(__file__).parent / 'output'
 
+# Each worker gets several shards so a slow region of the file does not stall the pool
+SHARDS_PER_WORKER = 4
+
+# How many lines to parse between refreshes of the live counters
+PROGRESS_INTERVAL = 10000
+
+# Upper bound on a shard, so the words in flight do not grow with the file
+MAX_SHARD_BYTES = 8 * 1024 * 1024
+
+# Shards queued or parsed ahead of the consumer, per worker
+SHARDS_IN_FLIGHT_PER_WORKER = 2
+
+# Lines per batch sent to a worker when a compressed input cannot be sharded
+STREAM_BATCH_LINES = 2000
+
+# Input file extensions tried for each source, in order of preference
+INPUT_SUFFIXES = ('.jsonl', '.jsonl.zst', '.jsonl.gz')
+
+# Distinct keys held in memory per sorted run by the external deduplicator
+DEDUP_RUN_SIZE = 200000
+
 
 @dataclass
 class ProcessedWord:
     """Represents a processed dictionary entry."""
+    # Slotted, as millions of these are alive at once during deduplication
+    __slots__ = ('word', 'language', 'pos', 'definitions', 'translations',
+                 'pronunciation_ipa', 'examples', 'etymology')
+
     word: str
     language: str  # 'en' or 'hi'
     pos: str  # Part of speech
@@ -33,6 +96,67 @@ class ProcessedWord:
     etymology: Optional[str]
 
 
+# Schema of the kaikki fields the extract_* helpers read. Decoding against it
+# with msgspec skips everything else (inflection tables, descendants,
+# categories, ...) without materializing it. Leaf values are left untyped so
+# that malformed entries fail in the same place as with the stdlib decoder.
+class KaikkiExample(TypedDict, total=False):
+    text: Any
+
+
+class KaikkiSense(TypedDict, total=False):
+    glosses: List[Any]
+    examples: List[KaikkiExample]
+
+
+class KaikkiTranslation(TypedDict, total=False):
+    lang: Any
+    code: Any
+    word: Any
+
+
+class KaikkiSound(TypedDict, total=False):
+    ipa: Any
+
+
+class KaikkiEntry(TypedDict, total=False):
+    word: Any
+    lang: Any
+    lang_code: Any
+    pos: Any
+    senses: List[KaikkiSense]
+    translations: List[KaikkiTranslation]
+    sounds: List[KaikkiSound]
+    etymology_text: Any
+
+
+_msgspec_decoder = None
+
+
+def decode_entry_msgspec(line: bytes) -> Dict[str, Any]:
+    """Decode a kaikki line into a dict holding only the KaikkiEntry fields."""
+    global _msgspec_decoder
+    if _msgspec_decoder is None:
+        _msgspec_decoder = msgspec.json.Decoder(KaikkiEntry)
+    return _msgspec_decoder.decode(line)
+
+
+DECODERS = {
+    'json': json.loads,
+    'msgspec': decode_entry_msgspec,
+}
+
+
+def resolve_decoder(name: str):
+    """Get the decode function for a backend name, falling back to stdlib json."""
+    if name == 'auto':
+        name = 'msgspec' if msgspec is not None else 'json'
+    if name == 'msgspec' and msgspec is None:
+        print("[WARN] msgspec is not installed, falling back to the json decoder")
+        name = 'json'
+    return DECODERS[name]
+
+
 def extract_definitions(senses: List[Dict]) -> List[str]:
     """Extract definitions from senses."""
     definitions = []
@@ -52,7 +176,8 @@ def extract_translations(entry: Dict, target_lang: str) -> List[str]:
             word = trans.get('word', '').strip()
             if word:
                 translations.append(word)
-    return list(set(translations))  # Remove duplicates
+    # Remove duplicates, keeping first-seen order so output is deterministic
+    return list(dict.fromkeys(translations))
 
 
 def extract_pronunciation(entry: Dict) -> Optional[str]:
@@ -75,17 +200,19 @@ def extract_examples(senses: List[Dict], max_examples: int = 3) -> List[str]:
     return examples
 
 
-def process_english_entry(entry: Dict) -> Optional[ProcessedWord]:
-    """Process an English Wiktionary entry."""
+def process_entry(entry: Dict, lang_code: str,
+                  translation_languages: Tuple[Tuple[str, str], ...]) -> Optional[ProcessedWord]:
+    """Process a Wiktionary entry of one headword language.
+
+    `translation_languages` lists the (code, name) of the languages whose
+    translations are kept; words without any are still included.
+    """
     word = entry.get('word', '').strip()
     if not word:
         return None
 
-    lang = entry.get('lang', '')
-    lang_code = entry.get('lang_code', '')
-
-    # We want English words
-    if lang_code != 'en':
+    # Dumps can hold entries of other languages
+    if entry.get('lang_code', '') != lang_code:
         return None
 
     pos = entry.get('pos', 'unknown')
@@ -95,17 +222,15 @@ def process_english_entry(entry: Dict) -> Optional[ProcessedWord]:
     if not definitions:
         return None
 
-    # Get Hindi translations (optional - not all words have them)
-    hindi_translations = extract_translations(entry, 'Hindi')
-
-    # Include word even if no Hindi translations (hybrid approach)
     translations = {}
-    if hindi_translations:
-        translations['hi'] = hindi_translations
+    for code, name in translation_languages:
+        found = extract_translations(entry, name)
+        if found:
+            translations[code] = found
 
     return ProcessedWord(
         word=word,
-        language='en',
+        language=lang_code,
         pos=pos,
         definitions=definitions,
         translations=translations,
@@ -115,85 +240,586 @@ def process_english_entry(entry: Dict) -> Optional[ProcessedWord]:
     )
 
 
+def source_processor(source: SourceDump, packs: List[LanguagePack]):
+    """Entry processor for a source dump, keeping the translations every pack needs.
+
+    A partial of a module-level function, so it pickles to worker processes.
+    """
+    return partial(process_entry, lang_code=source.lang_code,
+                   translation_languages=translation_languages(source, packs))
+
+
+def process_english_entry(entry: Dict) -> Optional[ProcessedWord]:
+    """Process an English Wiktionary entry (English words with Hindi translations)."""
+    return process_entry(entry, 'en', (('hi', 'Hindi'),))
+
+
 def process_hindi_entry(entry: Dict) -> Optional[ProcessedWord]:
-    """Process a Hindi Wiktionary entry."""
-    word = entry.get('word', '').strip()
-    if not word:
-        return None
+    """Process a Hindi Wiktionary entry (Hindi words with English translations)."""
+    return process_entry(entry, 'hi', (('en', 'English'),))
 
-    lang = entry.get('lang', '')
-    lang_code = entry.get('lang_code', '')
 
-    # We want Hindi words
-    if lang_code != 'hi':
-        return None
+def lang_code_prefilter(lang_code: str) -> 're.Pattern[bytes]':
+    """Build a raw-bytes pattern that every line with the given lang_code matches.
 
-    pos = entry.get('pos', 'unknown')
-    senses = entry.get('senses', [])
+    This is a necessary condition only: a line can also match through a nested
+    object, in which case it is decoded and the processor rejects it as usual.
+    Lines that do not match are skipped without paying for json.loads.
+    """
+    return re.compile(rb'"lang_code"\s*:\s*"' + re.escape(lang_code.encode('ascii')) + rb'"')
 
-    definitions = extract_definitions(senses)
-    if not definitions:
+
+ENGLISH_PREFILTER = lang_code_prefilter('en')
+HINDI_PREFILTER = lang_code_prefilter('hi')
+
+
+def is_compressed(input_path: Path) -> bool:
+    """Check whether an input file is a compressed dump."""
+    return input_path.suffix in ('.gz', '.zst')
+
+
+def find_input_file(data_dir: Path, name: str) -> Path:
+    """Find the dump for a source, plain or compressed.
+
+    A download with another --compression leaves the old file behind, so the
+    newest existing variant is used (INPUT_SUFFIXES order breaks ties). Falls
+    back to the plain .jsonl path if none exists, so callers can report it.
+    """
+    candidates = (data_dir / f'{name}_wiktionary{suffix}' for suffix in INPUT_SUFFIXES)
+    existing = [path for path in candidates if path.exists()]
+    if not existing:
+        return data_dir / f'{name}_wiktionary.jsonl'
+    return max(existing, key=lambda path: path.stat().st_mtime_ns)
+
+
+@contextmanager
+def open_input(input_path: Path):
+    """Open a dump for line-by-line binary reading, decompressing on the fly.
+
+    Yields (stream, raw): iterate `stream` for lines, and use `raw.tell()` for
+    the number of bytes read from disk, which is what progress is measured in.
+    """
+    with open(input_path, 'rb') as raw:
+        if input_path.suffix == '.gz':
+            with gzip.GzipFile(fileobj=raw, mode='rb') as stream:
+                yield stream, raw
+        elif input_path.suffix == '.zst':
+            if zstandard is None:
+                raise RuntimeError("zstandard is required to read .zst files: pip install zstandard")
+            reader = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+            with io.BufferedReader(reader, buffer_size=1024 * 1024) as stream:
+                yield stream, raw
+        else:
+            yield raw, raw
+
+
+def find_shard_boundaries(input_path: Path, num_shards: int) -> List[Tuple[int, int]]:
+    """Split a file into byte ranges that start and end on line boundaries."""
+    file_size = input_path.stat().st_size
+    if file_size == 0:
+        return []
+
+    num_shards = max(1, min(num_shards, file_size))
+    offsets = [0]
+
+    with open(input_path, 'rb') as f:
+        for i in range(1, num_shards):
+            target = (file_size * i) // num_shards
+            if target <= offsets[-1]:
+                continue
+            # Skip forward to the start of the next full line
+            f.seek(target - 1)
+            f.readline()
+            position = f.tell()
+            if position >= file_size:
+                break
+            if position > offsets[-1]:
+                offsets.append(position)
+
+    offsets.append(file_size)
+    return list(zip(offsets[:-1], offsets[1:]))
+
+
+def new_parse_stats(verify: bool = False) -> Dict[str, int]:
+    """Create the counters reported while parsing a file.
+
+    With `verify`, a 'missed' counter tracks prefiltered lines that would have
+    been accepted.
+    """
+    stats = {'accepted': 0, 'rejected': 0, 'failed': 0}
+    if verify:
+        stats['missed'] = 0
+    return stats
+
+
+def merge_parse_stats(total: Dict[str, int], other: Dict[str, int]):
+    """Add one set of parse counters into another."""
+    for key, value in other.items():
+        total[key] += value
+
+
+def parse_line(line: bytes, processor_func, stats: Dict[str, int],
+               prefilter=None, decoder=json.loads) -> Optional[ProcessedWord]:
+    """Decode and process a single JSONL line, updating the parse counters.
+
+    If `stats` has a 'missed' counter, lines rejected by the prefilter are
+    still processed, and counted there if the processor would keep them.
+    """
+    if prefilter is not None and not prefilter.search(line):
+        stats['rejected'] += 1
+        if 'missed' in stats and parse_line(line, processor_func, new_parse_stats(),
+                                            decoder=decoder):
+            stats['missed'] += 1
         return None
 
-    # Get English translations
-    english_translations = extract_translations(entry, 'English')
+    try:
+        entry = decoder(line)
+        processed = processor_func(entry)
+    except json.JSONDecodeError:
+        stats['failed'] += 1
+        return None
+    except Exception as e:
+        stats['failed'] += 1
+        return None
 
-    return ProcessedWord(
-        word=word,
-        language='hi',
-        pos=pos,
-        definitions=definitions,
-        translations={'en': english_translations},
-        pronunciation_ipa=extract_pronunciation(entry),
-        examples=extract_examples(senses),
-        etymology=entry.get('etymology_text'),
-    )
+    if processed:
+        stats['accepted'] += 1
+    else:
+        stats['rejected'] += 1
+    return processed
+
+
+def process_shard(input_path: Path, start: int, end: int, processor_func,
+                  prefilter=None, decoder=json.loads,
+                  verify: bool = False) -> Tuple[List[tuple], Dict[str, int]]:
+    """Process one byte range of a JSONL file.
+
+    Results are returned as plain tuples, which pickle much smaller and faster
+    than dataclass instances when sent back from a worker process.
+    """
+    results = []
+    stats = new_parse_stats(verify)
+
+    with open(input_path, 'rb') as f:
+        f.seek(start)
+        position = start
+        while position < end:
+            line = f.readline()
+            if not line:
+                break
+            position += len(line)
+            processed = parse_line(line, processor_func, stats, prefilter, decoder)
+            if processed:
+                results.append(astuple(processed))
+
+    return results, stats
 
 
-def process_file(input_path: Path, processor_func, description: str) -> List[ProcessedWord]:
-    """Process a JSONL file and return processed words."""
+def process_lines(lines: List[bytes], processor_func, prefilter=None,
+                  decoder=json.loads, verify: bool = False) -> Tuple[List[tuple], Dict[str, int]]:
+    """Process a batch of raw lines in a worker, returning compact tuples."""
     results = []
+    stats = new_parse_stats(verify)
+    for line in lines:
+        processed = parse_line(line, processor_func, stats, prefilter, decoder)
+        if processed:
+            results.append(astuple(processed))
+    return results, stats
+
+
+def iter_stream_parallel(input_path: Path, processor_func, description: str,
+                         workers: int, stats: Dict[str, int], prefilter=None,
+                         decoder=json.loads) -> Iterator[List[ProcessedWord]]:
+    """Process a compressed file across a pool of worker processes.
+
+    Compressed streams cannot be split into byte ranges, so this process
+    decompresses and hands out batches of lines instead. A bounded number of
+    batches is kept in flight, and results are yielded in submission order
+    so the output matches the serial path.
+    """
+    file_size = input_path.stat().st_size
+    verify = 'missed' in stats
+    pending = deque()
+
+    def collect(future) -> List[ProcessedWord]:
+        rows, batch_stats = future.result()
+        merge_parse_stats(stats, batch_stats)
+        return [ProcessedWord(*row) for row in rows]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor, \
+            open_input(input_path) as (stream, raw), \
+            tqdm(total=file_size, unit='B', unit_scale=True, desc=description) as pbar:
+        batch = []
+        decompressed_bytes = 0
+        for line in stream:
+            batch.append(line)
+            decompressed_bytes += len(line)
+            if len(batch) < STREAM_BATCH_LINES:
+                continue
+
+            pending.append(executor.submit(
+                process_lines, batch, processor_func, prefilter, decoder, verify
+            ))
+            batch = []
+            if len(pending) >= workers * SHARDS_PER_WORKER:
+                yield collect(pending.popleft())
+                pbar.set_postfix(stats, refresh=False)
+            pbar.update(raw.tell() - pbar.n)
+
+        if batch:
+            pending.append(executor.submit(
+                process_lines, batch, processor_func, prefilter, decoder, verify
+            ))
+        while pending:
+            yield collect(pending.popleft())
+        pbar.set_postfix(stats)
+        pbar.update(file_size - pbar.n)
+
+    print_parse_stats(stats)
+    print_compression_stats(file_size, decompressed_bytes)
+
+
+def iter_file_parallel(input_path: Path, processor_func, description: str,
+                       workers: int, stats: Dict[str, int], prefilter=None,
+                       decoder=json.loads) -> Iterator[List[ProcessedWord]]:
+    """Process a JSONL file across a pool of worker processes.
+
+    Shards are yielded in file order, so the output matches the serial path.
+    Shards are at most MAX_SHARD_BYTES and only a bounded number are in
+    flight, so memory does not grow with the file.
+    """
+    file_size = input_path.stat().st_size
+    num_shards = max(workers * SHARDS_PER_WORKER, -(-file_size // MAX_SHARD_BYTES))
+    shards = deque(find_shard_boundaries(input_path, num_shards))
+    verify = 'missed' in stats
+    pending = deque()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor, \
+            tqdm(total=file_size, unit='B', unit_scale=True, desc=description) as pbar:
+        while shards or pending:
+            while shards and len(pending) < workers * SHARDS_IN_FLIGHT_PER_WORKER:
+                start, end = shards.popleft()
+                pending.append((end - start, executor.submit(
+                    process_shard, input_path, start, end, processor_func,
+                    prefilter, decoder, verify
+                )))
+            size, future = pending.popleft()
+            rows, shard_stats = future.result()
+            merge_parse_stats(stats, shard_stats)
+            pbar.set_postfix(stats, refresh=False)
+            pbar.update(size)
+            yield [ProcessedWord(*row) for row in rows]
+
+    print_parse_stats(stats)
+
+
+def print_compression_stats(compressed_bytes: int, decompressed_bytes: int):
+    """Report how much disk space and I/O reading a compressed dump saved.
+
+    Sizes only; --benchmark-io times the I/O itself.
+    """
+    if not decompressed_bytes:
+        return
+    mb = 1024 * 1024
+    print(
+        f"  Compressed input: {compressed_bytes / mb:,.1f} MB on disk, "
+        f"{decompressed_bytes / mb:,.1f} MB decompressed in-stream "
+        f"({decompressed_bytes / max(compressed_bytes, 1):.1f}x)"
+    )
+    print(
+        f"  Saved {(decompressed_bytes - compressed_bytes) / mb:,.1f} MB of disk space, "
+        f"and writing plus re-reading {decompressed_bytes / mb:,.1f} MB of inflated data"
+    )
+
+
+def print_parse_stats(stats: Dict[str, int]):
+    """Print the final parse counters for a file."""
+    print(
+        f"  Accepted: {stats['accepted']:,}  "
+        f"Rejected: {stats['rejected']:,}  "
+        f"Failed: {stats['failed']:,}"
+    )
+
+
+def iter_processed_batches(input_path: Path, processor_func, description: str,
+                           workers: int = 1, prefilter=None, decoder=json.loads,
+                           stats: Optional[Dict[str, int]] = None) -> Iterator[List[ProcessedWord]]:
+    """Process a JSONL file, yielding its words one shard or batch at a time.
+
+    The file is read in a single pass; progress is reported in bytes consumed
+    against the file size, so no up-front line count is needed. If `prefilter`
+    is given, lines it does not match are rejected before JSON decoding.
+    `decoder` turns a raw line into an entry dict (see DECODERS). The parse
+    counters are added to `stats` if given (see new_parse_stats).
+
+    Inputs ending in .gz or .zst are decompressed while they are parsed.
+    """
+    if stats is None:
+        stats = new_parse_stats()
 
     if not input_path.exists():
         print(f"[SKIP] File not found: {input_path}")
-        return results
+        return
 
-    # Count lines for progress bar
-    with open(input_path, 'r', encoding='utf-8') as f:
-        total_lines = sum(1 for _ in f)
+    if workers > 1 and is_compressed(input_path):
+        yield from iter_stream_parallel(
+            input_path, processor_func, description, workers, stats, prefilter, decoder
+        )
+        return
+    if workers > 1:
+        yield from iter_file_parallel(
+            input_path, processor_func, description, workers, stats, prefilter, decoder
+        )
+        return
 
-    with open(input_path, 'r', encoding='utf-8') as f:
-        for line in tqdm(f, total=total_lines, desc=description):
-            try:
-                entry = json.loads(line)
-                processed = processor_func(entry)
-                if processed:
-                    results.append(processed)
-            except json.JSONDecodeError:
-                continue
-            except Exception as e:
-                continue
+    file_size = input_path.stat().st_size
+    decompressed_bytes = 0
+    batch = []
+
+    with open_input(input_path) as (stream, raw), \
+            tqdm(total=file_size, unit='B', unit_scale=True, desc=description) as pbar:
+        for line_number, line in enumerate(stream, 1):
+            processed = parse_line(line, processor_func, stats, prefilter, decoder)
+            if processed:
+                batch.append(processed)
+            decompressed_bytes += len(line)
+            if line_number % PROGRESS_INTERVAL == 0:
+                pbar.update(raw.tell() - pbar.n)
+                pbar.set_postfix(stats, refresh=False)
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+        pbar.set_postfix(stats)
+        pbar.update(file_size - pbar.n)
+
+    print_parse_stats(stats)
+    if is_compressed(input_path):
+        print_compression_stats(file_size, decompressed_bytes)
 
+
+def process_file(input_path: Path, processor_func, description: str,
+                 workers: int = 1, prefilter=None,
+                 decoder=json.loads) -> List[ProcessedWord]:
+    """Process a JSONL file and return all its processed words (see iter_processed_batches)."""
+    results = []
+    for batch in iter_processed_batches(input_path, processor_func, description,
+                                        workers, prefilter, decoder):
+        results.extend(batch)
     return results
 
 
+def report_prefilter_check(stats: Dict[str, int]) -> bool:
+    """Report the --verify-prefilter result of a file parsed with new_parse_stats(verify=True).
+
+    Every line the prefilter rejected was also run through the processor, shard
+    by shard; the output is identical to an unfiltered run if none was kept.
+    """
+    if not stats['missed']:
+        print(f"  [OK] Prefilter verified: {stats['accepted']} words match the unfiltered run")
+        return True
+
+    print(
+        f"  [MISMATCH] Prefilter changed the output: {stats['missed']} rejected "
+        f"lines would have been kept"
+    )
+    return False
+
+
+def benchmark_compressed_io(input_path: Path, temp_dir: Optional[Path] = None):
+    """Time reading a compressed dump in-stream against inflating it to disk first.
+
+    The second path is what processing a compressed dump used to take: write
+    the decompressed file, then read it back. No lines are parsed, as parsing
+    costs the same either way. The read-back follows the write, so it is
+    mostly served from the page cache and is a lower bound.
+    """
+    if not is_compressed(input_path):
+        print(f"  [SKIP] {input_path.name} is not compressed")
+        return
+
+    mb = 1024 * 1024
+    start = time.perf_counter()
+    decompressed_bytes = 0
+    with open_input(input_path) as (stream, _):
+        for chunk in iter(lambda: stream.read(mb), b''):
+            decompressed_bytes += len(chunk)
+    stream_seconds = time.perf_counter() - start
+
+    with tempfile.NamedTemporaryFile(dir=temp_dir, suffix='.jsonl') as inflated:
+        start = time.perf_counter()
+        with open_input(input_path) as (stream, _):
+            for chunk in iter(lambda: stream.read(mb), b''):
+                inflated.write(chunk)
+        inflated.flush()
+        os.fsync(inflated.fileno())
+        inflate_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with open(inflated.name, 'rb') as f:
+            for _ in iter(lambda: f.read(mb), b''):
+                pass
+        read_seconds = time.perf_counter() - start
+
+    print(f"  {input_path.name}: {input_path.stat().st_size / mb:,.1f} MB compressed, "
+          f"{decompressed_bytes / mb:,.1f} MB decompressed")
+    print(f"    Read and decompress in-stream: {stream_seconds:8.2f}s")
+    print(f"    Inflate to disk, then read:    {inflate_seconds + read_seconds:8.2f}s "
+          f"(write {inflate_seconds:.2f}s + read {read_seconds:.2f}s)")
+    print(f"    Saved: {inflate_seconds + read_seconds - stream_seconds:.2f}s of I/O, "
+          f"{(decompressed_bytes - input_path.stat().st_size) / mb:,.1f} MB of disk")
+
+
+def benchmark_decoders(input_path: Path, sample_size: int = 10000):
+    """Compare per-entry decode time and retained memory of each decoder backend."""
+    lines = []
+    with open_input(input_path) as (stream, _):
+        for line in stream:
+            if len(lines) >= sample_size:
+                break
+            if line.strip():
+                lines.append(line)
+
+    if not lines:
+        print(f"  [SKIP] No lines to sample in {input_path}")
+        return
+
+    print(f"  Sampled {len(lines):,} entries from {input_path.name}")
+    for name, decoder in DECODERS.items():
+        if name == 'msgspec' and msgspec is None:
+            print(f"  {name:>8}: not installed")
+            continue
+
+        start = time.perf_counter()
+        for line in lines:
+            try:
+                decoder(line)
+            except Exception:
+                pass
+        elapsed = time.perf_counter() - start
+
+        # Memory held by the decoded entries, as a proxy for allocation cost
+        tracemalloc.start()
+        decoded = []
+        for line in lines:
+            try:
+                decoded.append(decoder(line))
+            except Exception:
+                pass
+        retained, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del decoded
+
+        print(
+            f"  {name:>8}: {elapsed / len(lines) * 1e6:8.1f} us/entry, "
+            f"{retained / len(lines) / 1024:8.2f} KB/entry retained"
+        )
+
+
+def dedup_key(word: ProcessedWord) -> Tuple[str, str, str]:
+    """Key under which entries count as duplicates."""
+    return (word.word.lower(), word.language, word.pos)
+
+
+def dedup_score(word: ProcessedWord) -> int:
+    """How much information an entry carries; the higher score wins a duplicate."""
+    return len(word.definitions) + sum(len(v) for v in word.translations.values())
+
+
 def deduplicate_words(words: List[ProcessedWord]) -> List[ProcessedWord]:
     """Remove duplicate entries, keeping the one with most information."""
     seen = {}
 
     for word in words:
-        key = (word.word.lower(), word.language, word.pos)
-        if key not in seen:
-            seen[key] = word
-        else:
-            # Keep the entry with more definitions/translations
-            existing = seen[key]
-            existing_score = len(existing.definitions) + sum(len(v) for v in existing.translations.values())
-            new_score = len(word.definitions) + sum(len(v) for v in word.translations.values())
-            if new_score > existing_score:
-                seen[key] = word
+        key = dedup_key(word)
+        score = dedup_score(word)
+        # Keep the entry with more definitions/translations; the first wins ties
+        if key not in seen or score > seen[key][0]:
+            seen[key] = (score, word)
+
+    return [word for _, word in seen.values()]
+
+
+def dedup_sort_key(key: Tuple[str, str, str]) -> tuple:
+    """Total order on dedup keys; pos may be None in malformed entries."""
+    word, language, pos = key
+    return (word, language, pos is None, pos or '')
+
+
+def write_dedup_run(entries: Dict[tuple, tuple], run_dir: Path, run_number: int) -> Path:
+    """Write one run of (key, score, sequence, record) rows, sorted by key."""
+    run_path = run_dir / f'dedup_run_{run_number:05d}.jsonl'
+    with open(run_path, 'w', encoding='utf-8') as f:
+        for key in sorted(entries, key=dedup_sort_key):
+            score, sequence, record = entries[key]
+            f.write(json.dumps([key, score, sequence, record], ensure_ascii=False,
+                               separators=(',', ':')))
+            f.write('\n')
+    return run_path
 
-    return list(seen.values())
+
+def read_dedup_run(run_path: Path) -> Iterator[tuple]:
+    """Stream the rows of a run back, with the key as a tuple for ordering."""
+    with open(run_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            key, score, sequence, record = json.loads(line)
+            yield tuple(key), score, sequence, record
+
+
+def deduplicate_words_external(words: Iterable[ProcessedWord], run_dir: Path,
+                               run_size: int = DEDUP_RUN_SIZE) -> Iterator[ProcessedWord]:
+    """Deduplicate in bounded memory, with the same rule as deduplicate_words.
+
+    Entries are reduced in memory until `run_size` distinct keys are held,
+    then spilled to `run_dir` as a run sorted by key. The runs are merged
+    with a heap, and for each key the highest score wins, with the earliest
+    entry winning ties as in the in-memory version. Output is in key order
+    rather than first-seen order.
+    """
+    run_paths = []
+    entries = {}
+
+    for sequence, word in enumerate(words):
+        key = dedup_key(word)
+        score = dedup_score(word)
+        if key not in entries or score > entries[key][0]:
+            entries[key] = (score, sequence, astuple(word))
+        if len(entries) >= run_size:
+            run_paths.append(write_dedup_run(entries, run_dir, len(run_paths)))
+            entries.clear()
+
+    if entries:
+        run_paths.append(write_dedup_run(entries, run_dir, len(run_paths)))
+        entries.clear()
+
+    print(f"\n[DEDUP] Merging {len(run_paths)} sorted spill runs...")
+    best = None
+    for row in heapq.merge(*(read_dedup_run(path) for path in run_paths),
+                           key=lambda row: dedup_sort_key(row[0])):
+        if best is not None and row[0] != best[0]:
+            yield ProcessedWord(*best[3])
+            best = None
+        # Higher score wins; on a tie the earlier entry (lower sequence) does
+        if best is None or (row[1], -row[2]) > (best[1], -best[2]):
+            best = row
+    if best is not None:
+        yield ProcessedWord(*best[3])
+
+    for path in run_paths:
+        path.unlink()
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process and its finished children, in MB."""
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    return peak * scale / (1024 * 1024)
 
 
 def save_results(words: List[ProcessedWord], output_path: Path):
@@ -209,76 +835,224 @@ def save_results(words: List[ProcessedWord], output_path: Path):
         )
 
 
+def save_results_ndjson(words: Iterable[ProcessedWord], output_path: Path) -> int:
+    """Save processed words as compact NDJSON, one record per line.
+
+    Records are serialized one at a time, so the full output never has to be
+    built in memory, and readers can stream it back the same way.
+    """
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    count = 0
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for w in words:
+            f.write(json.dumps(asdict(w), ensure_ascii=False, separators=(',', ':')))
+            f.write('\n')
+            count += 1
+    return count
+
+
+def save_results_by_language(words: Iterable[ProcessedWord], output_dir: Path) -> Dict[str, int]:
+    """Stream words into the English, Hindi and combined NDJSON files in one pass.
+
+    Returns the number of words written to each ('en', 'hi' and 'all').
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    counts = {'en': 0, 'hi': 0, 'all': 0}
+    with open(output_dir / 'english_processed.jsonl', 'w', encoding='utf-8') as english, \
+            open(output_dir / 'hindi_processed.jsonl', 'w', encoding='utf-8') as hindi, \
+            open(output_dir / 'all_words.jsonl', 'w', encoding='utf-8') as combined:
+        by_language = {'en': english, 'hi': hindi}
+        for w in words:
+            line = json.dumps(asdict(w), ensure_ascii=False, separators=(',', ':')) + '\n'
+            combined.write(line)
+            counts['all'] += 1
+            if w.language in by_language:
+                by_language[w.language].write(line)
+                counts[w.language] += 1
+    return counts
+
+
+def output_file_name(stem: str, output_format: str) -> str:
+    """Get the output file name for a processed data file."""
+    extension = 'jsonl' if output_format == 'ndjson' else 'json'
+    return f'{stem}.{extension}'
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Process Wiktionary JSONL data")
+    parser.add_argument(
+        '--workers', type=int, default=1,
+        help="Number of worker processes for parsing (default: 1, serial)"
+    )
+    parser.add_argument(
+        '--format', dest='output_format', choices=['ndjson', 'json'], default='ndjson',
+        help="Output format: streaming NDJSON (.jsonl) or legacy JSON arrays (default: ndjson)"
+    )
+    parser.add_argument(
+        '--decoder', choices=['auto', 'msgspec', 'json'], default='auto',
+        help="JSON decoder backend; auto uses msgspec when installed (default: auto)"
+    )
+    parser.add_argument(
+        '--benchmark-decoders', action='store_true',
+        help="Report per-entry decode time for each decoder backend and exit"
+    )
+    parser.add_argument(
+        '--benchmark-io', action='store_true',
+        help="Time reading each compressed dump in-stream against inflating it to disk, and exit"
+    )
+    parser.add_argument(
+        '--no-prefilter', action='store_true',
+        help="Decode every line instead of skipping other languages on the raw bytes"
+    )
+    parser.add_argument(
+        '--verify-prefilter', action='store_true',
+        help="Also run without the prefilter and check the output is identical"
+    )
+    parser.add_argument(
+        '--external-dedup', action='store_true',
+        help="Deduplicate in bounded memory with sorted runs spilled to disk (NDJSON output)"
+    )
+    parser.add_argument(
+        '--dedup-run-size', type=int, default=DEDUP_RUN_SIZE,
+        help=f"Distinct entries held in memory per spill run (default: {DEDUP_RUN_SIZE})"
+    )
+    parser.add_argument(
+        '--spill-dir', type=Path,
+        help="Directory for spill runs and the --benchmark-io inflated copy "
+             "(default: the system temp directory)"
+    )
+    return parser.parse_args(argv)
+
+
 def main():
+    args = parse_args()
+
     print("=" * 60)
     print("Wiktionary Data Processor")
     print("=" * 60)
     print()
 
+    pack = PACKS[DEFAULT_PACK]
+    pack_sources = sources_for([pack])
+
+    if args.benchmark_decoders:
+        print("[BENCHMARK] Decoder backends...")
+        for source in pack_sources:
+            input_file = find_input_file(DATA_DIR, source.name)
+            if input_file.exists():
+                benchmark_decoders(input_file)
+        return
+
+    if args.benchmark_io:
+        print("[BENCHMARK] Compressed input I/O...")
+        for source in pack_sources:
+            input_file = find_input_file(DATA_DIR, source.name)
+            if input_file.exists():
+                benchmark_compressed_io(input_file, args.spill_dir)
+        return
+
+    decoder = resolve_decoder(args.decoder)
+
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-    all_words = []
+    sources = [
+        (f"[{number}/{len(pack_sources)}] Processing {source.language} Wiktionary...",
+         find_input_file(DATA_DIR, source.name), source_processor(source, [pack]),
+         f"{source.language} entries", lang_code_prefilter(source.lang_code),
+         f"{source.language} words")
+        for number, source in enumerate(pack_sources, 1)
+    ]
 
-    # Process English Wiktionary (English words with Hindi translations)
-    english_file = DATA_DIR / 'english_wiktionary.jsonl'
-    if english_file.exists():
-        print("\n[1/2] Processing English Wiktionary...")
-        english_words = process_file(
-            english_file,
-            process_english_entry,
-            "English entries"
-        )
-        print(f"  Found {len(english_words)} English words with Hindi translations")
-        all_words.extend(english_words)
-
-    # Process Hindi Wiktionary (Hindi words with definitions)
-    hindi_file = DATA_DIR / 'hindi_wiktionary.jsonl'
-    if hindi_file.exists():
-        print("\n[2/2] Processing Hindi Wiktionary...")
-        hindi_words = process_file(
-            hindi_file,
-            process_hindi_entry,
-            "Hindi entries"
-        )
-        print(f"  Found {len(hindi_words)} Hindi words")
-        all_words.extend(hindi_words)
+    verify = args.verify_prefilter and not args.no_prefilter
 
-    if not all_words:
-        print("\n[ERROR] No words found! Make sure to run download_data.py first.")
-        return
+    def processed_words() -> Iterator[ProcessedWord]:
+        # Each source of the pack in registry order (English, then Hindi),
+        # streamed a shard at a time so nothing holds a whole file's words
+        for heading, input_file, processor, description, prefilter, found in sources:
+            if not input_file.exists():
+                continue
+            print(f"\n{heading}")
+            stats = new_parse_stats(verify)
+            yield from chain.from_iterable(iter_processed_batches(
+                input_file,
+                processor,
+                description,
+                workers=args.workers,
+                prefilter=None if args.no_prefilter else prefilter,
+                decoder=decoder,
+                stats=stats,
+            ))
+            if verify and not report_prefilter_check(stats):
+                raise SystemExit(1)
+            print(f"  Found {stats['accepted']} {found}")
+
+    if args.external_dedup:
+        if args.output_format != 'ndjson':
+            print("[ERROR] --external-dedup writes NDJSON only")
+            return
+
+        # The dedup is lazy: parsing, spilling and the merge all run while the
+        # output is written, so this message precedes the per-dump output
+        print("\n[DEDUP] Removing duplicates with sorted spill runs while streaming...")
+        with tempfile.TemporaryDirectory(prefix='dedup-', dir=args.spill_dir) as run_dir:
+            unique_words = deduplicate_words_external(
+                processed_words(), Path(run_dir), args.dedup_run_size
+            )
+            counts = save_results_by_language(unique_words, OUTPUT_DIR)
+
+        if not counts['all']:
+            print("\n[ERROR] No words found! Make sure to run download_data.py first.")
+            return
+        print(f"  {counts['all']} unique entries after deduplication")
+        print(f"  Saved to {OUTPUT_DIR}")
+    else:
+        all_words = list(processed_words())
+
+        if not all_words:
+            print("\n[ERROR] No words found! Make sure to run download_data.py first.")
+            return
+
+        # Deduplicate
+        print("\n[DEDUP] Removing duplicates...")
+        all_words = deduplicate_words(all_words)
+        print(f"  {len(all_words)} unique entries after deduplication")
+
+        # Separate by language
+        english_words = [w for w in all_words if w.language == 'en']
+        hindi_words = [w for w in all_words if w.language == 'hi']
 
-    # Deduplicate
-    print("\n[DEDUP] Removing duplicates...")
-    all_words = deduplicate_words(all_words)
-    print(f"  {len(all_words)} unique entries after deduplication")
+        # Save results
+        print("\n[SAVE] Saving processed data...")
 
-    # Separate by language
-    english_words = [w for w in all_words if w.language == 'en']
-    hindi_words = [w for w in all_words if w.language == 'hi']
+        save = save_results_ndjson if args.output_format == 'ndjson' else save_results
 
-    # Save results
-    print("\n[SAVE] Saving processed data...")
+        english_output = OUTPUT_DIR / output_file_name('english_processed', args.output_format)
+        save(english_words, english_output)
+        print(f"  English: {len(english_words)} words -> {english_output}")
 
-    english_output = OUTPUT_DIR / 'english_processed.json'
-    save_results(english_words, english_output)
-    print(f"  English: {len(english_words)} words -> {english_output}")
+        hindi_output = OUTPUT_DIR / output_file_name('hindi_processed', args.output_format)
+        save(hindi_words, hindi_output)
+        print(f"  Hindi: {len(hindi_words)} words -> {hindi_output}")
 
-    hindi_output = OUTPUT_DIR / 'hindi_processed.json'
-    save_results(hindi_words, hindi_output)
-    print(f"  Hindi: {len(hindi_words)} words -> {hindi_output}")
+        combined_output = OUTPUT_DIR / output_file_name('all_words', args.output_format)
+        save(all_words, combined_output)
+        print(f"  Combined: {len(all_words)} words -> {combined_output}")
 
-    combined_output = OUTPUT_DIR / 'all_words.json'
-    save_results(all_words, combined_output)
-    print(f"  Combined: {len(all_words)} words -> {combined_output}")
+        counts = {'en': len(english_words), 'hi': len(hindi_words), 'all': len(all_words)}
 
     print()
     print("=" * 60)
     print("Processing complete!")
     print()
     print("Summary:")
-    print(f"  - English words: {len(english_words)}")
-    print(f"  - Hindi words: {len(hindi_words)}")
-    print(f"  - Total: {len(all_words)}")
+    print(f"  - English words: {counts['en']}")
+    print(f"  - Hindi words: {counts['hi']}")
+    print(f"  - Total: {counts['all']}")
+    peak = peak_rss_mb()
+    if peak is not None:
+        print(f"  - Peak RSS: {peak:.1f} MB")
     print()
     print("Next step: Run 'python build_database.py' to create the SQLite database")
     print("=" * 60)
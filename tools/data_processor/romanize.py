@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Devanagari to Latin romanization for Hindi headwords.
+
+Produces the keys users type when they write Hindi in Latin script
+("pani" for पानी). `romanize` gives one canonical, deterministic spelling;
+`romanized_keys` adds the common loose spellings (short vowels, "w" for व,
+"d"/"dh" for ड़/ढ़, unreduced schwa). All keys are lowercase ASCII letters and single spaces, so
+clients only need `normalize_romanized_query` on the query side.
+"""
+
+import re
+import unicodedata
+from itertools import product
+from typing import List, Optional
+
+NUKTA = '\u093c'
+VIRAMA = '\u094d'
+
+CONSONANTS = {
+    'क': 'k', 'ख': 'kh', 'ग': 'g', 'घ': 'gh', 'ङ': 'n',
+    'च': 'ch', 'छ': 'chh', 'ज': 'j', 'झ': 'jh', 'ञ': 'n',
+    'ट': 't', 'ठ': 'th', 'ड': 'd', 'ढ': 'dh', 'ण': 'n',
+    'त': 't', 'थ': 'th', 'द': 'd', 'ध': 'dh', 'न': 'n',
+    'प': 'p', 'फ': 'ph', 'ब': 'b', 'भ': 'bh', 'म': 'm',
+    'य': 'y', 'र': 'r', 'ल': 'l', 'व': 'v',
+    'श': 'sh', 'ष': 'sh', 'स': 's', 'ह': 'h',
+}
+
+# Consonant + nukta (the precomposed forms decompose to these under NFD)
+NUKTA_CONSONANTS = {
+    'क': 'q', 'ख': 'kh', 'ग': 'gh', 'ज': 'z', 'ड': 'r',
+    'ढ': 'rh', 'फ': 'f', 'य': 'y',
+}
+
+# The flaps ड़/ढ़ are just as often typed as the plain stops ("ladka", "padhna")
+FLAP_LOOSE = {'ड': 'd', 'ढ': 'dh'}
+
+INDEPENDENT_VOWELS = {
+    'अ': 'a', 'आ': 'aa', 'इ': 'i', 'ई': 'ee', 'उ': 'u', 'ऊ': 'oo',
+    'ऋ': 'ri', 'ए': 'e', 'ऐ': 'ai', 'ओ': 'o', 'औ': 'au', 'ऑ': 'o', 'ऍ': 'e',
+}
+
+VOWEL_SIGNS = {
+    'ा': 'aa', 'ि': 'i', 'ी': 'ee', 'ु': 'u', 'ू': 'oo', 'ृ': 'ri',
+    'े': 'e', 'ै': 'ai', 'ो': 'o', 'ौ': 'au', 'ॉ': 'o', 'ॅ': 'e',
+}
+
+# Anusvara and chandrabindu are written as a nasal; visarga as "h"
+NASALS = {'ं': 'n', 'ँ': 'n'}
+VISARGA = 'ः'
+
+LABIALS = ('p', 'ph', 'b', 'bh', 'm')
+
+# Loose spellings of the long vowels and aspirates, applied together
+SHORT_VOWELS = (('aa', 'a'), ('ee', 'i'), ('oo', 'u'), ('chh', 'ch'))
+
+# Upper bound on keys per headword, including the canonical one
+MAX_KEYS = 8
+
+
+class _Consonant:
+    __slots__ = ('latin', 'loose', 'vowel')
+
+    def __init__(self, latin: str):
+        self.latin = latin
+        # Alternative spelling for the loose keys, if any
+        self.loose: Optional[str] = None
+        # None = inherent schwa, '' = suppressed by a virama
+        self.vowel: Optional[str] = None
+
+
+def _tokenize(word: str) -> list:
+    """Split a Devanagari string into consonants and plain Latin strings."""
+    tokens = []
+    chars = unicodedata.normalize('NFD', word)
+
+    for i, char in enumerate(chars):
+        last = tokens[-1] if tokens else None
+        if char in CONSONANTS:
+            tokens.append(_Consonant(CONSONANTS[char]))
+        elif char == NUKTA:
+            base = chars[i - 1] if i else ''
+            if isinstance(last, _Consonant) and base in NUKTA_CONSONANTS:
+                last.latin = NUKTA_CONSONANTS[base]
+                last.loose = FLAP_LOOSE.get(base)
+        elif char in VOWEL_SIGNS:
+            if isinstance(last, _Consonant):
+                last.vowel = VOWEL_SIGNS[char]
+        elif char == VIRAMA:
+            if isinstance(last, _Consonant):
+                last.vowel = ''
+        elif char in INDEPENDENT_VOWELS:
+            tokens.append(INDEPENDENT_VOWELS[char])
+        elif char in NASALS:
+            tokens.append(NASALS[char])
+        elif char == VISARGA:
+            tokens.append('h')
+        elif char.isspace() or char in '-\u2010':
+            tokens.append(' ')
+        elif 'a' <= char.lower() <= 'z':
+            tokens.append(char.lower())
+        # Anything else (punctuation, digits, other scripts) is dropped
+
+    return tokens
+
+
+def _has_vowel(token) -> bool:
+    if isinstance(token, _Consonant):
+        return token.vowel != ''
+    return token not in (' ', 'n', 'h') and bool(token)
+
+
+def _render(tokens: list, reduce_schwa: bool, loose: bool = False) -> str:
+    """Spell out tokens, deleting the inherent schwa where Hindi drops it."""
+    vowels = []
+    for i, token in enumerate(tokens):
+        if isinstance(token, _Consonant):
+            vowels.append('a' if token.vowel is None else token.vowel)
+        else:
+            vowels.append(None)
+
+    def is_consonant(i: int) -> bool:
+        return 0 <= i < len(tokens) and isinstance(tokens[i], _Consonant)
+
+    # Word-final schwa is silent, except after a conjunct (मित्र "mitra") or
+    # in a single-consonant word
+    for i, token in enumerate(tokens):
+        if not (is_consonant(i) and token.vowel is None):
+            continue
+        if i + 1 < len(tokens) and tokens[i + 1] != ' ':
+            continue
+        prev_is_conjunct = is_consonant(i - 1) and vowels[i - 1] == ''
+        prev_in_word = i > 0 and tokens[i - 1] != ' '
+        if prev_in_word and not prev_is_conjunct:
+            vowels[i] = ''
+
+    # Medial schwa between VC_CV is silent too (समझना "samajhna"). Right to
+    # left, so each deletion sees the already-reduced syllable after it.
+    if reduce_schwa:
+        for i in range(len(tokens) - 2, 0, -1):
+            if not (is_consonant(i) and tokens[i].vowel is None and vowels[i] == 'a'):
+                continue
+            if not (is_consonant(i + 1) and vowels[i + 1]):
+                continue
+            before = i - 1
+            if is_consonant(before):
+                if not vowels[before]:
+                    continue
+            elif not _has_vowel(tokens[before]):
+                continue
+            vowels[i] = ''
+
+    parts = []
+    for i, token in enumerate(tokens):
+        if isinstance(token, _Consonant):
+            latin = token.loose if loose and token.loose else token.latin
+            parts.append(latin + vowels[i])
+        elif token == 'n' and i + 1 < len(tokens) and is_consonant(i + 1) \
+                and tokens[i + 1].latin in LABIALS:
+            parts.append('m')
+        else:
+            parts.append(token)
+
+    return re.sub(r'\s+', ' ', ''.join(parts)).strip()
+
+
+def romanize(word: str) -> str:
+    """Canonical romanization of a Hindi word ("पानी" -> "paanee")."""
+    return _render(_tokenize(word), reduce_schwa=True)
+
+
+def romanized_keys(word: str) -> List[str]:
+    """Canonical romanization first, then common loose spellings, deduplicated."""
+    tokens = _tokenize(word)
+    keys = []
+
+    for reduce_schwa, short, w_for_v, flap_as_stop in product(
+            (True, False), (False, True), (False, True), (False, True)):
+        key = _render(tokens, reduce_schwa, loose=flap_as_stop)
+        if short:
+            for long_form, short_form in SHORT_VOWELS:
+                key = key.replace(long_form, short_form)
+        if w_for_v:
+            key = key.replace('v', 'w')
+        if key and key not in keys:
+            keys.append(key)
+
+    return keys[:MAX_KEYS]
+
+
+def normalize_romanized_query(query: str) -> str:
+    """Normalize a Latin-script query to the form stored in romanized keys."""
+    folded = ''.join(
+        c for c in unicodedata.normalize('NFD', query.casefold())
+        if not unicodedata.combining(c)
+    )
+    return re.sub(r'\s+', ' ', re.sub(r'[^a-z\s]', '', folded)).strip()
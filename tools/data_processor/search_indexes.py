@@ -0,0 +1,1245 @@
+#!/usr/bin/env python3
+"""
+Optional search and lookup structures built on top of the standard dictionary
+database.
+
+Each stage is enabled by a `build_database.py` flag and runs after the words
+and their child rows are loaded. Stages that the app queries directly also
+come with a small latency benchmark against the query they replace.
+"""
+
+import json
+import math
+import random
+import sqlite3
+import statistics
+import time
+import unicodedata
+from itertools import groupby
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Queries timed per benchmark
+BENCHMARK_QUERIES = 200
+BENCHMARK_SEED = 42
+
+# (fts table, content table, content column) for the substring indexes
+TRIGRAM_FTS_TABLES = (
+    ('translations_fts', 'translations', 'translation'),
+    ('definitions_fts', 'definitions', 'definition'),
+)
+
+# Definition matches taken from the FTS index per requested result; several
+# definitions of one word collapse under DISTINCT
+FTS_CANDIDATES_PER_RESULT = 4
+
+
+def measure_latency(run: Callable[[Any], Any], inputs: Sequence[Any]) -> Dict[str, float]:
+    """Run a query once per input and summarize its latency in milliseconds."""
+    samples = []
+    for value in inputs:
+        start = time.perf_counter()
+        run(value)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    samples.sort()
+    return {
+        'mean_ms': statistics.fmean(samples) if samples else 0.0,
+        'p50_ms': samples[len(samples) // 2] if samples else 0.0,
+        'p99_ms': samples[min(len(samples) - 1, int(len(samples) * 0.99))] if samples else 0.0,
+    }
+
+
+def print_latency(label: str, latency: Dict[str, float]):
+    """Print one latency summary line."""
+    print(
+        f"    {label:<28} mean {latency['mean_ms']:8.3f} ms   "
+        f"p50 {latency['p50_ms']:8.3f} ms   p99 {latency['p99_ms']:8.3f} ms"
+    )
+
+
+def sample_substrings(conn: sqlite3.Connection, table: str, column: str,
+                      count: int = BENCHMARK_QUERIES, length: int = 4) -> List[str]:
+    """Pick random substrings of existing values to use as benchmark queries."""
+    rng = random.Random(BENCHMARK_SEED)
+    values = [
+        row[0] for row in conn.execute(
+            f"SELECT {column} FROM {table} WHERE length({column}) >= ? "
+            f"ORDER BY random() LIMIT ?", (length, count * 4)
+        )
+    ]
+    if not values:
+        return []
+
+    queries = []
+    for _ in range(count):
+        value = rng.choice(values)
+        start = rng.randrange(0, len(value) - length + 1)
+        queries.append(value[start:start + length])
+    return queries
+
+
+def fts_phrase(query: str) -> str:
+    """Quote a query as a single FTS5 phrase."""
+    return '"' + query.replace('"', '""') + '"'
+
+
+# ---------------------------------------------------------------------------
+# Trigram substring search over translations and definitions
+# ---------------------------------------------------------------------------
+
+def create_trigram_fts(conn: sqlite3.Connection):
+    """Create, fill and keep in sync trigram FTS5 indexes for substring search.
+
+    The trigram tokenizer indexes every 3-character sequence, so MATCH (and
+    LIKE / GLOB on the FTS table) can answer infix queries of 3 or more
+    characters without scanning the content table.
+    """
+    cursor = conn.cursor()
+
+    for fts_table, table, column in TRIGRAM_FTS_TABLES:
+        cursor.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5(
+                {column},
+                content='{table}',
+                content_rowid='id',
+                tokenize='trigram'
+            )
+        """)
+        cursor.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_fts_ai AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts_table}(rowid, {column}) VALUES (new.id, new.{column});
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_fts_ad AFTER DELETE ON {table} BEGIN
+                INSERT INTO {fts_table}({fts_table}, rowid, {column})
+                VALUES ('delete', old.id, old.{column});
+            END
+        """)
+        cursor.execute(f"DROP TRIGGER IF EXISTS {table}_fts_au")
+        cursor.execute(f"""
+            CREATE TRIGGER {table}_fts_au AFTER UPDATE OF id, {column} ON {table} BEGIN
+                INSERT INTO {fts_table}({fts_table}, rowid, {column})
+                VALUES ('delete', old.id, old.{column});
+                INSERT INTO {fts_table}(rowid, {column}) VALUES (new.id, new.{column});
+            END
+        """)
+
+    conn.commit()
+
+
+# SearchDao.searchInTranslations, as issued by the app today
+TRANSLATION_LIKE_SQL = """
+    SELECT DISTINCT w.id, w.word, w.language_code, w.pos, t.translation
+    FROM words w
+    JOIN translations t ON t.source_word_id = w.id
+    WHERE w.language_code = ?
+    AND t.target_language_code = ?
+    AND t.translation LIKE ?
+    ORDER BY w.word
+    LIMIT ?
+"""
+
+# The same lookup driven by the trigram index
+TRANSLATION_FTS_SQL = """
+    SELECT DISTINCT w.id, w.word, w.language_code, w.pos, t.translation
+    FROM translations_fts f
+    JOIN translations t ON t.id = f.rowid
+    JOIN words w ON w.id = t.source_word_id
+    WHERE translations_fts MATCH ?
+    AND w.language_code = ?
+    AND t.target_language_code = ?
+    ORDER BY w.word
+    LIMIT ?
+"""
+
+DEFINITION_LIKE_SQL = """
+    SELECT DISTINCT w.id, w.word
+    FROM definitions d
+    JOIN words w ON w.id = d.word_id
+    WHERE d.definition LIKE ?
+    ORDER BY w.word
+    LIMIT ?
+"""
+
+# Common substrings match thousands of definitions, and sorting all of them
+# by word before the LIMIT is slower than the LIKE scan, which walks words in
+# order and stops early. The LIMIT is applied inside the FTS subquery
+# instead, so results are the first matches in row order, sorted by word,
+# rather than the alphabetically first matching words.
+DEFINITION_FTS_SQL = """
+    SELECT DISTINCT w.id, w.word
+    FROM (
+        SELECT rowid FROM definitions_fts
+        WHERE definitions_fts MATCH ?
+        LIMIT ?
+    ) f
+    JOIN definitions d ON d.id = f.rowid
+    JOIN words w ON w.id = d.word_id
+    ORDER BY w.word
+    LIMIT ?
+"""
+
+
+def benchmark_trigram_fts(conn: sqlite3.Connection, limit: int = 20):
+    """Compare trigram FTS lookups with the LIKE '%query%' scans they replace."""
+    print("  Substring search latency (LIKE scan vs trigram FTS):")
+
+    translation_queries = sample_substrings(conn, 'translations', 'translation')
+    if translation_queries:
+        like = measure_latency(
+            lambda q: conn.execute(TRANSLATION_LIKE_SQL, ('en', 'hi', f'%{q}%', limit)).fetchall(),
+            translation_queries,
+        )
+        fts = measure_latency(
+            lambda q: conn.execute(TRANSLATION_FTS_SQL, (fts_phrase(q), 'en', 'hi', limit)).fetchall(),
+            translation_queries,
+        )
+        print_latency("translations LIKE", like)
+        print_latency("translations trigram FTS", fts)
+
+    definition_queries = sample_substrings(conn, 'definitions', 'definition', length=5)
+    if definition_queries:
+        like = measure_latency(
+            lambda q: conn.execute(DEFINITION_LIKE_SQL, (f'%{q}%', limit)).fetchall(),
+            definition_queries,
+        )
+        fts = measure_latency(
+            lambda q: conn.execute(
+                DEFINITION_FTS_SQL, (fts_phrase(q), limit * FTS_CANDIDATES_PER_RESULT, limit)
+            ).fetchall(),
+            definition_queries,
+        )
+        print_latency("definitions LIKE", like)
+        print_latency("definitions trigram FTS", fts)
+
+
+# ---------------------------------------------------------------------------
+# Normalized search key with a covering index
+# ---------------------------------------------------------------------------
+
+NUKTA = '\u093c'
+
+# Exact and prefix lookups against the normalized key. Prefix queries use a
+# half-open range rather than LIKE, which is case-insensitive and so cannot use
+# a BINARY index. A NULL upper bound (empty prefix) falls back to x'', as
+# SQLite sorts every BLOB after every TEXT value.
+SEARCH_KEY_QUERIES = {
+    'exact (language)': (
+        "SELECT id, word, language_code, pos FROM words "
+        "WHERE language_code = ? AND search_key = ?"
+    ),
+    'exact (any language)': (
+        "SELECT id, word, language_code, pos FROM words "
+        "WHERE search_key = ?"
+    ),
+    'prefix (language)': (
+        "SELECT id, word, language_code, pos FROM words "
+        "WHERE language_code = ? AND search_key >= ? AND search_key < coalesce(?, x'') "
+        "ORDER BY search_key, word LIMIT ?"
+    ),
+    'prefix (any language)': (
+        "SELECT id, word, language_code, pos FROM words "
+        "WHERE search_key >= ? AND search_key < coalesce(?, x'') "
+        "ORDER BY search_key, word LIMIT ?"
+    ),
+}
+
+
+def normalize_search_key(text: str) -> str:
+    """Normalize a headword or query for matching.
+
+    NFC, case-folded, with Latin diacritics and the Devanagari nukta removed
+    (so "café" matches "cafe" and "ज़" matches "ज"). Other combining marks,
+    such as Devanagari vowel signs, are kept. Clients must apply the same
+    function to queries.
+    """
+    decomposed = unicodedata.normalize('NFD', text)
+    folded = ''.join(
+        c for c in decomposed
+        if not ('\u0300' <= c <= '\u036f' or c == NUKTA)
+    )
+    return unicodedata.normalize('NFC', folded.casefold())
+
+
+def prefix_upper_bound(prefix: str) -> Optional[str]:
+    """Smallest string greater than every string that starts with `prefix`.
+
+    None for an empty prefix, which every string starts with; the range
+    queries read a NULL bound as open (see SEARCH_KEY_QUERIES).
+    """
+    if not prefix:
+        return None
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def register_search_key_function(conn: sqlite3.Connection):
+    """Make normalize_search_key callable from SQL as search_key(text)."""
+    conn.create_function('search_key', 1, normalize_search_key, deterministic=True)
+
+
+def create_search_key(conn: sqlite3.Connection):
+    """Add and fill words.search_key, and index it for covering lookups.
+
+    The index holds (language_code, search_key, word, pos) plus the implicit
+    rowid, so exact and prefix lookups never touch the table.
+    """
+    cursor = conn.cursor()
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(words)")]
+    if 'search_key' not in columns:
+        cursor.execute("ALTER TABLE words ADD COLUMN search_key TEXT")
+
+    register_search_key_function(conn)
+    cursor.execute("UPDATE words SET search_key = search_key(word)")
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_words_search_key
+        ON words(language_code, search_key, word, pos)
+    """)
+    conn.commit()
+
+
+def fill_missing_search_keys(conn: sqlite3.Connection):
+    """Compute search_key for rows added since the column was filled."""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(words)")]
+    if 'search_key' not in columns:
+        return
+    register_search_key_function(conn)
+    conn.execute("UPDATE words SET search_key = search_key(word) WHERE search_key IS NULL")
+    conn.commit()
+
+
+def search_key_query_params(name: str, query: str, limit: int = 20) -> tuple:
+    """Bind parameters for one of SEARCH_KEY_QUERIES."""
+    key = normalize_search_key(query)
+    if name == 'exact (language)':
+        return ('en', key)
+    if name == 'exact (any language)':
+        return (key,)
+    if name == 'prefix (language)':
+        return ('en', key, prefix_upper_bound(key), limit)
+    return (key, prefix_upper_bound(key), limit)
+
+
+def validate_search_key_plans(conn: sqlite3.Connection) -> bool:
+    """Check with EXPLAIN QUERY PLAN that no lookup falls back to a scan."""
+    ok = True
+    print("  Query plans for search_key lookups:")
+    for name, sql in SEARCH_KEY_QUERIES.items():
+        plan = conn.execute(
+            f"EXPLAIN QUERY PLAN {sql}", search_key_query_params(name, 'wat')
+        ).fetchall()
+        details = [row[3] for row in plan]
+        scans = [d for d in details if d.startswith('SCAN')]
+        status = 'FAIL' if scans else 'OK'
+        ok = ok and not scans
+        print(f"    [{status}] {name}: {'; '.join(details)}")
+    return ok
+
+
+def benchmark_search_key(conn: sqlite3.Connection, limit: int = 20):
+    """Compare the search_key lookups with the LIKE prefix query SearchDao uses."""
+    queries = [
+        row[0][:3] for row in conn.execute(
+            "SELECT word FROM words WHERE language_code = 'en' AND length(word) >= 3 "
+            "ORDER BY random() LIMIT ?", (BENCHMARK_QUERIES,)
+        )
+    ]
+    if not queries:
+        return
+
+    print("  Prefix search latency (LIKE vs search_key range):")
+    like = measure_latency(
+        lambda q: conn.execute(
+            "SELECT id, word, language_code, pos FROM words "
+            "WHERE word LIKE ? AND language_code = ? ORDER BY word LIMIT ?",
+            (f'{q}%', 'en', limit),
+        ).fetchall(),
+        queries,
+    )
+    key = measure_latency(
+        lambda q: conn.execute(
+            SEARCH_KEY_QUERIES['prefix (language)'],
+            search_key_query_params('prefix (language)', q, limit),
+        ).fetchall(),
+        queries,
+    )
+    print_latency("word LIKE 'q%'", like)
+    print_latency("search_key range", key)
+
+
+def report_search_key(conn: sqlite3.Connection):
+    """Validate the query plans, then benchmark the search_key lookups."""
+    if not validate_search_key_plans(conn):
+        print("  [WARN] A search_key lookup falls back to a scan")
+    benchmark_search_key(conn)
+
+
+# ---------------------------------------------------------------------------
+# Romanized (Hinglish) keys for Hindi headwords
+# ---------------------------------------------------------------------------
+
+ROMANIZED_KEY_TABLES = ('romanized_keys', 'idx_romanized_keys_word')
+
+ROMANIZED_LOOKUP_SQL = """
+    SELECT w.id, w.word, w.language_code, w.pos
+    FROM romanized_keys r
+    JOIN words w ON w.id = r.word_id
+    WHERE r.key = ?
+    LIMIT ?
+"""
+
+
+def table_sizes(conn: sqlite3.Connection, names: Sequence[str]) -> Dict[str, int]:
+    """On-disk size of the given tables and indexes, in bytes, from dbstat."""
+    placeholders = ', '.join('?' for _ in names)
+    try:
+        rows = conn.execute(
+            f"SELECT name, SUM(pgsize) FROM dbstat WHERE name IN ({placeholders}) GROUP BY name",
+            tuple(names),
+        ).fetchall()
+    except sqlite3.OperationalError:
+        # SQLite built without SQLITE_ENABLE_DBSTAT_VTAB
+        return {}
+    return dict(rows)
+
+
+def insert_romanized_keys(conn: sqlite3.Connection, words: Iterable[Tuple[int, str]]):
+    """Insert the romanized keys of (word_id, word) pairs."""
+    from romanize import romanized_keys
+
+    conn.executemany(
+        "INSERT OR IGNORE INTO romanized_keys (key, word_id) VALUES (?, ?)",
+        ((key, word_id) for word_id, word in words for key in romanized_keys(word)),
+    )
+
+
+def create_romanized_keys(conn: sqlite3.Connection):
+    """Create and fill romanized_keys, mapping Latin spellings to Hindi words.
+
+    The table is keyed by (key, word_id), so exact and prefix lookups on a key
+    are primary-key range scans. The word_id index lets deletes and delta
+    updates find a word's keys without a scan.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS romanized_keys (
+            key TEXT NOT NULL,
+            word_id INTEGER NOT NULL REFERENCES words(id) ON DELETE CASCADE,
+            PRIMARY KEY (key, word_id)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("DELETE FROM romanized_keys")
+    insert_romanized_keys(
+        conn, cursor.execute("SELECT id, word FROM words WHERE language_code = 'hi'").fetchall()
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_romanized_keys_word ON romanized_keys(word_id)"
+    )
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS words_romanized_ad AFTER DELETE ON words BEGIN
+            DELETE FROM romanized_keys WHERE word_id = old.id;
+        END
+    """)
+    conn.commit()
+
+
+def fill_missing_romanized_keys(conn: sqlite3.Connection):
+    """Add keys for Hindi words inserted since the table was filled."""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'romanized_keys'"
+    ).fetchone()
+    if not exists:
+        return
+    insert_romanized_keys(conn, conn.execute("""
+        SELECT id, word FROM words w
+        WHERE language_code = 'hi'
+        AND NOT EXISTS (SELECT 1 FROM romanized_keys r WHERE r.word_id = w.id)
+    """).fetchall())
+    conn.commit()
+
+
+def report_romanized_keys(conn: sqlite3.Connection, limit: int = 20):
+    """Report what the romanized keys add to the database, and lookup latency."""
+    keys, words = conn.execute(
+        "SELECT COUNT(*), COUNT(DISTINCT word_id) FROM romanized_keys"
+    ).fetchone()
+    print(f"  Romanized keys: {keys:,} keys for {words:,} Hindi words "
+          f"({keys / max(words, 1):.1f} per word)")
+
+    sizes = table_sizes(conn, ROMANIZED_KEY_TABLES)
+    if sizes:
+        total = sum(sizes.values())
+        db_size = conn.execute("PRAGMA page_count").fetchone()[0] * \
+            conn.execute("PRAGMA page_size").fetchone()[0]
+        for name in ROMANIZED_KEY_TABLES:
+            print(f"    {name}: {sizes.get(name, 0) / 1024:,.1f} KB")
+        print(f"    added: {total / 1024:,.1f} KB ({total / db_size:.1%} of the database)")
+
+    queries = [
+        row[0] for row in conn.execute(
+            "SELECT key FROM romanized_keys ORDER BY random() LIMIT ?", (BENCHMARK_QUERIES,)
+        )
+    ]
+    if queries:
+        print("  Romanized lookup latency:")
+        print_latency(
+            "romanized key lookup",
+            measure_latency(lambda q: conn.execute(ROMANIZED_LOOKUP_SQL, (q, limit)).fetchall(),
+                            queries),
+        )
+
+
+# ---------------------------------------------------------------------------
+# Symmetric-delete index for spelling correction
+# ---------------------------------------------------------------------------
+
+# Largest edit distance the index answers, and how much of each key is
+# indexed. Only the first FUZZY_PREFIX_LENGTH characters are expanded into
+# deletes, which bounds the variants per word at 1 + 7 + 21; candidates are
+# verified against the full key.
+FUZZY_MAX_DISTANCE = 2
+FUZZY_PREFIX_LENGTH = 7
+
+FUZZY_TABLES = ('word_deletes', 'idx_word_deletes_word')
+
+# Probes per statement, kept below SQLite's default host parameter limit
+FUZZY_PROBE_BATCH = 500
+
+
+def delete_variants(key: str, max_distance: int = FUZZY_MAX_DISTANCE,
+                    prefix_length: int = FUZZY_PREFIX_LENGTH) -> set:
+    """Every string reachable from the key's prefix by up to max_distance deletes."""
+    variants = {key[:prefix_length]}
+    frontier = set(variants)
+    for _ in range(max_distance):
+        frontier = {
+            term[:i] + term[i + 1:]
+            for term in frontier if len(term) > 1
+            for i in range(len(term))
+        }
+        variants |= frontier
+    return variants
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """Optimal string alignment distance, or max_distance + 1 if it is larger."""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+    return min(previous[-1], max_distance + 1)
+
+
+def insert_word_deletes(conn: sqlite3.Connection, words: Iterable[Tuple[int, str]]):
+    """Insert the delete variants of (word_id, word) pairs."""
+    conn.executemany(
+        "INSERT OR IGNORE INTO word_deletes (variant, word_id) VALUES (?, ?)",
+        (
+            (variant, word_id)
+            for word_id, word in words
+            for variant in delete_variants(normalize_search_key(word))
+        ),
+    )
+
+
+def create_fuzzy_index(conn: sqlite3.Connection):
+    """Create and fill word_deletes, a symmetric-delete index over headwords.
+
+    Each normalized headword is stored under every variant obtained by
+    deleting up to FUZZY_MAX_DISTANCE characters from its prefix. A query's
+    own delete variants then find every word within that edit distance with
+    one primary-key probe per variant.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS word_deletes (
+            variant TEXT NOT NULL,
+            word_id INTEGER NOT NULL REFERENCES words(id) ON DELETE CASCADE,
+            PRIMARY KEY (variant, word_id)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("DELETE FROM word_deletes")
+    insert_word_deletes(conn, cursor.execute("SELECT id, word FROM words").fetchall())
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_word_deletes_word ON word_deletes(word_id)")
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS words_deletes_ad AFTER DELETE ON words BEGIN
+            DELETE FROM word_deletes WHERE word_id = old.id;
+        END
+    """)
+    conn.commit()
+
+
+def fill_missing_word_deletes(conn: sqlite3.Connection):
+    """Add delete variants for words inserted since the index was filled."""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'word_deletes'"
+    ).fetchone()
+    if not exists:
+        return
+    insert_word_deletes(conn, conn.execute("""
+        SELECT id, word FROM words w
+        WHERE NOT EXISTS (SELECT 1 FROM word_deletes d WHERE d.word_id = w.id)
+    """).fetchall())
+    conn.commit()
+
+
+def fuzzy_lookup(conn: sqlite3.Connection, query: str, max_distance: int = FUZZY_MAX_DISTANCE,
+                 language_code: str = None, limit: int = 10) -> List[Tuple[int, int, str]]:
+    """Words within max_distance edits of the query, as (distance, id, word).
+
+    Sorted by distance, then word. max_distance may not exceed the distance
+    the index was built with.
+    """
+    key = normalize_search_key(query)
+    variants = list(delete_variants(key, max_distance))
+    language_filter = "AND w.language_code = ?" if language_code else ""
+
+    candidates = {}
+    for start in range(0, len(variants), FUZZY_PROBE_BATCH):
+        batch = variants[start:start + FUZZY_PROBE_BATCH]
+        params = batch + ([language_code] if language_code else [])
+        for word_id, word in conn.execute(f"""
+            SELECT DISTINCT w.id, w.word
+            FROM word_deletes d
+            JOIN words w ON w.id = d.word_id
+            WHERE d.variant IN ({', '.join('?' for _ in batch)})
+            {language_filter}
+        """, params):
+            candidates[word_id] = word
+
+    matches = []
+    for word_id, word in candidates.items():
+        distance = edit_distance(key, normalize_search_key(word), max_distance)
+        if distance <= max_distance:
+            matches.append((distance, word_id, word))
+    matches.sort(key=lambda match: (match[0], match[2]))
+    return matches[:limit]
+
+
+def misspell(word: str, edits: int, rng: random.Random) -> str:
+    """Apply random single-character edits to a word."""
+    alphabet = sorted(set(word)) or ['a']
+    for _ in range(edits):
+        op = rng.choice(('delete', 'insert', 'replace', 'swap')) if len(word) > 1 else 'insert'
+        i = rng.randrange(len(word))
+        if op == 'delete':
+            word = word[:i] + word[i + 1:]
+        elif op == 'insert':
+            word = word[:i] + rng.choice(alphabet) + word[i:]
+        elif op == 'replace':
+            word = word[:i] + rng.choice(alphabet) + word[i + 1:]
+        elif i + 1 < len(word):
+            word = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word
+
+
+def report_fuzzy_index(conn: sqlite3.Connection):
+    """Report the size of the deletion index and lookup latency at distance 1 and 2."""
+    variants, words = conn.execute(
+        "SELECT COUNT(*), COUNT(DISTINCT word_id) FROM word_deletes"
+    ).fetchone()
+    print(f"  Fuzzy index: {variants:,} delete variants for {words:,} words "
+          f"({variants / max(words, 1):.1f} per word)")
+
+    sizes = table_sizes(conn, FUZZY_TABLES)
+    if sizes:
+        total = sum(sizes.values())
+        db_size = conn.execute("PRAGMA page_count").fetchone()[0] * \
+            conn.execute("PRAGMA page_size").fetchone()[0]
+        for name in FUZZY_TABLES:
+            print(f"    {name}: {sizes.get(name, 0) / 1024:,.1f} KB")
+        print(f"    added: {total / 1024:,.1f} KB ({total / db_size:.1%} of the database)")
+
+    rng = random.Random(BENCHMARK_SEED)
+    originals = [
+        row[0] for row in conn.execute(
+            "SELECT word FROM words WHERE language_code = 'en' AND length(word) >= 5 "
+            "ORDER BY random() LIMIT ?", (BENCHMARK_QUERIES,)
+        )
+    ]
+    if not originals:
+        return
+
+    print("  Did-you-mean latency (misspelled English headwords):")
+    for distance in range(1, FUZZY_MAX_DISTANCE + 1):
+        queries = [(word, misspell(word, distance, rng)) for word in originals]
+        found = 0
+
+        def run(pair):
+            nonlocal found
+            original, query = pair
+            matches = fuzzy_lookup(conn, query, distance, 'en')
+            found += any(normalize_search_key(word) == normalize_search_key(original)
+                         for _, _, word in matches)
+
+        latency = measure_latency(run, queries)
+        print_latency(f"edit distance {distance}", latency)
+        print(f"      original word in the top 10: {found / len(queries):.1%}")
+
+
+# ---------------------------------------------------------------------------
+# Denormalized word-detail payloads
+# ---------------------------------------------------------------------------
+
+PAYLOAD_BATCH_SIZE = 10000
+
+WORD_PAYLOAD_SQL = "SELECT payload FROM word_payloads WHERE word_id = ?"
+
+
+def serialize_word_payload(record: Dict[str, Any]) -> str:
+    """Compact JSON for a word record, leaving out empty fields.
+
+    The keys are those of the processed word records (word, language, pos,
+    pronunciation_ipa, etymology, definitions, translations, examples).
+    """
+    return json.dumps(
+        {key: value for key, value in record.items() if value not in (None, [], {})},
+        ensure_ascii=False,
+        separators=(',', ':'),
+    )
+
+
+def fetch_word_details(conn: sqlite3.Connection, word_id: int) -> Dict[str, Any]:
+    """Read one word with its child rows the way WordDao.getWordById does."""
+    row = conn.execute(
+        "SELECT word, language_code, pos, pronunciation_ipa, etymology FROM words WHERE id = ?",
+        (word_id,),
+    ).fetchone()
+    if row is None:
+        return None
+
+    translations = {}
+    for lang_code, translation in conn.execute(
+        "SELECT target_language_code, translation FROM translations "
+        "WHERE source_word_id = ? ORDER BY id", (word_id,)
+    ):
+        translations.setdefault(lang_code, []).append(translation)
+
+    return {
+        'word': row[0],
+        'language': row[1],
+        'pos': row[2],
+        'pronunciation_ipa': row[3],
+        'etymology': row[4],
+        'definitions': [r[0] for r in conn.execute(
+            "SELECT definition FROM definitions WHERE word_id = ? ORDER BY order_index, id",
+            (word_id,),
+        )],
+        'translations': translations,
+        'examples': [r[0] for r in conn.execute(
+            "SELECT example_text FROM examples WHERE word_id = ? ORDER BY id", (word_id,)
+        )],
+    }
+
+
+def iter_word_payloads(conn: sqlite3.Connection) -> Iterator[Tuple[int, str]]:
+    """Yield (word_id, payload) for every word, merging child tables in word_id order."""
+    children = {
+        'definitions': groupby(conn.execute(
+            "SELECT word_id, definition FROM definitions ORDER BY word_id, order_index, id"
+        ), key=lambda row: row[0]),
+        'translations': groupby(conn.execute(
+            "SELECT source_word_id, target_language_code, translation FROM translations "
+            "ORDER BY source_word_id, id"
+        ), key=lambda row: row[0]),
+        'examples': groupby(conn.execute(
+            "SELECT word_id, example_text FROM examples ORDER BY word_id, id"
+        ), key=lambda row: row[0]),
+    }
+    pending = {name: next(groups, None) for name, groups in children.items()}
+
+    def take(name: str, word_id: int) -> list:
+        # Skips groups of word ids that no longer exist
+        while pending[name] is not None and pending[name][0] < word_id:
+            pending[name] = next(children[name], None)
+        if pending[name] is None or pending[name][0] != word_id:
+            return []
+        rows = list(pending[name][1])
+        pending[name] = next(children[name], None)
+        return rows
+
+    for word_id, word, language_code, pos, ipa, etymology in conn.execute(
+        "SELECT id, word, language_code, pos, pronunciation_ipa, etymology FROM words ORDER BY id"
+    ):
+        translations = {}
+        for _, lang_code, translation in take('translations', word_id):
+            translations.setdefault(lang_code, []).append(translation)
+
+        yield word_id, serialize_word_payload({
+            'word': word,
+            'language': language_code,
+            'pos': pos,
+            'pronunciation_ipa': ipa,
+            'etymology': etymology,
+            'definitions': [row[1] for row in take('definitions', word_id)],
+            'translations': translations,
+            'examples': [row[1] for row in take('examples', word_id)],
+        })
+
+
+def create_word_payloads(conn: sqlite3.Connection):
+    """Create and fill word_payloads: one JSON detail payload per word_id.
+
+    A detail view becomes a single primary-key read instead of one query per
+    child table. Triggers drop the payload of a word that is deleted or whose
+    columns change; fill_missing_word_payloads rebuilds it after a delta,
+    along with the payloads of words whose child rows the delta replaced.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS word_payloads (
+            word_id INTEGER PRIMARY KEY REFERENCES words(id) ON DELETE CASCADE,
+            payload TEXT NOT NULL
+        )
+    """)
+    cursor.execute("DELETE FROM word_payloads")
+
+    # The ordered scans read through the same connection; SQLite allows a
+    # COMMIT while read statements are pending, so each batch is committed
+    # and the journal and dirty pages stay bounded
+    batch = []
+    for row in iter_word_payloads(conn):
+        batch.append(row)
+        if len(batch) >= PAYLOAD_BATCH_SIZE:
+            cursor.executemany("INSERT INTO word_payloads (word_id, payload) VALUES (?, ?)", batch)
+            conn.commit()
+            batch.clear()
+    cursor.executemany("INSERT INTO word_payloads (word_id, payload) VALUES (?, ?)", batch)
+
+    # Only updates of payload columns invalidate; derived columns such as
+    # search_key are filled by UPDATEs too
+    for name, event in (
+        ('words_payload_ad', 'DELETE'),
+        ('words_payload_au', 'UPDATE OF word, language_code, pos, pronunciation_ipa, etymology'),
+    ):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON words BEGIN
+                DELETE FROM word_payloads WHERE word_id = old.id;
+            END
+        """)
+    conn.commit()
+
+
+def fill_missing_word_payloads(conn: sqlite3.Connection, changed_ids: Iterable[int] = ()):
+    """Build payloads for words added since the table was filled, and rebuild changed ones."""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'word_payloads'"
+    ).fetchone()
+    if not exists:
+        return
+    conn.executemany("DELETE FROM word_payloads WHERE word_id = ?",
+                     ((word_id,) for word_id in changed_ids))
+    missing = [row[0] for row in conn.execute("""
+        SELECT id FROM words w
+        WHERE NOT EXISTS (SELECT 1 FROM word_payloads p WHERE p.word_id = w.id)
+    """)]
+    conn.executemany(
+        "INSERT INTO word_payloads (word_id, payload) VALUES (?, ?)",
+        ((word_id, serialize_word_payload(fetch_word_details(conn, word_id)))
+         for word_id in missing),
+    )
+    conn.commit()
+
+
+def report_word_payloads(conn: sqlite3.Connection):
+    """Report the payload table size and compare detail reads with WordDao's queries."""
+    count, payload_bytes = conn.execute(
+        "SELECT COUNT(*), COALESCE(SUM(length(CAST(payload AS BLOB))), 0) FROM word_payloads"
+    ).fetchone()
+    print(f"  Word payloads: {count:,} payloads, "
+          f"{payload_bytes / max(count, 1):,.0f} bytes on average")
+
+    sizes = table_sizes(conn, ('word_payloads',))
+    if sizes:
+        db_size = conn.execute("PRAGMA page_count").fetchone()[0] * \
+            conn.execute("PRAGMA page_size").fetchone()[0]
+        size = sizes['word_payloads']
+        print(f"    word_payloads: {size / 1024:,.1f} KB ({size / db_size:.1%} of the database)")
+
+    word_ids = [
+        row[0] for row in conn.execute(
+            "SELECT id FROM words ORDER BY random() LIMIT ?", (BENCHMARK_QUERIES,)
+        )
+    ]
+    if not word_ids:
+        return
+
+    print("  Word detail latency (random word ids):")
+    print_latency("WordDao (4 queries)", measure_latency(
+        lambda word_id: fetch_word_details(conn, word_id), word_ids
+    ))
+    print_latency("payload row + JSON decode", measure_latency(
+        lambda word_id: json.loads(conn.execute(WORD_PAYLOAD_SQL, (word_id,)).fetchone()[0]),
+        word_ids,
+    ))
+
+
+# ---------------------------------------------------------------------------
+# Reverse-translation index merged with native headwords
+# ---------------------------------------------------------------------------
+
+REVERSE_INDEX_TABLES = ('reverse_index', 'idx_reverse_index_word')
+
+# Rows for a set of word ids: each word under its own headword, and each
+# source word under every translation it has
+REVERSE_INDEX_ROWS_SQL = """
+    SELECT language_code, search_key(word), id, 1 FROM words
+    WHERE {words_filter}
+    UNION ALL
+    SELECT target_language_code, search_key(translation), source_word_id, 0 FROM translations
+    WHERE {translations_filter}
+"""
+
+REVERSE_LOOKUP_SQL = """
+    SELECT w.id, w.word, w.language_code, w.pos, r.is_headword
+    FROM reverse_index r
+    JOIN words w ON w.id = r.word_id
+    WHERE r.language_code = ? AND r.term = ?
+    ORDER BY r.is_headword DESC, w.word
+    LIMIT ?
+"""
+
+REVERSE_PREFIX_SQL = """
+    SELECT DISTINCT r.term
+    FROM reverse_index r
+    WHERE r.language_code = ? AND r.term >= ? AND r.term < coalesce(?, x'')
+    ORDER BY r.term
+    LIMIT ?
+"""
+
+# The same Hindi lookup without the index: headwords plus a translations scan
+HINDI_LOOKUP_JOIN_SQL = """
+    SELECT id, word, language_code, pos, 1 FROM words
+    WHERE language_code = 'hi' AND word = ?
+    UNION
+    SELECT w.id, w.word, w.language_code, w.pos, 0
+    FROM translations t
+    JOIN words w ON w.id = t.source_word_id
+    WHERE t.target_language_code = 'hi' AND t.translation = ?
+    LIMIT ?
+"""
+
+
+def create_reverse_index(conn: sqlite3.Connection):
+    """Create and fill reverse_index: (language, term) -> words.
+
+    A Hindi term maps to the Hindi headwords spelled that way (is_headword =
+    1) and to every English word with it among its translations, and the same
+    holds for English terms. Terms are search keys, so exact lookups and
+    prefix ranges are primary-key searches.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS reverse_index (
+            language_code TEXT NOT NULL,
+            term TEXT NOT NULL,
+            word_id INTEGER NOT NULL REFERENCES words(id) ON DELETE CASCADE,
+            is_headword INTEGER NOT NULL,
+            PRIMARY KEY (language_code, term, word_id)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("DELETE FROM reverse_index")
+
+    register_search_key_function(conn)
+    cursor.execute(
+        "INSERT OR IGNORE INTO reverse_index (language_code, term, word_id, is_headword) " +
+        REVERSE_INDEX_ROWS_SQL.format(words_filter='1', translations_filter='1')
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_reverse_index_word ON reverse_index(word_id)")
+
+    # Every word has its headword row, so a word without rows needs them
+    # rebuilt; see fill_missing_reverse_index. Changes to a word's
+    # translations are passed to it explicitly.
+    for name, event in (
+        ('words_reverse_ad', 'DELETE'),
+        ('words_reverse_au', 'UPDATE OF word, language_code'),
+    ):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON words BEGIN
+                DELETE FROM reverse_index WHERE word_id = old.id;
+            END
+        """)
+    conn.commit()
+
+
+def fill_missing_reverse_index(conn: sqlite3.Connection, changed_ids: Iterable[int] = ()):
+    """Rebuild the rows of words added or renamed since the index was filled, and of changed ones."""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'reverse_index'"
+    ).fetchone()
+    if not exists:
+        return
+    conn.executemany("DELETE FROM reverse_index WHERE word_id = ?",
+                     ((word_id,) for word_id in changed_ids))
+
+    register_search_key_function(conn)
+    missing = "id IN (SELECT id FROM words w WHERE NOT EXISTS " \
+              "(SELECT 1 FROM reverse_index r WHERE r.word_id = w.id))"
+    conn.execute("DROP TABLE IF EXISTS temp.reverse_missing")
+    conn.execute(f"CREATE TEMP TABLE reverse_missing AS SELECT id FROM words WHERE {missing}")
+    conn.execute(
+        "INSERT OR IGNORE INTO reverse_index (language_code, term, word_id, is_headword) " +
+        REVERSE_INDEX_ROWS_SQL.format(
+            words_filter="id IN (SELECT id FROM temp.reverse_missing)",
+            translations_filter="source_word_id IN (SELECT id FROM temp.reverse_missing)",
+        )
+    )
+    conn.execute("DROP TABLE temp.reverse_missing")
+    conn.commit()
+
+
+def report_reverse_index(conn: sqlite3.Connection, limit: int = 20):
+    """Report Hindi coverage gained from the reverse index, its size and latency."""
+    native, reverse, both = conn.execute("""
+        SELECT
+            COUNT(DISTINCT CASE WHEN is_headword = 1 THEN term END),
+            COUNT(DISTINCT CASE WHEN is_headword = 0 THEN term END),
+            COUNT(DISTINCT term) FILTER (WHERE is_headword = 0 AND EXISTS (
+                SELECT 1 FROM reverse_index h
+                WHERE h.language_code = r.language_code AND h.term = r.term
+                AND h.is_headword = 1
+            ))
+        FROM reverse_index r
+        WHERE language_code = 'hi'
+    """).fetchone()
+    total = conn.execute(
+        "SELECT COUNT(DISTINCT term) FROM reverse_index WHERE language_code = 'hi'"
+    ).fetchone()[0]
+    sources = conn.execute(
+        "SELECT COUNT(DISTINCT word_id) FROM reverse_index "
+        "WHERE language_code = 'hi' AND is_headword = 0"
+    ).fetchone()[0]
+    print("  Hindi coverage:")
+    print(f"    native Hindi headwords: {native:,}")
+    print(f"    Hindi terms from English translations: {reverse:,} "
+          f"from {sources:,} English words, {both:,} of them also native headwords")
+    print(f"    searchable Hindi terms: {total:,} "
+          f"({total / max(native, 1):.1f}x the native headwords)")
+
+    sizes = table_sizes(conn, REVERSE_INDEX_TABLES)
+    if sizes:
+        added = sum(sizes.values())
+        db_size = conn.execute("PRAGMA page_count").fetchone()[0] * \
+            conn.execute("PRAGMA page_size").fetchone()[0]
+        for name in REVERSE_INDEX_TABLES:
+            print(f"    {name}: {sizes.get(name, 0) / 1024:,.1f} KB")
+        print(f"    added: {added / 1024:,.1f} KB ({added / db_size:.1%} of the database)")
+
+    terms = [
+        row[0] for row in conn.execute(
+            "SELECT translation FROM translations WHERE target_language_code = 'hi' "
+            "ORDER BY random() LIMIT ?", (BENCHMARK_QUERIES,)
+        )
+    ]
+    if not terms:
+        return
+
+    print("  Hindi lookup latency (headwords and English words translating to it):")
+    print_latency("words + translations scan", measure_latency(
+        lambda q: conn.execute(HINDI_LOOKUP_JOIN_SQL, (q, q, limit)).fetchall(), terms
+    ))
+    print_latency("reverse_index probe", measure_latency(
+        lambda q: conn.execute(
+            REVERSE_LOOKUP_SQL, ('hi', normalize_search_key(q), limit)
+        ).fetchall(),
+        terms,
+    ))
+    print_latency("reverse_index prefix", measure_latency(
+        lambda q: conn.execute(
+            REVERSE_PREFIX_SQL,
+            ('hi', normalize_search_key(q)[:2], prefix_upper_bound(normalize_search_key(q)[:2]),
+             limit),
+        ).fetchall(),
+        terms,
+    ))
+
+
+# ---------------------------------------------------------------------------
+# Static popularity score for ranked top-k results
+# ---------------------------------------------------------------------------
+
+# Weights of the richness signals, capped so one huge entry cannot dominate
+SCORE_WEIGHTS = {
+    'definitions': (10, 20),
+    'translations': (5, 20),
+    'examples': (2, 10),
+}
+
+# Points for a word at the top of a frequency list, on a log scale
+FREQUENCY_POINTS = 100
+
+# Counts per word, which make up the score without a frequency list
+SCORE_COUNTS_SQL = """
+    SELECT w.id, w.word,
+           (SELECT COUNT(*) FROM definitions d WHERE d.word_id = w.id),
+           (SELECT COUNT(*) FROM translations t WHERE t.source_word_id = w.id),
+           (SELECT COUNT(*) FROM examples e WHERE e.word_id = w.id)
+    FROM words w
+    WHERE {where}
+"""
+
+RANKED_PREFIX_SQL = """
+    SELECT id, word, language_code, pos FROM words
+    WHERE language_code = ? AND word LIKE ?
+    ORDER BY score DESC, word
+    LIMIT ?
+"""
+
+# SearchDao.searchByPrefix, as issued by the app today
+ALPHABETICAL_PREFIX_SQL = """
+    SELECT id, word, language_code, pos FROM words
+    WHERE word LIKE ? AND language_code = ?
+    ORDER BY word
+    LIMIT ?
+"""
+
+
+def load_frequency_list(path: Path) -> Dict[str, int]:
+    """Read a frequency list: "word count" per line, or one word per line by rank.
+
+    Keys are search keys. Ranked lists get descending pseudo-counts, so both
+    forms feed the same log scale.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = [line.split() for line in f if line.strip() and not line.startswith('#')]
+
+    frequencies = {}
+    for rank, fields in enumerate(lines):
+        word = normalize_search_key(fields[0])
+        try:
+            count = int(fields[-1]) if len(fields) > 1 else len(lines) - rank
+        except ValueError:
+            count = len(lines) - rank
+        frequencies[word] = max(frequencies.get(word, 0), count)
+    return frequencies
+
+
+def popularity_score(definitions: int, translations: int, examples: int,
+                     frequency: int = 0, max_frequency: int = 0) -> int:
+    """Static ranking score: weighted richness plus optional corpus frequency."""
+    score = 0
+    for count, (weight, cap) in zip((definitions, translations, examples), SCORE_WEIGHTS.values()):
+        score += weight * min(count, cap)
+    if frequency and max_frequency:
+        score += round(FREQUENCY_POINTS * math.log1p(frequency) / math.log1p(max_frequency))
+    return score
+
+
+def update_scores(conn: sqlite3.Connection, where: str,
+                  frequencies: Dict[str, int] = None):
+    """Compute words.score for the words matching a WHERE clause."""
+    frequencies = frequencies or {}
+    max_frequency = max(frequencies.values(), default=0)
+    rows = conn.execute(SCORE_COUNTS_SQL.format(where=where)).fetchall()
+    conn.executemany("UPDATE words SET score = ? WHERE id = ?", (
+        (popularity_score(definitions, translations, examples,
+                          frequencies.get(normalize_search_key(word), 0), max_frequency), word_id)
+        for word_id, word, definitions, translations, examples in rows
+    ))
+
+
+def create_popularity_score(conn: sqlite3.Connection, frequency_files: Sequence[Path] = ()):
+    """Add and fill words.score, indexed for ranked prefix results.
+
+    The index is on (language_code, score, word, pos). A ranked query walks it
+    from the highest score down and stops after LIMIT matches, which is fast
+    exactly for the short, high-fanout prefixes that alphabetical or bm25
+    ordering handle worst. Including word and pos makes the prefix filter
+    and the result columns covered by the index.
+    """
+    cursor = conn.cursor()
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(words)")]
+    if 'score' not in columns:
+        cursor.execute("ALTER TABLE words ADD COLUMN score INTEGER")
+
+    frequencies = {}
+    for path in frequency_files:
+        for word, count in load_frequency_list(path).items():
+            frequencies[word] = max(frequencies.get(word, 0), count)
+        print(f"  Loaded frequency list {path}")
+
+    update_scores(conn, '1', frequencies)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_words_language_score
+        ON words(language_code, score DESC, word, pos)
+    """)
+    conn.commit()
+
+
+def fill_missing_scores(conn: sqlite3.Connection, changed_ids: Iterable[int] = ()):
+    """Score words added since the column was filled, and rescore changed ones.
+
+    `changed_ids` are words whose child rows were replaced, so their richness
+    counts are stale. Frequency lists are a build-time input, so these words
+    are scored on richness alone until the next full build.
+    """
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(words)")]
+    if 'score' not in columns:
+        return
+    conn.executemany("UPDATE words SET score = NULL WHERE id = ?",
+                     ((word_id,) for word_id in changed_ids))
+    update_scores(conn, 'w.score IS NULL')
+    conn.commit()
+
+
+def report_popularity_score(conn: sqlite3.Connection, limit: int = 20):
+    """Compare ranked prefix queries before and after the score index."""
+    rng = random.Random(BENCHMARK_SEED)
+    words = [
+        row[0] for row in conn.execute(
+            "SELECT word FROM words WHERE language_code = 'en' AND length(word) >= 2 "
+            "ORDER BY random() LIMIT ?", (BENCHMARK_QUERIES,)
+        )
+    ]
+    if not words:
+        return
+
+    # Ranked results without the score index: the language index, then a sort
+    ranked_without_index = RANKED_PREFIX_SQL.replace(
+        "FROM words", "FROM words INDEXED BY idx_words_language"
+    )
+
+    print("  Short prefix latency (top 20):")
+    for length in (1, 2):
+        prefixes = [rng.choice(words)[:length] for _ in words]
+        print(f"    {length}-character prefixes:")
+        print_latency("alphabetical (SearchDao)", measure_latency(
+            lambda q: conn.execute(ALPHABETICAL_PREFIX_SQL, (f'{q}%', 'en', limit)).fetchall(),
+            prefixes,
+        ))
+        print_latency("ranked, sort", measure_latency(
+            lambda q: conn.execute(ranked_without_index, ('en', f'{q}%', limit)).fetchall(),
+            prefixes,
+        ))
+        print_latency("ranked, score index", measure_latency(
+            lambda q: conn.execute(RANKED_PREFIX_SQL, ('en', f'{q}%', limit)).fetchall(),
+            prefixes,
+        ))
+
+
+# Build stages in the order they run: name -> (build, report). `build` runs
+# after the base indexes and FTS are in place; `report` runs on the finished,
+# analyzed database.
+SEARCH_STAGES = {
+    'trigram_fts': (create_trigram_fts, benchmark_trigram_fts),
+    'search_key': (create_search_key, report_search_key),
+    'romanized_keys': (create_romanized_keys, report_romanized_keys),
+    'fuzzy_index': (create_fuzzy_index, report_fuzzy_index),
+    'word_payloads': (create_word_payloads, report_word_payloads),
+    'reverse_index': (create_reverse_index, report_reverse_index),
+    'popularity': (create_popularity_score, report_popularity_score),
+}
@@ -0,0 +1,243 @@
+"""Database builds of build_database compared with each other on synthetic data.
+
+Run from tools/data_processor: python -m pytest tests (or python -m unittest discover tests)
+"""
+
+import json
+import random
+import sqlite3
+import sys
+import tempfile
+import unittest
+from dataclasses import asdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import build_database  # noqa: E402
+import fused_build  # noqa: E402
+import layout_database  # noqa: E402
+import process_wiktionary  # noqa: E402
+from generate_sample_data import generate_dump  # noqa: E402
+from search_indexes import SEARCH_STAGES  # noqa: E402
+
+FTS_TABLES = ('words_fts', 'translations_fts', 'definitions_fts')
+
+# Derived tables keyed by word id, as (table, word id column, other columns)
+WORD_ID_TABLES = (
+    ('word_payloads', 'word_id', 'payload'),
+    ('reverse_index', 'word_id', 'language_code, term, is_headword'),
+    ('romanized_keys', 'word_id', 'key'),
+    ('word_deletes', 'word_id', 'variant'),
+)
+
+
+def generate_dumps(data_dir: Path):
+    """Write small synthetic English and Hindi dumps."""
+    for name, count in (('english', 600), ('hindi', 200)):
+        generate_dump(data_dir / f'{name}_wiktionary.jsonl', name, count)
+
+
+def processed_records(data_dir: Path) -> list:
+    """Deduplicated word records of the dumps, as process_wiktionary.py writes them."""
+    words = []
+    for description, input_path, processor, prefilter in fused_build.fused_sources(data_dir):
+        words.extend(process_wiktionary.process_file(input_path, processor, description,
+                                                     prefilter=prefilter))
+    return [asdict(word) for word in process_wiktionary.deduplicate_words(words)]
+
+
+def build(db_path: Path, words: list) -> sqlite3.Connection:
+    """A full standard build with every search stage, as build_database.main runs it."""
+    conn = build_database.create_database(db_path)
+    count = build_database.populate_database(conn, words)
+    build_database.finalize_database(conn)
+    for build_stage, _ in SEARCH_STAGES.values():
+        build_stage(conn)
+    build_database.add_metadata(conn, count)
+    return conn
+
+
+def build_layout(db_path: Path, words: list) -> sqlite3.Connection:
+    """A --layout build, as build_database.main runs it, at a fixed page size."""
+    conn = layout_database.create_staging_database(db_path)
+    count = build_database.populate_database(conn, words)
+    conn = layout_database.create_layout_database(conn, db_path)
+    layout_database.finalize_layout_database(conn)
+    for build_stage, _ in SEARCH_STAGES.values():
+        build_stage(conn)
+    build_database.add_metadata(conn, count)
+    layout_database.write_layout_database(conn, db_path, page_size=4096)
+    return sqlite3.connect(db_path)
+
+
+def snapshot(conn: sqlite3.Connection) -> dict:
+    """Everything stored per word, with word ids replaced by (word, language, pos)."""
+    keys = {
+        word_id: (word, language, pos)
+        for word_id, word, language, pos in conn.execute(
+            "SELECT id, word, language_code, pos FROM words"
+        )
+    }
+    content = {key: content_hash for key, (_, content_hash)
+               in build_database.load_word_hashes(conn).items()}
+    columns = {
+        keys[word_id]: (search_key, score)
+        for word_id, search_key, score in conn.execute("SELECT id, search_key, score FROM words")
+    }
+    derived = {
+        table: sorted((keys[row[0]],) + tuple(row[1:]) for row in conn.execute(
+            f"SELECT {id_column}, {other} FROM {table}"
+        ))
+        for table, id_column, other in WORD_ID_TABLES
+    }
+    return {'content': content, 'columns': columns, 'derived': derived}
+
+
+def check_fts(conn: sqlite3.Connection, tables=FTS_TABLES):
+    """Raise if an external-content FTS index disagrees with its content table."""
+    for table in tables:
+        conn.execute(f"INSERT INTO {table}({table}, rank) VALUES ('integrity-check', 1)")
+
+
+def edit_records(words: list) -> list:
+    """The next upstream version: some words dropped, some changed, some added."""
+    rng = random.Random(7)
+    edited = []
+    for index, word in enumerate(words):
+        if index % 17 == 0:
+            continue
+        word = json.loads(json.dumps(word))
+        if index % 11 == 0:
+            word['definitions'] = word['definitions'] + ['A sense added upstream.']
+        if index % 13 == 0:
+            word['translations'].setdefault('hi' if word['language'] == 'en' else 'en', []) \
+                .append(f'newtranslation{index}')
+        if index % 19 == 0:
+            word['etymology'] = None
+        edited.append(word)
+    for index in range(25):
+        edited.insert(rng.randrange(len(edited)), {
+            'word': f'neologism{index}', 'language': 'en', 'pos': 'noun',
+            'definitions': [f'A word first seen in version 2 ({index}).'],
+            'translations': {'hi': [f'नया{index}']}, 'pronunciation_ipa': None,
+            'examples': [], 'etymology': None,
+        })
+    return edited
+
+
+class DeltaTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.dir = Path(cls.tmp.name)
+        generate_dumps(cls.dir)
+        cls.words = processed_records(cls.dir)
+        cls.edited = edit_records(cls.words)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_delta_apply_matches_fresh_build(self):
+        conn = build(self.dir / 'patched.db', self.words)
+        delta_path = self.dir / 'delta-1-2.jsonl.gz'
+        counts = build_database.write_delta(conn, iter(self.edited), delta_path)
+        self.assertTrue(counts['inserted'] and counts['updated'] and counts['deleted'])
+        self.assertEqual(build_database.apply_delta(conn, delta_path), 2)
+
+        fresh = build(self.dir / 'fresh.db', self.edited)
+        try:
+            check_fts(conn)
+            patched, expected = snapshot(conn), snapshot(fresh)
+            self.assertEqual(patched['content'], expected['content'])
+            self.assertEqual(patched['columns'], expected['columns'])
+            for table, _, _ in WORD_ID_TABLES:
+                with self.subTest(table=table):
+                    self.assertEqual(patched['derived'][table], expected['derived'][table])
+        finally:
+            conn.close()
+            fresh.close()
+
+    def test_delta_of_another_chain_is_refused(self):
+        conn = build(self.dir / 'old.db', self.words)
+        delta_path = self.dir / 'delta-old.jsonl.gz'
+        build_database.write_delta(conn, iter(self.edited), delta_path)
+        conn.close()
+
+        rebuilt = build(self.dir / 'rebuilt.db', self.words)
+        try:
+            with self.assertRaises(ValueError):
+                build_database.apply_delta(rebuilt, delta_path)
+        finally:
+            rebuilt.close()
+
+
+class FusedBuildTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.dir = Path(cls.tmp.name)
+        generate_dumps(cls.dir)
+        conn = build_database.create_database(cls.dir / 'sequential.db')
+        build_database.populate_database(conn, processed_records(cls.dir))
+        cls.expected = build_database.load_word_hashes(conn)
+        conn.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_fused_build_matches_sequential_build(self):
+        # Same word ids and contents; child row ids are not compared
+        self.assertGreater(len(self.expected), 500)
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                conn = build_database.create_database(self.dir / f'fused-{workers}.db')
+                try:
+                    count, _ = fused_build.populate_database_fused(
+                        conn, fused_build.fused_sources(self.dir), workers=workers, queue_size=2,
+                        decoder=process_wiktionary.resolve_decoder('json'),
+                    )
+                    build_database.finalize_database(conn)
+                    check_fts(conn, ('words_fts',))
+                    self.assertEqual(count, len(self.expected))
+                    self.assertEqual(build_database.load_word_hashes(conn), self.expected)
+                finally:
+                    conn.close()
+
+
+class LayoutTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.dir = Path(cls.tmp.name)
+        generate_dumps(cls.dir)
+        cls.words = processed_records(cls.dir)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_layout_matches_standard_build(self):
+        # Word ids are renumbered, so rows are compared by (word, language, pos)
+        standard = build(self.dir / 'standard.db', self.words)
+        layout = build_layout(self.dir / 'layout.db', self.words)
+        try:
+            check_fts(layout)
+            self.assertEqual(layout.execute("PRAGMA page_size").fetchone()[0], 4096)
+            self.assertEqual(layout.execute("PRAGMA integrity_check").fetchone()[0], 'ok')
+            expected, actual = snapshot(standard), snapshot(layout)
+            self.assertEqual(actual['content'], expected['content'])
+            self.assertEqual(actual['columns'], expected['columns'])
+            for table, _, _ in WORD_ID_TABLES:
+                with self.subTest(table=table):
+                    self.assertEqual(actual['derived'][table], expected['derived'][table])
+            self.assertEqual(sorted(path.name for path in self.dir.glob('layout*')), ['layout.db'])
+        finally:
+            standard.close()
+            layout.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+"""Resume and conditional-request behaviour of download_data against a local HTTP server.
+
+Run from tools/data_processor: python -m pytest tests (or python -m unittest discover tests)
+"""
+
+import json
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import download_data  # noqa: E402
+
+PAYLOAD = b''.join(b'{"word": "w%05d", "lang_code": "en"}\n' % i for i in range(4000))
+ETAG = '"dump-v1"'
+
+
+class DumpHandler(BaseHTTPRequestHandler):
+    """Serves PAYLOAD with an ETag, Range/If-Range and If-None-Match support.
+
+    `server.truncate_next` cuts the next full response short; `server.range_offset`
+    shifts the start of the next 206 response to simulate a broken proxy.
+    """
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests.append(dict(self.headers))
+
+        if self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.send_header('ETag', ETAG)
+            self.end_headers()
+            return
+
+        start = 0
+        range_header = self.headers.get('Range')
+        if range_header and self.headers.get('If-Range') == ETAG:
+            start = int(range_header.split('=')[1].rstrip('-'))
+
+        if start:
+            start -= self.server.range_offset
+            self.server.range_offset = 0
+            body = PAYLOAD[start:]
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{len(PAYLOAD) - 1}/{len(PAYLOAD)}')
+        else:
+            body = PAYLOAD
+            self.send_response(200)
+        self.send_header('ETag', ETAG)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+
+        if self.server.truncate_next:
+            self.server.truncate_next = False
+            self.wfile.write(body[:len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+class DownloadTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), DumpHandler)
+        self.server.requests = []
+        self.server.truncate_next = False
+        self.server.range_offset = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/dump.jsonl'
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output_path = Path(self.tmp.name) / 'english_wiktionary.jsonl'
+
+        # Small chunks, so the bytes received before a cut reach the .part file
+        self.saved = (download_data.RETRY_DELAY, download_data.CHUNK_SIZE)
+        download_data.RETRY_DELAY, download_data.CHUNK_SIZE = 0, 4096
+
+    def tearDown(self):
+        download_data.RETRY_DELAY, download_data.CHUNK_SIZE = self.saved
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def download(self) -> str:
+        return download_data.download_file(self.url, self.output_path, download_data.create_session(1))
+
+    def test_interrupted_transfer_resumes_with_range(self):
+        self.server.truncate_next = True
+
+        self.assertEqual(self.download(), 'resumed')
+        self.assertEqual(self.output_path.read_bytes(), PAYLOAD)
+        self.assertFalse(download_data.partial_path_for(self.output_path).exists())
+
+        self.assertEqual(len(self.server.requests), 2)
+        resume = self.server.requests[-1]
+        resume_from = int(resume['Range'].split('=')[1].rstrip('-'))
+        self.assertTrue(0 < resume_from <= len(PAYLOAD) // 2)
+        self.assertEqual(resume['If-Range'], ETAG)
+
+    def test_unchanged_dump_is_not_modified(self):
+        self.assertEqual(self.download(), 'downloaded')
+        mtime = self.output_path.stat().st_mtime_ns
+
+        self.assertEqual(self.download(), 'not-modified')
+        self.assertEqual(self.server.requests[-1]['If-None-Match'], ETAG)
+        self.assertEqual(self.output_path.stat().st_mtime_ns, mtime)
+        self.assertEqual(self.output_path.read_bytes(), PAYLOAD)
+
+    def test_mismatched_content_range_restarts_from_zero(self):
+        partial_path = download_data.partial_path_for(self.output_path)
+        partial_path.write_bytes(PAYLOAD[:1000])
+        download_data.save_meta(self.output_path, {'partial': {'etag': ETAG, 'last_modified': None}})
+        self.server.range_offset = 100
+
+        self.assertEqual(self.download(), 'downloaded')
+        self.assertEqual(self.output_path.read_bytes(), PAYLOAD)
+        self.assertNotIn('Range', self.server.requests[-1])
+
+        with open(download_data.meta_path_for(self.output_path), encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['etag'], ETAG)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+"""Parallel parsing and deduplication of process_wiktionary on a synthetic dump.
+
+Run from tools/data_processor: python -m pytest tests (or python -m unittest discover tests)
+"""
+
+import gzip
+import shutil
+import sys
+import tempfile
+import unittest
+from dataclasses import astuple
+from itertools import chain
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import process_wiktionary  # noqa: E402
+from generate_sample_data import generate_dump  # noqa: E402
+from process_wiktionary import ProcessedWord, dedup_key, dedup_sort_key  # noqa: E402
+
+
+def by_key(words):
+    return sorted((astuple(word) for word in words),
+                  key=lambda row: dedup_sort_key(dedup_key(ProcessedWord(*row))))
+
+
+class ParallelParseTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.dump = Path(cls.tmp.name) / 'english_wiktionary.jsonl'
+        generate_dump(cls.dump, 'english', 3000)
+        cls.compressed = cls.dump.with_suffix('.jsonl.gz')
+        with open(cls.dump, 'rb') as src, gzip.open(cls.compressed, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        cls.serial = cls.parse(cls.dump)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    @staticmethod
+    def parse(input_path, workers=1):
+        return process_wiktionary.process_file(
+            input_path, process_wiktionary.process_english_entry, 'test',
+            workers=workers, prefilter=process_wiktionary.ENGLISH_PREFILTER,
+        )
+
+    def test_shards_cover_the_file_on_line_boundaries(self):
+        data = self.dump.read_bytes()
+        shards = process_wiktionary.find_shard_boundaries(self.dump, 7)
+        self.assertEqual(shards[0][0], 0)
+        self.assertEqual(shards[-1][1], len(data))
+        for (_, end), (start, _) in zip(shards, shards[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(data[start - 1:start], b'\n')
+
+    def test_sharded_output_matches_serial(self):
+        self.assertGreater(len(self.serial), 1000)
+        for workers in (2, 3):
+            with self.subTest(workers=workers):
+                self.assertEqual(self.parse(self.dump, workers), self.serial)
+
+    def test_small_shards_match_serial(self):
+        # Many more shards than the in-flight window
+        saved = process_wiktionary.MAX_SHARD_BYTES
+        process_wiktionary.MAX_SHARD_BYTES = 64 * 1024
+        try:
+            self.assertEqual(self.parse(self.dump, 2), self.serial)
+        finally:
+            process_wiktionary.MAX_SHARD_BYTES = saved
+
+    def test_compressed_stream_matches_serial(self):
+        self.assertEqual(self.parse(self.compressed), self.serial)
+        self.assertEqual(self.parse(self.compressed, 2), self.serial)
+
+
+class DeduplicateTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.dump = Path(cls.tmp.name) / 'english_wiktionary.jsonl'
+        generate_dump(cls.dump, 'english', 3000)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def parse(self, workers=1):
+        return process_wiktionary.iter_processed_batches(
+            self.dump, process_wiktionary.process_english_entry, 'test',
+            workers=workers, prefilter=process_wiktionary.ENGLISH_PREFILTER,
+        )
+
+    def external(self, words, run_size):
+        with tempfile.TemporaryDirectory() as run_dir:
+            return list(process_wiktionary.deduplicate_words_external(
+                words, Path(run_dir), run_size
+            ))
+
+    def test_external_dedup_matches_in_memory(self):
+        words = process_wiktionary.process_file(
+            self.dump, process_wiktionary.process_english_entry, 'test',
+            prefilter=process_wiktionary.ENGLISH_PREFILTER,
+        )
+        expected = process_wiktionary.deduplicate_words(words)
+        self.assertLess(len(expected), len(words))
+
+        for run_size in (50, 1000, len(words)):
+            with self.subTest(run_size=run_size):
+                self.assertEqual(by_key(self.external(iter(words), run_size)), by_key(expected))
+
+    def test_external_dedup_streams_batches(self):
+        expected = process_wiktionary.deduplicate_words(list(chain.from_iterable(self.parse())))
+        streamed = self.external(chain.from_iterable(self.parse(workers=2)), 200)
+        self.assertEqual(by_key(streamed), by_key(expected))
+
+    def test_ties_keep_the_first_entry(self):
+        words = [
+            ProcessedWord('Bank', 'en', 'noun', ['first'], {}, None, [], None),
+            ProcessedWord('bank', 'en', 'noun', ['second'], {}, None, [], None),
+            ProcessedWord('bank', 'en', 'noun', ['richer', 'entry'], {}, None, [], None),
+            ProcessedWord('bank', 'en', None, ['no pos'], {}, None, [], None),
+            ProcessedWord('bank', 'en', 'verb', ['verb'], {}, None, [], None),
+        ]
+        expected = process_wiktionary.deduplicate_words(words)
+        self.assertEqual(by_key(self.external(iter(words), 1)), by_key(expected))
+        self.assertEqual(len(expected), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
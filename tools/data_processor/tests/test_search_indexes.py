@@ -0,0 +1,54 @@
+"""search_key prefix ranges of search_indexes against an in-memory database.
+
+Run from tools/data_processor: python -m pytest tests (or python -m unittest discover tests)
+"""
+
+import sqlite3
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import search_indexes  # noqa: E402
+
+WORDS = [('cafe', 'en'), ('Café', 'en'), ('cat', 'en'), ('dog', 'en'), ('कुत्ता', 'hi')]
+
+
+class PrefixRangeTest(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute(
+            "CREATE TABLE words (id INTEGER PRIMARY KEY, word TEXT, language_code TEXT, pos TEXT)"
+        )
+        self.conn.executemany("INSERT INTO words (word, language_code, pos) VALUES (?, ?, 'noun')",
+                              WORDS)
+        search_indexes.create_search_key(self.conn)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def lookup(self, name, query):
+        sql = search_indexes.SEARCH_KEY_QUERIES[name]
+        params = search_indexes.search_key_query_params(name, query, limit=100)
+        return sorted(row[1] for row in self.conn.execute(sql, params))
+
+    def test_upper_bound(self):
+        self.assertEqual(search_indexes.prefix_upper_bound('ca'), 'cb')
+        self.assertIsNone(search_indexes.prefix_upper_bound(''))
+
+    def test_prefix_lookup(self):
+        self.assertEqual(self.lookup('prefix (language)', 'CA'), ['Café', 'cafe', 'cat'])
+        self.assertEqual(self.lookup('prefix (any language)', 'caf'), ['Café', 'cafe'])
+
+    def test_empty_key_is_an_open_range(self):
+        # A lone combining mark normalizes to an empty key
+        self.assertEqual(search_indexes.normalize_search_key('\u0301'), '')
+        self.assertEqual(self.lookup('prefix (any language)', '\u0301'),
+                         sorted(word for word, _ in WORDS))
+        self.assertEqual(self.lookup('prefix (language)', '\u0301'),
+                         sorted(word for word, language in WORDS if language == 'en'))
+
+
+if __name__ == '__main__':
+    unittest.main()